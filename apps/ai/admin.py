@@ -1,5 +1,5 @@
 from django.contrib import admin
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Q, Sum
 from django.urls import reverse
 from django.utils.html import format_html
 
@@ -196,9 +196,18 @@ class AIQueryLogAdmin(admin.ModelAdmin):
         "intent_display",
         "quality_stars",
         "processing_time_display",
+        "prompt_tokens",
+        "time_to_first_token",
+        "cache_hit",
         "created_at",
     ]
-    list_filter = ["intent", "created_at", "user__role", "response_quality"]
+    list_filter = [
+        "intent",
+        "cache_hit",
+        "created_at",
+        "user__role",
+        "response_quality",
+    ]
     search_fields = ["query", "user__email", "intent"]
     readonly_fields = [
         "user",
@@ -207,6 +216,11 @@ class AIQueryLogAdmin(admin.ModelAdmin):
         "intent",
         "data_accessed",
         "processing_time",
+        "prompt_tokens",
+        "prompt_usage",
+        "time_to_first_token",
+        "cache_hit",
+        "time_saved",
         "response_quality",
         "created_at",
     ]
@@ -216,7 +230,14 @@ class AIQueryLogAdmin(admin.ModelAdmin):
         (
             "Performance",
             {
-                "fields": ("processing_time",),
+                "fields": (
+                    "processing_time",
+                    "time_to_first_token",
+                    "prompt_tokens",
+                    "prompt_usage",
+                    "cache_hit",
+                    "time_saved",
+                ),
             },
         ),
         (
@@ -366,6 +387,15 @@ class AIStatisticsAdmin(admin.ModelAdmin):
             AIQueryLog.objects.aggregate(avg=Avg("response_quality"))["avg"] or 0
         )
 
+        # Response cache
+        cache_stats = AIQueryLog.objects.aggregate(
+            hits=Count("id", filter=Q(cache_hit=True)),
+            time_saved=Sum("time_saved"),
+        )
+        cache_hit_rate = (
+            cache_stats["hits"] / total_queries * 100 if total_queries else 0
+        )
+
         # Intent distribution
         intent_distribution = (
             AIQueryLog.objects.values("intent")
@@ -387,6 +417,9 @@ class AIStatisticsAdmin(admin.ModelAdmin):
                 "total_messages": total_messages,
                 "avg_response_time": round(avg_response_time, 2),
                 "avg_rating": round(avg_rating, 2),
+                "cache_hits": cache_stats["hits"],
+                "cache_hit_rate": round(cache_hit_rate, 2),
+                "cache_time_saved": round(cache_stats["time_saved"] or 0, 2),
                 "intent_distribution": intent_distribution,
                 "user_distribution": user_distribution,
             }
@@ -0,0 +1,109 @@
+"""
+Daily snapshots of the AI assistant's company-wide analytics.
+
+The leave, attendance and payroll patterns in ``apps.ai.utils`` run a dozen
+or more full-year aggregate queries each. They are computed by a beat task
+into one ``AIAnalyticsSnapshot`` row per kind and day, cached in Redis, and
+the AI context builders only read them. Saves and deletes of the underlying
+rows are counted per kind; once AI_ANALYTICS_REFRESH_THRESHOLD changes have
+piled up a refresh of that kind is queued, so the snapshot never lags far
+behind busy days.
+"""
+
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.ai.models import AIAnalyticsSnapshot
+from apps.ai.utils import (
+    calculate_attendance_patterns,
+    calculate_leave_patterns,
+    calculate_payroll_patterns,
+)
+
+SNAPSHOT_CALCULATORS = {
+    "leave": calculate_leave_patterns,
+    "attendance": calculate_attendance_patterns,
+    "payroll": calculate_payroll_patterns,
+}
+
+
+def _snapshot_key(kind):
+    return f"ai_analytics:{kind}"
+
+
+def _changes_key(kind):
+    return f"ai_analytics_changes:{kind}"
+
+
+def _refresh_scheduled_key(kind):
+    return f"ai_analytics_refresh_scheduled:{kind}"
+
+
+def refresh_snapshot(kind):
+    """Recompute today's snapshot of ``kind`` and return its data."""
+    data = SNAPSHOT_CALCULATORS[kind]()
+    AIAnalyticsSnapshot.objects.update_or_create(
+        kind=kind, day=timezone.now().date(), defaults={"data": data}
+    )
+    cache.set(_snapshot_key(kind), data, settings.AI_ANALYTICS_CACHE_SECONDS)
+    cache.delete_many([_changes_key(kind), _refresh_scheduled_key(kind)])
+    return data
+
+
+def get_snapshot(kind):
+    """
+    Today's analytics of ``kind``, from Redis or the snapshot table.
+
+    Computed on the spot only when no snapshot exists for today yet (e.g.
+    right after deployment, before the first beat run).
+    """
+    data = cache.get(_snapshot_key(kind))
+    if data is not None:
+        return data
+
+    snapshot = (
+        AIAnalyticsSnapshot.objects.filter(kind=kind, day=timezone.now().date())
+        .values_list("data", flat=True)
+        .first()
+    )
+    if snapshot is None:
+        return refresh_snapshot(kind)
+    cache.set(_snapshot_key(kind), snapshot, settings.AI_ANALYTICS_CACHE_SECONDS)
+    return snapshot
+
+
+def record_change(kind):
+    """Count a data change for ``kind`` and queue a refresh past the threshold."""
+    key = _changes_key(kind)
+    if cache.add(key, 1, settings.AI_ANALYTICS_CACHE_SECONDS):
+        changes = 1
+    else:
+        try:
+            changes = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr(); start counting again
+            cache.set(key, 1, settings.AI_ANALYTICS_CACHE_SECONDS)
+            changes = 1
+
+    if changes < settings.AI_ANALYTICS_REFRESH_THRESHOLD:
+        return
+    # One queued refresh per kind until it has run
+    if cache.add(_refresh_scheduled_key(kind), 1, 600):
+        try:
+            current_app.send_task(
+                "apps.ai.tasks.refresh_ai_analytics_snapshot", args=[kind]
+            )
+        except Exception as e:
+            cache.delete(_refresh_scheduled_key(kind))
+            print(f"Could not queue {kind} analytics refresh: {e}")
+
+
+def prune_snapshots(days=None):
+    """Delete snapshots older than ``days``; returns the number removed."""
+    days = days if days is not None else settings.AI_ANALYTICS_RETENTION_DAYS
+    cutoff = timezone.now().date() - timedelta(days=days)
+    return AIAnalyticsSnapshot.objects.filter(day__lt=cutoff).delete()[0]
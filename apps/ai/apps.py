@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.ai"
+
+    def ready(self):
+        import apps.ai.signals  # noqa: F401
+        from apps.ai.schema import warm_schema_cache
+
+        warm_schema_cache()
@@ -6,9 +6,10 @@ from django.core.serializers.json import DjangoJSONEncoder
 
 from apps.ai.models import AIConversation, AIMessage, AIQueryLog
 from apps.ai.services import AIService
+from apps.chat.admission import AdmissionMixin
 
 
-class AIChatConsumer(AsyncWebsocketConsumer):
+class AIChatConsumer(AdmissionMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for AI chat functionality."""
 
     async def connect(self):
@@ -19,13 +20,20 @@ class AIChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
+        if not await self.admit(self.user.id):
+            return
+
         self.room_name = f"ai_chat_{self.user.id}"
         self.room_group_name = f"ai_chat_{self.user.id}"
 
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-        await self.accept()
+        try:
+            # Join room group
+            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+            await self.accept()
+        except Exception:
+            # disconnect() is not called for a connect that raised
+            self.release_admission()
+            raise
 
         # Send welcome message
         await self.send(
@@ -40,7 +48,11 @@ class AIChatConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        self.release_admission()
+        if hasattr(self, "room_group_name"):
+            await self.channel_layer.group_discard(
+                self.room_group_name, self.channel_name
+            )
 
     async def receive(self, text_data):
         """Handle incoming WebSocket messages."""
@@ -80,7 +92,9 @@ class AIChatConsumer(AsyncWebsocketConsumer):
         ai_service = AIService(self.user)
         print(f"==>> ai_service: {ai_service}")
 
-        response = await ai_service.process_query(message, conversation_id)
+        response = await ai_service.process_query(
+            message, conversation_id, on_token=self.send_ai_chunk
+        )
         print(f"==>> response: {response}")
 
         await self.send(json.dumps({"type": "ai_typing", "is_typing": False}))
@@ -95,6 +109,34 @@ class AIChatConsumer(AsyncWebsocketConsumer):
             )
         )
 
+        # Titles come from the LLM only after the user has the answer
+        if response["new_conversation"]:
+            title = await ai_service.refine_conversation_title(
+                response["conversation_id"], message
+            )
+            if title:
+                await self.send(
+                    json.dumps(
+                        {
+                            "type": "conversation_title",
+                            "conversation_id": response["conversation_id"],
+                            "title": title,
+                        }
+                    )
+                )
+
+    async def send_ai_chunk(self, conversation_id, text):
+        """Forward a piece of the AI response as the LLM streams it."""
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "ai_message_chunk",
+                    "conversation_id": conversation_id,
+                    "chunk": text,
+                }
+            )
+        )
+
     async def handle_typing_indicator(self, data):
         """Handle typing indicator from user."""
         message = data.get("message", False)
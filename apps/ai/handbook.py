@@ -0,0 +1,194 @@
+"""
+Retrieval index over the company handbook and policy.
+
+When ``CommonData.handbook_content`` or ``policy_content`` changes, the
+text is split into sections (at headings, then at paragraph boundaries up
+to HANDBOOK_CHUNK_CHARS) and stored as ``HandbookChunk`` rows with their
+term counts. The BM25 statistics over all chunks are kept in the cache
+and in process memory, so answering a policy question scores a few hundred
+small term dicts instead of sending the whole document to the LLM.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.ai.models import HandbookChunk
+
+INDEX_CACHE_KEY = "ai_handbook_index"
+INDEX_VERSION_CACHE_KEY = "ai_handbook_index_version"
+
+# CommonData text fields that are indexed, by chunk source
+SOURCE_FIELDS = {"handbook": "handbook_content", "policy": "policy_content"}
+
+STOPWORDS = set(
+    "the and for are was what how can does with this that from have has about "
+    "when which who you your our any all will there their into".split()
+)
+
+# BM25 term frequency saturation and length normalisation
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# "1. Leave Policy", "2.3 Working Hours", "LEAVE POLICY", "Dress Code:"
+HEADING_RE = re.compile(
+    r"^(\d+(\.\d+)*\.?\s+\S.{0,80}|[A-Z][A-Z0-9 &/,()-]{3,80}|[A-Z][^.!?]{2,60}:)$"
+)
+
+# Process-local copy of the index and the version it was loaded at
+_local = {"version": None, "index": None}
+
+
+def terms(text):
+    return [
+        word
+        for word in re.findall(r"[a-z0-9]+", (text or "").lower())
+        if len(word) > 2 and word not in STOPWORDS
+    ]
+
+
+def split_sections(text, chunk_chars=None):
+    """Split ``text`` into [(heading, content)] chunks of about ``chunk_chars``."""
+    chunk_chars = chunk_chars or settings.HANDBOOK_CHUNK_CHARS
+    sections = []
+    heading, lines = "", []
+    for line in (text or "").splitlines():
+        stripped = line.strip()
+        if stripped and HEADING_RE.match(stripped):
+            sections.append((heading, "\n".join(lines)))
+            heading, lines = stripped, []
+        else:
+            lines.append(line)
+    sections.append((heading, "\n".join(lines)))
+
+    chunks = []
+    for heading, body in sections:
+        current = ""
+        for paragraph in re.split(r"\n\s*\n", body):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) > chunk_chars:
+                chunks.append((heading, current))
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append((heading, current))
+    return chunks
+
+
+def build_index(common_data):
+    """Re-chunk and re-index the handbook and policy text of ``common_data``."""
+    chunks = []
+    for source, field in SOURCE_FIELDS.items():
+        for position, (heading, content) in enumerate(
+            split_sections(getattr(common_data, field))
+        ):
+            counts = Counter(terms(f"{heading}\n{content}"))
+            chunks.append(
+                HandbookChunk(
+                    source=source,
+                    position=position,
+                    heading=heading[:255],
+                    content=content,
+                    terms=dict(counts),
+                    length=sum(counts.values()),
+                )
+            )
+
+    with transaction.atomic():
+        HandbookChunk.objects.all().delete()
+        HandbookChunk.objects.bulk_create(chunks)
+    _publish(_statistics(chunks))
+    return len(chunks)
+
+
+def _statistics(chunks):
+    """BM25 statistics of ``chunks`` (HandbookChunk instances)."""
+    document_frequency = Counter(term for chunk in chunks for term in chunk.terms)
+    total = len(chunks)
+    return {
+        "idf": {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        },
+        "average_length": sum(chunk.length for chunk in chunks) / total if total else 0,
+        "chunks": [
+            {
+                "position": position,
+                "source": chunk.source,
+                "heading": chunk.heading,
+                "content": chunk.content,
+                "terms": chunk.terms,
+                "length": chunk.length,
+            }
+            for position, chunk in enumerate(chunks)
+        ],
+    }
+
+
+def _publish(index):
+    cache.set(INDEX_CACHE_KEY, index, None)
+    cache.set(INDEX_VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def load_index():
+    """The BM25 index, from process memory, the cache or the chunk table."""
+    version = cache.get(INDEX_VERSION_CACHE_KEY)
+    if version is not None and version == _local["version"]:
+        return _local["index"]
+
+    index = cache.get(INDEX_CACHE_KEY)
+    if index is None or version is None:
+        index = _statistics(list(HandbookChunk.objects.all()))
+        _publish(index)
+        version = cache.get(INDEX_VERSION_CACHE_KEY)
+    _local.update(version=version, index=index)
+    return index
+
+
+def search(query, top_k=None, min_score=0.0):
+    """
+    The ``top_k`` chunks scoring highest for ``query``, best first.
+
+    Chunks whose BM25 score does not exceed ``min_score`` are left out.
+    """
+    top_k = top_k or settings.HANDBOOK_TOP_K
+    index = load_index()
+    query_terms = set(terms(query))
+    if not query_terms or not index["chunks"]:
+        return []
+
+    idf = index["idf"]
+    average_length = index["average_length"] or 1
+    scored = []
+    for chunk in index["chunks"]:
+        score = 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * chunk["length"] / average_length)
+        for term in query_terms.intersection(chunk["terms"]):
+            frequency = chunk["terms"][term]
+            score += idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+        if score > min_score:
+            scored.append((score, chunk))
+    scored.sort(key=lambda item: (-item[0], item[1]["position"]))
+    return [chunk for _, chunk in scored[:top_k]]
+
+
+def relevant_sections(query, top_k=None, min_score=0.0):
+    """Prompt text of the chunks relevant to ``query``, in document order."""
+    chunks = sorted(
+        search(query, top_k, min_score), key=lambda chunk: chunk["position"]
+    )
+    return "\n\n".join(
+        (
+            f"[{chunk['source'].title()}: {chunk['heading']}]\n{chunk['content']}"
+            if chunk["heading"]
+            else f"[{chunk['source'].title()}]\n{chunk['content']}"
+        )
+        for chunk in chunks
+    )
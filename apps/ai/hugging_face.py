@@ -1,57 +1,151 @@
+import asyncio
+import json
+import logging
 import time
 
-import requests
+import httpx
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are an HRMS assistant. "
+    "Answer ONLY using the provided context. "
+    "Do not guess or hallucinate."
+)
+
+# Rate limiting and transient upstream failures worth another attempt
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _payload(prompt, stream=False):
+    payload = {
+        "model": settings.HF_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "max_tokens": settings.AI_MAX_RESPONSE_TOKENS,
+        "temperature": 0.6,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+class AsyncHuggingFaceLLM:
+    """
+    Non-blocking client for the chat completions API.
+
+    All instances in a process share one ``httpx.AsyncClient`` (and so one
+    keep-alive connection pool) and one semaphore capping concurrent
+    upstream requests. Both are bound to the running event loop and are
+    recreated if the loop changes. Connection errors, timeouts and 429/5xx
+    answers are retried with exponential backoff.
+    """
+
+    _client = None
+    _semaphore = None
+    _loop = None
 
-class HuggingFaceLLM:
     def __init__(self):
-        self.url = "https://router.huggingface.co/v1/chat/completions"
+        self.url = settings.HF_API_URL
         self.headers = {
             "Authorization": f"Bearer {settings.HF_API_KEY}",
             "Content-Type": "application/json",
         }
 
-    def generate(self, prompt: str) -> tuple[str, float]:
-        start = time.time()
+    @classmethod
+    def _shared(cls):
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._loop is not loop:
+            cls._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.AI_LLM_TIMEOUT_SECONDS, connect=5),
+                limits=httpx.Limits(
+                    max_connections=settings.AI_LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_LLM_MAX_CONNECTIONS,
+                ),
+            )
+            cls._semaphore = asyncio.Semaphore(settings.AI_LLM_MAX_CONCURRENCY)
+            cls._loop = loop
+        return cls._client, cls._semaphore
 
-        payload = {
-            "model": settings.HF_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an HRMS assistant. "
-                        "Answer ONLY using the provided context. "
-                        "Do not guess or hallucinate."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            "max_tokens": 300,
-            "temperature": 0.6,
-        }
+    @staticmethod
+    async def _backoff(attempt):
+        await asyncio.sleep(settings.AI_LLM_RETRY_BACKOFF_SECONDS * 2**attempt)
 
-        response = requests.post(
-            self.url,
-            headers=self.headers,
-            json=payload,
-            timeout=60,
-        )
+    @staticmethod
+    def _retryable(error):
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRY_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
 
-        duration = round(time.time() - start, 3)
+    async def generate(self, prompt: str) -> tuple[str, float]:
+        start = time.time()
+        client, semaphore = self._shared()
 
-        if response.status_code != 200:
-            print("HF ERROR BODY:", response.text)
-            raise RuntimeError(f"HF error {response.status_code}")
+        for attempt in range(settings.AI_LLM_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await client.post(
+                        self.url, headers=self.headers, json=_payload(prompt)
+                    )
+                    response.raise_for_status()
+                break
+            except httpx.HTTPError as e:
+                if attempt == settings.AI_LLM_MAX_RETRIES or not self._retryable(e):
+                    if isinstance(e, httpx.HTTPStatusError):
+                        logger.error(f"HF error body: {e.response.text}")
+                    raise RuntimeError(f"HF error: {e}") from e
+                await self._backoff(attempt)
 
         data = response.json()
+        duration = round(time.time() - start, 3)
+        return data["choices"][0]["message"]["content"].strip(), duration
 
-        # if isinstance(data, list):
-        #     return data[0]["generated_text"].strip(), duration
+    async def stream(self, prompt: str):
+        """
+        Yield response text as the server streams it.
 
-        return data["choices"][0]["message"]["content"].strip(), duration
-        # return data["generated_text"].strip(), duration
+        Failures are only retried before the first token has been yielded;
+        after that the error is raised to the caller.
+        """
+        client, semaphore = self._shared()
+
+        for attempt in range(settings.AI_LLM_MAX_RETRIES + 1):
+            started = False
+            try:
+                async with semaphore:
+                    async with client.stream(
+                        "POST",
+                        self.url,
+                        headers=self.headers,
+                        json=_payload(prompt, stream=True),
+                    ) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            delta = self._parse_event(line)
+                            if delta is None:
+                                break
+                            if delta:
+                                started = True
+                                yield delta
+                return
+            except httpx.HTTPError as e:
+                retry = not started and self._retryable(e)
+                if attempt == settings.AI_LLM_MAX_RETRIES or not retry:
+                    raise RuntimeError(f"HF error: {e}") from e
+                await self._backoff(attempt)
+
+    @staticmethod
+    def _parse_event(line):
+        """Text delta of one server-sent event line; None at end of stream."""
+        if not line.startswith("data:"):
+            return ""
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return None
+        choices = json.loads(data).get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
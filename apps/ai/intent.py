@@ -0,0 +1,347 @@
+"""
+Local intent classification for the AI assistant.
+
+Most questions name their topic outright ("leave balance", "next holiday",
+"my payslip"), so ``IntentClassifier`` scores the message against keyword
+tables, tolerating misspellings with fuzzy matching (rapidfuzz when it is
+installed, difflib otherwise), and answers without a round trip to the LLM.
+Once enough queries have been logged, a small TF-IDF model trained from
+``AIQueryLog`` history adds scores for wording the tables do not cover.
+
+``classify`` returns every candidate intent with its confidence;
+``predict`` returns the accepted intents, or None when the message is
+ambiguous: no confident topic, a follow-up that needs the conversation
+history ("yes", "that one"), or a request to change data, where a wrong
+guess is costly. Those still go to the LLM classifier.
+"""
+
+import ast
+import math
+import re
+import time
+from collections import Counter
+from difflib import SequenceMatcher, get_close_matches
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    from rapidfuzz import fuzz
+    from rapidfuzz import process as fuzz_process
+except ImportError:  # pragma: no cover - optional dependency
+    fuzz_process = None
+
+MODEL_CACHE_KEY = "ai_intent_model"
+
+# fmt: off
+INTENT_KEYWORDS = {
+    "leave_inquiry": [
+        "leave", "leaves", "pl", "sl", "lop", "sandwich", "time off",
+        "vacation", "day off", "sick",
+    ],
+    "attendance_inquiry": [
+        "attendance", "check in", "checkin", "check out", "checkout", "late",
+        "present", "absent", "work hours", "working hours", "hours", "break",
+        "breaks",
+    ],
+    "payroll_inquiry": [
+        "salary", "payslip", "payslips", "pay slip", "payroll", "deduction",
+        "deductions", "net pay", "earnings", "allowance",
+    ],
+    "profile_inquiry": [
+        "my profile", "my details", "my position", "my department",
+        "my birthday", "joining date", "my designation",
+    ],
+    "holiday_inquiry": ["holiday", "holidays", "festival", "public holiday"],
+    # Bare "notice" and "news" are left out: "notice period" is a policy
+    # question and "any news on my leave" is about leave
+    "announcement_inquiry": [
+        "announcement", "announcements", "notice board", "new notice",
+    ],
+    "department_inquiry": ["department", "departments"],
+    "position_inquiry": ["position", "positions", "designation", "designations"],
+    "common_data_inquiry": ["company details", "company link", "company logo"],
+    "leave_type_inquiry": ["leave type", "leave types", "types of leave"],
+    "employee_inquiry": ["employee", "employees", "colleague", "colleagues", "staff"],
+    "handbook_inquiry": [
+        "handbook", "policy", "policies", "rule", "rules", "code of conduct",
+        "dress code", "notice period",
+    ],
+}
+
+GREETINGS = {
+    "hi", "hello", "hey", "hii", "morning", "evening", "afternoon", "thanks",
+    "thank", "bye", "good",
+}
+
+# Words asking to change data; such requests are left to the LLM
+ACTION_WORDS = {
+    "apply", "add", "create", "submit", "update", "change", "edit", "modify",
+    "delete", "cancel", "remove", "withdraw",
+}
+
+# fmt: on
+
+FUZZY_CUTOFF = 0.85
+GREETING_CONFIDENCE = 0.9
+# Model similarities below this are noise and not reported
+MIN_CONFIDENCE = 0.1
+# Short queries rarely reach a higher cosine similarity to an intent centroid
+# than this, so it is treated as full confidence
+MODEL_FULL_SIMILARITY = 0.7
+
+
+def parse_intents(response) -> list:
+    """Turn a stored or LLM intent answer ("['leave_inquiry']") into a list."""
+    if isinstance(response, (list, tuple)):
+        return [str(intent) for intent in response] or ["other"]
+    try:
+        intents = ast.literal_eval(str(response).strip())
+    except (ValueError, SyntaxError):
+        intents = re.findall(r"[a-z]+_[a-z_]*|greetings|other", str(response).lower())
+    if isinstance(intents, str):
+        intents = [intents]
+    return [str(intent) for intent in intents] or ["other"]
+
+
+def tokenize(message):
+    return re.findall(r"[a-z0-9]+", (message or "").lower())
+
+
+class TfidfIntentModel:
+    """Nearest-centroid TF-IDF model over past queries and their intents."""
+
+    def __init__(self, idf, centroids):
+        self.idf = idf
+        # {intent: {term: weight}}, each centroid normalised to unit length
+        self.centroids = centroids
+
+    @staticmethod
+    def _normalise(vector):
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def vector(self, tokens):
+        counts = Counter(token for token in tokens if token in self.idf)
+        return self._normalise(
+            {term: count * self.idf[term] for term, count in counts.items()}
+        )
+
+    @classmethod
+    def fit(cls, samples, max_terms=200):
+        """Train from (message, [intents]) pairs."""
+        documents = [
+            (Counter(tokenize(message)), intents) for message, intents in samples
+        ]
+        document_frequency = Counter(term for counts, _ in documents for term in counts)
+        total = len(documents)
+        idf = {
+            term: math.log((1 + total) / (1 + frequency)) + 1
+            for term, frequency in document_frequency.items()
+        }
+
+        model = cls(idf, {})
+        sums = {}
+        for counts, intents in documents:
+            vector = model.vector(counts.elements())
+            for intent in intents:
+                centroid = sums.setdefault(intent, Counter())
+                centroid.update(vector)
+        # Only the strongest terms per intent are kept to bound the model size
+        model.centroids = {
+            intent: cls._normalise(dict(centroid.most_common(max_terms)))
+            for intent, centroid in sums.items()
+        }
+        return model
+
+    def scores(self, tokens):
+        """Cosine similarity of ``tokens`` to each intent centroid."""
+        vector = self.vector(tokens)
+        return {
+            intent: sum(
+                weight * centroid.get(term, 0) for term, weight in vector.items()
+            )
+            for intent, centroid in self.centroids.items()
+        }
+
+    def to_dict(self):
+        return {"idf": self.idf, "centroids": self.centroids}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["idf"], data["centroids"])
+
+
+class IntentClassifier:
+    """Keyword, fuzzy and (when trained) TF-IDF intent classifier."""
+
+    def __init__(self, keywords=None, use_model=True):
+        keywords = keywords or INTENT_KEYWORDS
+        # Single words are matched per token (fuzzily), phrases as substrings
+        self._words = {}
+        self._phrases = {}
+        for intent, terms in keywords.items():
+            for term in terms:
+                if " " in term:
+                    self._phrases.setdefault(term, set()).add(intent)
+                else:
+                    self._words.setdefault(term, set()).add(intent)
+        self._vocabulary = list(self._words)
+        self._match_word = lru_cache(maxsize=4096)(self._match_word)
+        self.use_model = use_model
+        self._model = None
+        self._model_checked_at = 0
+
+    def _match_word(self, token):
+        """(intents, similarity) for one token."""
+        if token in self._words:
+            return self._words[token], 1.0
+        # Short tokens ("pl", "sl") are too easy to confuse to match fuzzily
+        if len(token) < 4:
+            return set(), 0
+        if fuzz_process is not None:
+            match = fuzz_process.extractOne(
+                token,
+                self._vocabulary,
+                scorer=fuzz.ratio,
+                score_cutoff=FUZZY_CUTOFF * 100,
+            )
+            return (self._words[match[0]], match[1] / 100) if match else (set(), 0)
+        close = get_close_matches(token, self._vocabulary, n=1, cutoff=FUZZY_CUTOFF)
+        if not close:
+            return set(), 0
+        return self._words[close[0]], SequenceMatcher(None, token, close[0]).ratio()
+
+    @property
+    def model(self):
+        """The trained TF-IDF model, re-read from the cache every few minutes."""
+        if not self.use_model:
+            return None
+        now = time.monotonic()
+        if now - self._model_checked_at > settings.AI_INTENT_MODEL_REFRESH_SECONDS:
+            self._model_checked_at = now
+            data = cache.get(MODEL_CACHE_KEY)
+            self._model = TfidfIntentModel.from_dict(data) if data else None
+        return self._model
+
+    def classify(self, message):
+        """
+        Score ``message`` against every intent.
+
+        Returns [{"intent", "confidence", "source"}] sorted by confidence,
+        where source is keyword, fuzzy, model or greeting.
+        """
+        tokens = tokenize(message)
+        if not tokens:
+            return []
+
+        # {intent: [(confidence, source), ...]}
+        hits = {}
+        text = " ".join(tokens)
+        for phrase, phrase_intents in self._phrases.items():
+            if phrase in text:
+                for intent in phrase_intents:
+                    hits.setdefault(intent, []).append((1.0, "keyword"))
+        for token in tokens:
+            intents, similarity = self._match_word(token)
+            source = "keyword" if similarity == 1.0 else "fuzzy"
+            for intent in intents:
+                hits.setdefault(intent, []).append((similarity, source))
+
+        matches = {}
+        for intent, intent_hits in hits.items():
+            confidence, source = max(intent_hits)
+            # Further hits for the same intent add a little certainty
+            confidence = min(confidence + 0.05 * (len(intent_hits) - 1), 1.0)
+            matches[intent] = {"confidence": confidence, "source": source}
+
+        # "leave type" also contains "leave"; keep the more specific one
+        if "leave_type_inquiry" in matches:
+            matches.pop("leave_inquiry", None)
+
+        model = self.model
+        if model is not None:
+            for intent, similarity in model.scores(tokens).items():
+                confidence = min(similarity / MODEL_FULL_SIMILARITY, 1.0)
+                if confidence > matches.get(intent, {}).get("confidence", 0):
+                    matches[intent] = {"confidence": confidence, "source": "model"}
+
+        if not hits and len(tokens) <= 4 and GREETINGS.intersection(tokens):
+            matches["greetings"] = {
+                "confidence": GREETING_CONFIDENCE,
+                "source": "greeting",
+            }
+
+        return sorted(
+            (
+                {
+                    "intent": intent,
+                    "confidence": round(match["confidence"], 3),
+                    "source": match["source"],
+                }
+                for intent, match in matches.items()
+                if match["confidence"] >= MIN_CONFIDENCE
+            ),
+            key=lambda match: (-match["confidence"], match["intent"]),
+        )
+
+    def predict(self, message, matches=None):
+        """Return the confidently matched intents, or None when the LLM should decide."""
+        if ACTION_WORDS.intersection(tokenize(message)):
+            return None
+        matches = self.classify(message) if matches is None else matches
+        threshold = settings.AI_INTENT_CONFIDENCE_THRESHOLD
+        intents = sorted(
+            match["intent"] for match in matches if match["confidence"] >= threshold
+        )
+        # Anything else, follow-ups like "yes" or "that one" included, needs
+        # the conversation history to be understood
+        return intents or None
+
+
+def train_intent_model(limit=5000):
+    """
+    Train the TF-IDF model from logged queries and publish it to the cache.
+
+    Queries the user rated 1 or 2, and ones that ended up as "other" or a
+    data change, are left out. Returns the number of samples used, or 0 when
+    there are fewer than AI_INTENT_MODEL_MIN_SAMPLES.
+    """
+    from django.db.models import Q
+
+    from apps.ai.models import AIQueryLog
+
+    samples = []
+    logs = (
+        AIQueryLog.objects.exclude(response_quality__lte=2)
+        .filter(Q(intent__isnull=False) & ~Q(query=""))
+        .order_by("-created_at")
+        .values_list("query", "intent")[:limit]
+    )
+    for query, intent in logs:
+        intents = [
+            name
+            for name in parse_intents(intent)
+            if name in INTENT_KEYWORDS or name == "greetings"
+        ]
+        if intents:
+            samples.append((query, intents))
+
+    if len(samples) < settings.AI_INTENT_MODEL_MIN_SAMPLES:
+        return 0
+    cache.set(MODEL_CACHE_KEY, TfidfIntentModel.fit(samples).to_dict(), None)
+    return len(samples)
+
+
+def local_title(message, max_words=8):
+    """A conversation title derived from the first message, without the LLM."""
+    words = re.findall(r"[A-Za-z0-9']+", message or "")
+    if not words:
+        return "Conversation"
+    title = " ".join(words[:max_words])
+    return title[:1].upper() + title[1:]
+
+
+# Global instance
+intent_classifier = IntentClassifier()
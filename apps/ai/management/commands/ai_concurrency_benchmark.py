@@ -0,0 +1,187 @@
+"""
+Concurrency benchmark for the AI REST quick query endpoint.
+
+Sends ``--requests`` quick queries, ``--concurrency`` clients at a time, with
+JWT authentication through all middleware, and compares:
+
+- ``legacy``: the former sync view, which ran ``process_query`` in a new
+  event loop per request. Under ASGI it deadlocks on its first database
+  call (the call is scheduled onto Django's sync thread, which is blocked
+  running that loop), so it is measured as a sync WSGI worker serving one
+  request at a time.
+- ``async``: the native async ``AIQuickQueryView`` through the project's
+  ASGI application, as daphne serves it.
+
+The LLM is replaced by a stub answering after ``--llm-latency`` seconds and
+the response cache is bypassed, so the numbers show how many requests one
+worker overlaps while waiting on the LLM. Conversations created by the run
+are deleted afterwards.
+
+    python manage.py ai_concurrency_benchmark --requests 40 --concurrency 20
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.ai.models import AIConversation
+from apps.ai.response_cache import response_cache
+from apps.ai.services import AIService
+from apps.base.permissions import IsAuthenticated
+from apps.superadmin.models import Users
+
+
+class LegacyQuickQueryView(APIView):
+    """The quick query view as it was: a new event loop per request."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ai_service = AIService(request.user)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            response_data = loop.run_until_complete(
+                ai_service.process_query(request.data["message"])
+            )
+        finally:
+            loop.close()
+        return Response({"response": response_data["response"]})
+
+
+# URLconf used during the run
+urlpatterns = [
+    path("legacy/", LegacyQuickQueryView.as_view()),
+    path("ai/", include("apps.ai.urls")),
+]
+
+TARGETS = {"legacy": "/legacy/", "async": "/ai/conversations/quick_query/"}
+
+
+class StubLLM:
+    """Answers after a fixed delay, like an upstream model would."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def generate(self, prompt):
+        await asyncio.sleep(self.latency)
+        return "Stub answer.", self.latency
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent AI requests per worker: legacy sync view vs async view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=40)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--llm-latency", type=float, default=0.5)
+        parser.add_argument("--user", help="Email of the user to query as")
+        parser.add_argument(
+            "--mode", choices=["both", *TARGETS], default="both", help="Views to run"
+        )
+
+    def handle(self, *args, **options):
+        users = Users.objects.filter(is_active=True)
+        if options["user"]:
+            users = users.filter(email=options["user"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No active user to run the benchmark as")
+
+        token = str(RefreshToken.for_user(user).access_token)
+        modes = list(TARGETS) if options["mode"] == "both" else [options["mode"]]
+        started = timezone.now()
+
+        original_llm = AIService._async_llm_instance
+        AIService._async_llm_instance = StubLLM(options["llm_latency"])
+        # Every request must reach the LLM
+        response_cache.cacheable = lambda intents: False
+        try:
+            with override_settings(ROOT_URLCONF=__name__):
+                for mode in modes:
+                    if mode == "legacy":
+                        result = self.run_sync_worker(TARGETS[mode], token, options)
+                    else:
+                        result = asyncio.run(self.run(TARGETS[mode], token, options))
+                    self.report(mode, *result, options)
+        finally:
+            AIService._async_llm_instance = original_llm
+            del response_cache.cacheable
+            AIConversation.objects.filter(user=user, created_at__gte=started).delete()
+
+    def run_sync_worker(self, url, token, options):
+        """Clients sharing one sync worker, which serves a request at a time."""
+        worker = threading.Lock()
+        timings, errors = [], 0
+
+        def query(number):
+            nonlocal errors
+            start = time.perf_counter()
+            with worker:
+                response = Client().post(
+                    url,
+                    {"message": f"how many leaves do I have {number}"},
+                    content_type="application/json",
+                    HTTP_AUTHORIZATION=f"Bearer {token}",
+                )
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(query, range(options["requests"])))
+        return sorted(timings), errors, time.perf_counter() - start
+
+    async def run(self, url, token, options):
+        application = get_asgi_application()
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        timings, errors = [], 0
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=application),
+            base_url="http://testserver",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=None,
+        ) as client:
+
+            async def query(number):
+                nonlocal errors
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post(
+                        url, json={"message": f"how many leaves do I have {number}"}
+                    )
+                    timings.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(query(n) for n in range(options["requests"])))
+            return sorted(timings), errors, time.perf_counter() - start
+
+    def report(self, mode, timings, errors, wall, options):
+        self.stdout.write(
+            f"{mode}: {len(timings)} requests in {wall:.2f}s "
+            f"({len(timings) / wall:.1f} req/s), "
+            # Little's law: throughput times the time each request waits on the LLM
+            f"{len(timings) / wall * options['llm_latency']:.1f} requests "
+            f"in flight per worker (of {options['concurrency']} clients), "
+            f"latency p50 {statistics.median(timings):.2f}s "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f}s, "
+            f"errors {errors}"
+        )
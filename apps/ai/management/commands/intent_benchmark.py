@@ -0,0 +1,97 @@
+"""
+Offline accuracy and latency benchmark for the local intent classifier.
+
+Runs ``IntentClassifier.predict`` over a labelled set of messages (by
+default ``apps/ai/benchmarks/intent_cases.json``; ``"intents": null`` marks
+messages that must be left to the LLM) and reports how many were answered
+correctly, wrongly, or deferred to the LLM, plus per-message latency.
+Cases marked ``"held_out": true`` were written without looking at the
+keyword tables and are also scored on their own, so tuning the tables to
+the benchmark shows up as a gap between the two scores.
+
+    python manage.py intent_benchmark --repeat 200
+    python manage.py intent_benchmark --with-model --verbose
+"""
+
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ai.intent import IntentClassifier
+
+DEFAULT_CASES = Path(__file__).resolve().parents[2] / "benchmarks" / "intent_cases.json"
+
+
+class Command(BaseCommand):
+    help = "Measure local intent classifier accuracy and latency on labelled cases"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cases", default=str(DEFAULT_CASES))
+        parser.add_argument(
+            "--repeat", type=int, default=100, help="Timed runs per message"
+        )
+        parser.add_argument(
+            "--with-model",
+            action="store_true",
+            help="Include the TF-IDF model trained from AIQueryLog, if published",
+        )
+        parser.add_argument("--verbose", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            cases = json.loads(Path(options["cases"]).read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read cases: {e}")
+
+        classifier = IntentClassifier(use_model=options["with_model"])
+        correct = wrong = wrongly_deferred = 0
+        held_out = held_out_correct = 0
+        for case in cases:
+            predicted = classifier.predict(case["message"])
+            expected = sorted(case["intents"]) if case["intents"] else None
+            held_out += bool(case.get("held_out"))
+            if predicted == expected:
+                correct += 1
+                held_out_correct += bool(case.get("held_out"))
+                continue
+            if predicted is None:
+                # Deferring costs an LLM call but never gives a wrong answer
+                wrongly_deferred += 1
+            else:
+                wrong += 1
+            if options["verbose"]:
+                self.stdout.write(
+                    f"  {case['message']!r}: expected {expected}, got {predicted}"
+                )
+
+        timings = []
+        for _ in range(options["repeat"]):
+            for case in cases:
+                start = time.perf_counter()
+                classifier.predict(case["message"])
+                timings.append((time.perf_counter() - start) * 1_000_000)
+        timings.sort()
+
+        total = len(cases)
+        self.stdout.write(f"Cases: {total}")
+        self.stdout.write(f"Correct: {correct} ({correct / total:.1%})")
+        self.stdout.write(f"Wrong intents: {wrong} ({wrong / total:.1%})")
+        self.stdout.write(
+            f"Deferred to LLM although answerable: {wrongly_deferred} "
+            f"({wrongly_deferred / total:.1%})"
+        )
+        if held_out:
+            self.stdout.write(
+                f"Held-out correct: {held_out_correct}/{held_out} "
+                f"({held_out_correct / held_out:.1%})"
+            )
+        if timings:
+            self.stdout.write(
+                "Latency per message: "
+                f"mean {statistics.mean(timings):.1f}us, "
+                f"p50 {timings[len(timings) // 2]:.1f}us, "
+                f"p99 {timings[int(len(timings) * 0.99) - 1]:.1f}us"
+            )
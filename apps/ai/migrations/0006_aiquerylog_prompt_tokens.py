@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai", "0005_alter_aiquerylog_response_quality"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aiquerylog",
+            name="prompt_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="aiquerylog",
+            name="prompt_usage",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
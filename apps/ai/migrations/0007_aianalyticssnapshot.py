@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:08
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai", "0006_aiquerylog_prompt_tokens"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AIAnalyticsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=50)),
+                ("day", models.DateField()),
+                (
+                    "data",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "day"),
+                        name="unique_ai_analytics_snapshot_per_day",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai", "0007_aianalyticssnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aiquerylog",
+            name="time_to_first_token",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai", "0008_aiquerylog_time_to_first_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aiquerylog",
+            name="cache_hit",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="aiquerylog",
+            name="time_saved",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai", "0009_aiquerylog_cache_hit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HandbookChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=20)),
+                ("position", models.PositiveIntegerField()),
+                ("heading", models.CharField(blank=True, max_length=255)),
+                ("content", models.TextField()),
+                ("terms", models.JSONField(blank=True, default=dict)),
+                ("length", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["source", "position"],
+                "indexes": [
+                    models.Index(
+                        fields=["source", "position"],
+                        name="ai_handbook_source_9c00c5_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from apps.base.models import BaseModel
@@ -73,6 +74,19 @@ class AIQueryLog(BaseModel):
         null=True, blank=True, validators=[BaseValidator.validate_positive_number]
     )  # User rating 1-5
     processing_time = models.FloatField(null=True, blank=True)
+    prompt_tokens = models.PositiveIntegerField(
+        null=True, blank=True
+    )  # Estimated prompt tokens across all LLM calls of the query
+    prompt_usage = models.JSONField(
+        default=dict, blank=True
+    )  # Per-call token counts by prompt section
+    time_to_first_token = models.FloatField(
+        null=True, blank=True
+    )  # Seconds from receiving the query to the first response token
+    cache_hit = models.BooleanField(default=False)  # Answered from the response cache
+    time_saved = models.FloatField(
+        null=True, blank=True
+    )  # LLM seconds the cached answer originally took
 
     class Meta:
         indexes = [
@@ -82,3 +96,40 @@ class AIQueryLog(BaseModel):
 
     def __str__(self):
         return f"{self.user.email}: {self.query[:30]}..."
+
+
+class AIAnalyticsSnapshot(models.Model):
+    """Company-wide analytics used as AI context, computed once per kind and day."""
+
+    kind = models.CharField(max_length=50)  # leave, attendance, payroll
+    day = models.DateField()
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "day"], name="unique_ai_analytics_snapshot_per_day"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} analytics - {self.day}"
+
+
+class HandbookChunk(models.Model):
+    """A section of the company handbook or policy, indexed for retrieval."""
+
+    source = models.CharField(max_length=20)  # handbook, policy
+    position = models.PositiveIntegerField()
+    heading = models.CharField(max_length=255, blank=True)
+    content = models.TextField()
+    terms = models.JSONField(default=dict, blank=True)  # {term: count}
+    length = models.PositiveIntegerField(default=0)  # Number of terms
+
+    class Meta:
+        ordering = ["source", "position"]
+        indexes = [models.Index(fields=["source", "position"])]
+
+    def __str__(self):
+        return f"{self.source} #{self.position}: {self.heading or self.content[:30]}"
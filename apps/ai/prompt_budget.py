@@ -0,0 +1,186 @@
+"""
+Token-budgeted prompt assembly for the AI assistant.
+
+Prompts are built from named sections. Instruction sections are always kept
+whole; data sections (HRMS context, schema, handbook, history, query logs)
+each get a token budget and are truncated to it, and together they never
+exceed what is left of AI_PROMPT_TOKEN_BUDGET after the instructions.
+Sections are filled in the order they are added, so earlier data sections
+win when the total budget runs short. HRMS context is fitted key by key
+with ``fit_context`` first, so every key keeps a share of its budget.
+
+Token counts are estimated from the text length; they only need to be
+stable enough to keep prompts bounded and to compare calls in AIQueryLog.
+"""
+
+from django.conf import settings
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n...(truncated)"
+
+# Default per-section budgets in tokens
+SECTION_BUDGETS = {
+    "context": 1500,
+    "handbook": 600,
+    "schema": 400,
+    "history": 500,
+    "query_logs": 100,
+}
+
+# Models the assistant may need to know about for each intent, as app labels
+INTENT_MODELS = {
+    "leave_inquiry": [
+        "superadmin.Leave",
+        "superadmin.LeaveType",
+        "employee.LeaveBalance",
+    ],
+    "attendance_inquiry": [
+        "attendance.EmployeeAttendance",
+        "attendance.AttendanceBreakLogs",
+    ],
+    "payroll_inquiry": ["employee.PaySlip"],
+    "profile_inquiry": ["superadmin.Users"],
+    "employee_inquiry": [
+        "superadmin.Users",
+        "superadmin.Department",
+        "superadmin.Position",
+    ],
+    "holiday_inquiry": ["superadmin.Holiday"],
+    "announcement_inquiry": ["superadmin.Announcement"],
+    "department_inquiry": ["superadmin.Department"],
+    "position_inquiry": ["superadmin.Position"],
+    "common_data_inquiry": ["superadmin.CommonData"],
+    "leave_type_inquiry": ["superadmin.LeaveType"],
+}
+
+
+def estimate_tokens(text):
+    """Approximate token count of ``text``."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut ``text`` to ``max_tokens``, preferring a line boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    limit = max(max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER), 0)
+    cut = text[:limit]
+    newline = cut.rfind("\n")
+    if newline > limit // 2:
+        cut = cut[:newline]
+    return cut + TRUNCATION_MARKER
+
+
+def fit_context(context, max_tokens):
+    """
+    Render context data as one ``key: value`` line per key within ``max_tokens``.
+
+    The budget is shared out key by key in order, and whatever a key leaves
+    unused passes on to the keys after it. List values lose whole rows from
+    the end, so a long list cannot push the later keys out of the prompt.
+    """
+    if not isinstance(context, dict):
+        return truncate_to_tokens(str(context), max_tokens)
+
+    lines = []
+    remaining = max_tokens
+    for position, (key, value) in enumerate(context.items()):
+        share = remaining // (len(context) - position)
+        line = _fit_context_entry(key, value, share)
+        lines.append(line)
+        remaining -= estimate_tokens(line + "\n")
+    return "\n".join(lines)
+
+
+def _fit_context_entry(key, value, max_tokens):
+    line = f"{key}: {value}"
+    if estimate_tokens(line) <= max_tokens:
+        return line
+    if not isinstance(value, list):
+        return truncate_to_tokens(line, max_tokens)
+
+    omitted = f" ({len(value)} more rows omitted)"
+    used = estimate_tokens(f"{key}: []{omitted}")
+    rows = []
+    for row in value:
+        cost = estimate_tokens(f"{row}, ")
+        if used + cost > max_tokens:
+            break
+        rows.append(str(row))
+        used += cost
+    return f"{key}: [{', '.join(rows)}] ({len(value) - len(rows)} more rows omitted)"
+
+
+def summarize_history(messages, window=None, max_chars=600):
+    """
+    Render conversation history as a rolling window.
+
+    ``messages`` are (message_type, content) pairs, oldest first. The last
+    ``window`` messages are kept (each capped at ``max_chars``); older user
+    questions are collapsed into a single line so the thread keeps its topic
+    without growing with every turn.
+    """
+    window = window or settings.AI_HISTORY_WINDOW
+    if not messages:
+        return ""
+
+    older, recent = messages[:-window], messages[-window:]
+    lines = []
+    earlier_questions = [
+        content[:80] for message_type, content in older if message_type == "user"
+    ]
+    if earlier_questions:
+        lines.append("Earlier the user asked about: " + "; ".join(earlier_questions))
+    for message_type, content in recent:
+        speaker = "User" if message_type == "user" else "Assistant"
+        if len(content) > max_chars:
+            content = content[:max_chars] + "..."
+        lines.append(f"{speaker}: {content}")
+    return "\n".join(lines)
+
+
+class PromptBuilder:
+    """Assembles a prompt from fixed and budgeted sections."""
+
+    def __init__(self, total_budget=None):
+        self.total_budget = total_budget or settings.AI_PROMPT_TOKEN_BUDGET
+        # [(name, heading, text, budget)]; budget None means never truncated
+        self._sections = []
+
+    def add(self, name, text, heading=None, budget=None):
+        """Add a section; data sections pass a budget, or use SECTION_BUDGETS."""
+        if budget is None:
+            budget = SECTION_BUDGETS.get(name)
+        self._sections.append((name, heading, str(text or "").strip(), budget))
+        return self
+
+    def build(self):
+        """Return (prompt, usage) where usage has per-section token counts."""
+        remaining = self.total_budget - sum(
+            estimate_tokens(text)
+            for _, _, text, budget in self._sections
+            if budget is None
+        )
+
+        parts = []
+        usage = {"sections": {}, "truncated": []}
+        for name, heading, text, budget in self._sections:
+            if budget is not None:
+                limit = max(min(budget, remaining), 0)
+                fitted = truncate_to_tokens(text, limit)
+                if fitted != text:
+                    usage["truncated"].append(name)
+                text = fitted
+                remaining -= estimate_tokens(text)
+            if not text:
+                continue
+            parts.append(f"{heading}\n{text}" if heading else text)
+            usage["sections"][name] = estimate_tokens(text)
+
+        prompt = "\n\n".join(parts)
+        usage["total"] = estimate_tokens(prompt)
+        return prompt, usage
@@ -0,0 +1,181 @@
+"""
+Response cache for repeated AI assistant questions.
+
+Employees ask the same things over and over ("how many leaves do I have",
+"next holiday"). Answers to self-contained questions (intent resolved by the
+local classifier, so not a follow-up) are cached in buckets keyed by:
+- the scope: the user for intents that read personal data, the role otherwise
+- the sorted intents
+- the current version of every data domain those intents read
+- the date
+
+Cached answers are generated without the asking user's conversation history
+and query logs, so an answer shared across a role holds nothing from one
+user's earlier questions.
+
+Within a bucket a question matches an earlier one exactly after
+normalisation, or when both use the same words apart from filler words
+(STOPWORDS) and their character trigram similarity reaches
+AI_RESPONSE_CACHE_SIMILARITY. Numbers, months and every other word must be
+equal, so "payslip for january 2025" never reuses the january 2024 answer.
+
+Saving or deleting leave, attendance, holiday, payroll, announcement, employee
+or company rows bumps the version of its domain. Bucket keys of affected
+answers change at once, and stale buckets simply expire.
+"""
+
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Data domains each intent's context is built from
+INTENT_DOMAINS = {
+    "leave_inquiry": ["leave", "employee"],
+    "leave_type_inquiry": ["leave"],
+    "attendance_inquiry": ["attendance", "employee"],
+    "payroll_inquiry": ["payroll"],
+    "profile_inquiry": ["employee"],
+    "employee_inquiry": ["employee"],
+    "department_inquiry": ["employee"],
+    "position_inquiry": ["employee"],
+    "holiday_inquiry": ["holiday"],
+    "announcement_inquiry": ["announcement"],
+    "common_data_inquiry": ["company"],
+    "handbook_inquiry": ["company"],
+    "general_inquiry": ["employee", "holiday", "announcement", "leave", "company"],
+}
+
+# Intents whose context includes the asking user's own records
+PERSONAL_INTENTS = {
+    "leave_inquiry",
+    "attendance_inquiry",
+    "payroll_inquiry",
+    "profile_inquiry",
+    "employee_inquiry",
+}
+
+MAX_ENTRIES_PER_BUCKET = 20
+
+# Words that do not change what is being asked; all other words (numbers,
+# months, names, question words, negations) must match for a reworded hit
+# fmt: off
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "was", "were", "be", "do", "does",
+    "did", "i", "me", "my", "mine", "we", "our", "you", "your", "please",
+    "can", "could", "would", "will", "tell", "show", "give", "let", "know",
+    "to", "of", "for", "in", "on", "at", "about", "with", "there", "any",
+    "s", "pls", "plz", "kindly",
+}
+# fmt: on
+
+
+def _version_key(domain):
+    return f"ai_data_version:{domain}"
+
+
+def data_version(domain):
+    """Current version of ``domain``; a fresh one if it was never set or evicted."""
+    version = cache.get(_version_key(domain))
+    if version is None:
+        # Time based so a lost key can never bring back an old version
+        cache.add(_version_key(domain), time.time_ns(), None)
+        version = cache.get(_version_key(domain))
+    return version
+
+
+def bump_data_version(domain):
+    cache.set(_version_key(domain), time.time_ns(), None)
+
+
+def normalize(query):
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+
+def _terms(normalized):
+    return sorted(set(normalized.split()) - STOPWORDS)
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class ResponseCache:
+    """Caches AI answers per scope, intents and data version."""
+
+    def __init__(self, timeout=None, similarity=None):
+        self.timeout = timeout or settings.AI_RESPONSE_CACHE_SECONDS
+        self.similarity = similarity or settings.AI_RESPONSE_CACHE_SIMILARITY
+
+    @staticmethod
+    def cacheable(intents):
+        # Greetings and other small talk should not repeat; data changes and
+        # unknown intents have no well defined data to version
+        return bool(intents) and all(intent in INTENT_DOMAINS for intent in intents)
+
+    def _bucket_key(self, user, intents):
+        if PERSONAL_INTENTS.intersection(intents):
+            scope = f"user:{user.id}"
+        else:
+            scope = f"role:{user.role}"
+        domains = sorted(
+            {domain for intent in intents for domain in INTENT_DOMAINS[intent]}
+        )
+        versions = ",".join(f"{domain}={data_version(domain)}" for domain in domains)
+        # Answers like "today's attendance" or "next holiday" depend on the day
+        day = timezone.localdate().isoformat()
+        raw = f"{scope}|{day}|{','.join(sorted(intents))}|{versions}"
+        return f"ai_response_cache:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, user, intents, query):
+        """
+        Return (entry, similarity) of the best cached answer, or None.
+
+        ``entry`` holds the normalised ``query``, the ``response`` text and the
+        ``duration`` the LLM took to produce it.
+        """
+        if not self.cacheable(intents):
+            return None
+        entries = cache.get(self._bucket_key(user, intents)) or []
+        normalized = normalize(query)
+        terms = _terms(normalized)
+        grams = _trigrams(normalized)
+
+        best = None
+        for entry in entries:
+            if entry["query"] == normalized:
+                return entry, 1.0
+            # Near duplicates must still ask about exactly the same things
+            if _terms(entry["query"]) != terms:
+                continue
+            similarity = _similarity(grams, _trigrams(entry["query"]))
+            if similarity >= self.similarity and (best is None or similarity > best[1]):
+                best = (entry, round(similarity, 3))
+        return best
+
+    def set(self, user, intents, query, response, duration):
+        if not self.cacheable(intents):
+            return
+        key = self._bucket_key(user, intents)
+        normalized = normalize(query)
+        entries = [
+            entry for entry in cache.get(key) or [] if entry["query"] != normalized
+        ]
+        entries.append(
+            {"query": normalized, "response": response, "duration": duration}
+        )
+        cache.set(key, entries[-MAX_ENTRIES_PER_BUCKET:], self.timeout)
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,102 @@
+"""
+Database schema digest for AI prompts.
+
+Only the HR models the assistant works with (``SCHEMA_MODELS``, every model
+named in ``INTENT_MODELS``) are described, without credential and permission
+fields. The per-model text is built once per process, when the app is
+ready, and rebuilt only after migrations have run.
+"""
+
+from functools import lru_cache
+
+from django.apps import apps
+
+from apps.ai.prompt_budget import INTENT_MODELS
+
+SCHEMA_MODELS = list(
+    dict.fromkeys(label for labels in INTENT_MODELS.values() for label in labels)
+)
+
+# Credential, permission and bookkeeping fields left out of the digest
+EXCLUDED_FIELDS = {
+    "password",
+    "is_superuser",
+    "is_staff",
+    "last_login",
+    "groups",
+    "user_permissions",
+    "updated_at",
+    "deleted_at",
+}
+
+RELATION_NAMES = {
+    "many_to_one": "FK",
+    "one_to_one": "OneToOne",
+    "many_to_many": "M2M",
+}
+
+
+def _describe(model):
+    lines = [f"Table: {model._meta.db_table} (Model: {model.__name__})"]
+    for field in model._meta.get_fields():
+        # Reverse relations have no attname and are left out
+        if not hasattr(field, "attname") or field.name in EXCLUDED_FIELDS:
+            continue
+        relation = ""
+        if field.is_relation:
+            kind = next(name for name in RELATION_NAMES if getattr(field, name))
+            target = field.related_model.__name__
+            relation = f" -> {RELATION_NAMES[kind]} {target}"
+        lines.append(f"  - {field.attname} ({field.get_internal_type()}){relation}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=1)
+def _digests():
+    """{model label: description} of the allowlisted models."""
+    return {label: _describe(apps.get_model(label)) for label in SCHEMA_MODELS}
+
+
+def table_names():
+    return sorted(label.split(".")[1] for label in SCHEMA_MODELS)
+
+
+def model_label(name):
+    """Allowlisted label of the model called ``name`` (any case, no underscores)."""
+    name = name.replace("_", "").lower()
+    for label in SCHEMA_MODELS:
+        if label.split(".")[1].lower() == name:
+            return label
+    return None
+
+
+def models_for_intents(intents):
+    """
+    Allowlisted model labels relevant to ``intents``.
+
+    CRUD intents such as ``create_leave`` resolve to the model whose name
+    matches the suffix.
+    """
+    labels = []
+    for intent in intents or []:
+        if intent in INTENT_MODELS:
+            labels.extend(INTENT_MODELS[intent])
+            continue
+        action, _, target = intent.partition("_")
+        if action in ("create", "update", "delete") and model_label(target or ""):
+            labels.append(model_label(target))
+    return list(dict.fromkeys(labels))
+
+
+def schema_digest(model_labels):
+    """Schema text of the allowlisted models among ``model_labels``."""
+    digests = _digests()
+    return "\n\n".join(digests[label] for label in model_labels if label in digests)
+
+
+def clear_schema_cache(**kwargs):
+    _digests.cache_clear()
+
+
+def warm_schema_cache():
+    _digests()
@@ -1,24 +1,37 @@
+import asyncio
+import functools
 import logging
+import time
 import uuid
-
-# import ast
+from datetime import timedelta
 from typing import Any, Dict
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db.models import Avg, Count, F
 from django.utils import timezone
 
-from apps.ai.hugging_face import HuggingFaceLLM
+from apps.ai.analytics import get_snapshot
+from apps.ai.handbook import relevant_sections
+from apps.ai.hugging_face import AsyncHuggingFaceLLM
+from apps.ai.intent import intent_classifier, local_title, parse_intents
 from apps.ai.mcp_tools import RoleBasedMCPTools, TaskExecutor
 from apps.ai.models import AIConversation, AIMessage, AIQueryLog
+from apps.ai.prompt_budget import (
+    SECTION_BUDGETS,
+    PromptBuilder,
+    fit_context,
+    summarize_history,
+)
+from apps.ai.response_cache import response_cache
+from apps.ai.schema import models_for_intents, schema_digest, table_names
 from apps.ai.utils import (
     PromptTemplates,
     calculate_announcement_patterns,
-    calculate_attendance_patterns,
     calculate_employee_patterns,
     calculate_general_patterns,
     calculate_holiday_patterns,
-    calculate_leave_patterns,
-    calculate_payroll_patterns,
     calculate_profile_patterns,
 )
 from apps.attendance.models import EmployeeAttendance
@@ -36,15 +49,22 @@ from apps.superadmin.models import (
 
 logger = logging.getLogger(__name__)
 
+# Intents whose prompts always include the best matching handbook sections
+HANDBOOK_INTENTS = {"handbook_inquiry", "general_inquiry"}
+
 
 class AIService:
     """Core AI service for handling chatbot interactions."""
 
-    _llm_instance = None  # Cached LLM instance
+    _async_llm_instance = None  # Cached LLM client
 
     def __init__(self, user):
         self.user = user
         self.role = user.role
+        # Prompt token usage of the LLM calls made for the current query
+        self.prompt_usage = {}
+        # Local classifier candidates for the current query, with confidences
+        self.intent_matches = []
         self.mcp_tools = RoleBasedMCPTools()
         self.task_executor = TaskExecutor(user, self.mcp_tools)
         # Intent context mapping - maps intent to context builder method
@@ -63,98 +83,180 @@ class AIService:
             "employee_inquiry": self._get_employee_context,
             "handbook_inquiry": self._get_handbook_context,
         }
+        # Company-wide patterns added as extra_details for these intents; the
+        # heavy leave/attendance/payroll ones are read from daily snapshots
+        self._intent_patterns_map = {
+            "leave_inquiry": functools.partial(get_snapshot, "leave"),
+            "attendance_inquiry": functools.partial(get_snapshot, "attendance"),
+            "payroll_inquiry": functools.partial(get_snapshot, "payroll"),
+            "profile_inquiry": calculate_profile_patterns,
+            "general_inquiry": calculate_general_patterns,
+            "holiday_inquiry": calculate_holiday_patterns,
+            "announcement_inquiry": calculate_announcement_patterns,
+            "employee_inquiry": calculate_employee_patterns,
+        }
 
     @classmethod
-    def _get_llm(cls):
-        """Get or create cached LLM instance."""
-        if cls._llm_instance is None:
-            cls._llm_instance = HuggingFaceLLM()
-        return cls._llm_instance
+    def _get_async_llm(cls):
+        """Get or create cached non-blocking LLM client."""
+        if cls._async_llm_instance is None:
+            cls._async_llm_instance = AsyncHuggingFaceLLM()
+        return cls._async_llm_instance
 
     async def process_query(
-        self, message: str, conversation_id: str = None
+        self, message: str, conversation_id: str = None, on_token=None
     ) -> Dict[str, Any]:
-        """Process user query and generate AI response."""
+        """
+        Process user query and generate AI response.
 
-        # Get or create conversation
-        conversation = await self._get_or_create_conversation(conversation_id, message)
+        ``on_token(conversation_id, text)`` is awaited with each piece of the
+        response as the LLM streams it.
+        """
+        started = time.time()
+        first_token_at = None
+
+        # Get or create conversation; new ones get a title derived locally
+        conversation, created = await self._get_or_create_conversation(
+            conversation_id, message
+        )
 
-        # Save user message
-        await self._save_message(conversation, "user", message)
+        # History is read before the new message is saved so it is not repeated
+        history, query_logs = await asyncio.gather(
+            self._get_conversation_history(conversation),
+            self._get_recent_query_logs(),
+        )
 
-        # Classify intent and build context
-        intent = self._classify_intent(message, conversation)
+        # Classify intent while the user message is saved
+        intent, _ = await asyncio.gather(
+            self._classify_intent(message, history, query_logs),
+            self._save_message(conversation, "user", message),
+        )
         print(f"==>> intent: {intent}")
         logger.debug(f"Classified intent: {intent}")
 
+        # Follow-ups (intent left to the LLM) depend on the history; only
+        # self-contained questions are served from or stored in the cache
+        cacheable = "intent" not in self.prompt_usage and response_cache.cacheable(
+            intent
+        )
+        if cacheable:
+            cached = await sync_to_async(response_cache.get)(self.user, intent, message)
+            if cached is not None:
+                return await self._answer_from_cache(
+                    conversation, created, message, intent, cached, on_token, started
+                )
+
         # Check if CRUD operation needed
         is_crud_operation = any(
             i.startswith(("create", "update", "delete")) for i in intent
         )
         print(f"==>> is_crud_operation: {is_crud_operation}")
 
-        # Build context based on intent
-        context_data = await self._build_context(message, intent)
+        # Build context based on intent, reading the handbook alongside
+        context_data, handbook_sections = await asyncio.gather(
+            self._build_context(message, intent),
+            self._get_handbook_sections(message, intent),
+        )
         print(f"==>> context_data: {context_data}")
         logger.debug(f"Built context with keys: {list(context_data.keys())}")
 
-        # Generate AI response
-        ai_response = self._generate_response(
-            message, context_data, intent, conversation
+        async def forward_token(text):
+            nonlocal first_token_at
+            if first_token_at is None:
+                first_token_at = time.time()
+            await on_token(conversation.session_id, text)
+
+        # Cached answers can be served to other users of the role, so they
+        # are generated without this user's history and query logs
+        ai_response = await self._generate_response(
+            message,
+            context_data,
+            intent,
+            [] if cacheable else history,
+            [] if cacheable else query_logs,
+            handbook_sections,
+            on_token=forward_token if on_token else None,
         )
+        # Without streaming the first token arrives with the whole response
+        time_to_first_token = round((first_token_at or time.time()) - started, 3)
+        if cacheable and ai_response[1] is not None:
+            await sync_to_async(response_cache.set)(
+                self.user, intent, message, ai_response[0], ai_response[1]
+            )
 
         # Save AI response
         ai_message = await self._save_message(
             conversation,
             "ai",
             ai_response,
-            metadata={"intent": intent, "context_used": list(context_data.keys())},
+            metadata={
+                "intent": intent,
+                "intent_source": "llm" if "intent" in self.prompt_usage else "local",
+                "intent_matches": self.intent_matches,
+                "context_used": list(context_data.keys()),
+            },
         )
 
         await self._ai_query_log(
-            self.user, ai_response, ai_message, intent, list(context_data.keys())
+            self.user,
+            message,
+            ai_response,
+            ai_message,
+            intent,
+            list(context_data.keys()),
+            self.prompt_usage,
+            time_to_first_token,
         )
 
         return {
             "response": ai_response,
             "conversation_id": conversation.session_id,
             "message_id": ai_message.id,
+            "new_conversation": created,
+            "time_to_first_token": time_to_first_token,
         }
 
-    # -------------------------------------------------------------------------------
+    async def _answer_from_cache(
+        self, conversation, created, message, intent, cached, on_token, started
+    ):
+        """Save and log a cached answer as the response to ``message``."""
+        entry, similarity = cached
+        if on_token:
+            await on_token(conversation.session_id, entry["response"])
+        elapsed = round(time.time() - started, 3)
 
-    def get_db_schema(self) -> str:
-        """
-        Return database schema details (tables, columns, types, relations)
-        formatted as LLM-friendly readable text.
-        """
-        from django.apps import apps
-
-        schema_lines = []
-
-        for model in apps.get_models():
-            table_name = model._meta.db_table
-            model_name = model.__name__
-
-            schema_lines.append(f"\nTable: {table_name} (Model: {model_name})")
-
-            for field in model._meta.get_fields():
-                if hasattr(field, "attname"):
-                    field_name = field.attname
-                    field_type = field.get_internal_type()
-
-                    relation = ""
-                    if field.is_relation:
-                        if field.many_to_one:
-                            relation = " -> FK"
-                        elif field.one_to_one:
-                            relation = " -> OneToOne"
-                        elif field.many_to_many:
-                            relation = " -> M2M"
+        ai_message = await self._save_message(
+            conversation,
+            "ai",
+            (entry["response"], elapsed),
+            metadata={
+                "intent": intent,
+                "intent_source": "local",
+                "intent_matches": self.intent_matches,
+                "cache_similarity": similarity,
+            },
+        )
+        await self._ai_query_log(
+            self.user,
+            message,
+            (entry["response"], elapsed),
+            ai_message,
+            intent,
+            [],
+            self.prompt_usage,
+            elapsed,
+            time_saved=entry["duration"],
+        )
 
-                    schema_lines.append(f"  - {field_name} ({field_type}){relation}")
+        return {
+            "response": (entry["response"], elapsed),
+            "conversation_id": conversation.session_id,
+            "message_id": ai_message.id,
+            "new_conversation": created,
+            "time_to_first_token": elapsed,
+        }
 
-        return "\n".join(schema_lines)
+    # -------------------------------------------------------------------------------
 
     async def get_auto_suggestions(self, message: str):
         """Generate auto suggestions for partial user input."""
@@ -163,8 +265,7 @@ class AIService:
 
         auto_suggestion_prompt = self._generate_auto_suggestion_with_llm(message)
         try:
-            llm = self._get_llm()
-            response = llm.generate(auto_suggestion_prompt)
+            response = await self._get_async_llm().generate(auto_suggestion_prompt)
             return response[0] if response else ""
         except Exception as e:
             logger.error(f"Error generating suggestions: {str(e)}")
@@ -173,29 +274,43 @@ class AIService:
     @database_sync_to_async
     def _get_or_create_conversation(
         self, conversation_id: str = None, message: str = None
-    ) -> AIConversation:
-        """Get existing or create new conversation."""
+    ) -> tuple:
+        """Get existing or create new conversation; returns (conversation, created)."""
         if conversation_id:
             try:
-                return AIConversation.objects.get(
+                conversation = AIConversation.objects.get(
                     session_id=conversation_id, user=self.user
                 )
+                return conversation, False
             except AIConversation.DoesNotExist:
                 pass
 
-        # Generate title using LLM
+        # The LLM title, if enabled, replaces this after the response is sent
+        conversation = AIConversation.objects.create(
+            user=self.user, session_id=str(uuid.uuid4()), title=local_title(message)
+        )
+        return conversation, True
+
+    async def refine_conversation_title(self, conversation_id: str, message: str):
+        """Replace a new conversation's local title with an LLM generated one."""
+        if not settings.AI_LLM_CONVERSATION_TITLES:
+            return None
+
         title_prompt = self._generate_title_with_llm(message=message)
         try:
-            llm = self._get_llm()
-            title_response = llm.generate(title_prompt)
-            title = title_response[0] if title_response else "Conversation"
+            title_response = await self._get_async_llm().generate(title_prompt)
         except Exception as e:
             logger.error(f"Error generating conversation title: {str(e)}")
-            title = "Conversation"
+            return None
 
-        return AIConversation.objects.create(
-            user=self.user, session_id=str(uuid.uuid4()), title=title
-        )
+        title = title_response[0][:255] if title_response else None
+        if title:
+            await database_sync_to_async(
+                AIConversation.objects.filter(
+                    session_id=conversation_id, user=self.user
+                ).update
+            )(title=title)
+        return title
 
     @database_sync_to_async
     def _save_message(self, conversation, msg_type, content, metadata=None):
@@ -208,44 +323,111 @@ class AIService:
         )
 
     @database_sync_to_async
-    def _ai_query_log(self, user, message, ai_message, intent, context_used):
+    def _ai_query_log(
+        self,
+        user,
+        query,
+        message,
+        ai_message,
+        intent,
+        context_used,
+        prompt_usage=None,
+        time_to_first_token=None,
+        time_saved=None,
+    ):
         """Log AI query for analytics and improvement."""
         logger.info(f"AI Query logged - Intent: {intent}, User: {user.email}")
+        prompt_usage = prompt_usage or {}
         return AIQueryLog.objects.create(
             user=user,
             ai_message=ai_message,
-            query=message[0] if message else None,
+            query=query,
             intent=intent,
             data_accessed=context_used,
             processing_time=message[1] if message else None,
+            prompt_tokens=sum(usage["total"] for usage in prompt_usage.values())
+            or None,
+            prompt_usage=prompt_usage,
+            time_to_first_token=time_to_first_token,
+            cache_hit=time_saved is not None,
+            time_saved=time_saved,
         )
 
     @database_sync_to_async
-    def get_ai_query_logs(self):
-        return AIQueryLog.objects.all().order_by("-created_at")
+    def _get_recent_query_logs(self):
+        """Latest intents and ratings of this user's queries, newest first."""
+        return list(
+            AIQueryLog.objects.filter(user=self.user)
+            .order_by("-created_at")
+            .values_list("intent", "response_quality")[: settings.AI_QUERY_LOG_WINDOW]
+        )
 
     @database_sync_to_async
-    def get_conversation_data(self, conversation_id):
-        data = AIMessage.objects.filter(conversation=conversation_id)
-        return data
+    def _get_conversation_history(self, conversation):
+        """(message_type, content) pairs of the conversation, oldest first."""
+        messages = (
+            AIMessage.objects.filter(conversation=conversation)
+            .order_by("-created_at")
+            .values_list("message_type", "content")[: settings.AI_HISTORY_MAX_MESSAGES]
+        )
+        return list(reversed(messages))
 
     @database_sync_to_async
-    def get_handbook_details(self):
-        data = CommonData.objects.values_list("handbook_content")
-        print(f"==>> data: {data}")
-        return data
+    def _get_handbook_sections(self, message, intent):
+        """Handbook and policy sections relevant to ``message``."""
+        if HANDBOOK_INTENTS.intersection(intent):
+            return relevant_sections(message)
+        # Data questions ("my leave balance") only get sections that match
+        # them strongly, rather than loosely related policy text
+        return relevant_sections(message, min_score=settings.HANDBOOK_MIN_SCORE)
 
-    def _classify_intent(self, message: str, conversation: str) -> str:
+    @staticmethod
+    def _format_query_logs(query_logs):
+        return "\n".join(
+            f"- intent: {intent}, rating: {rating or 'not rated'}"
+            for intent, rating in query_logs
+        )
+
+    def _record_prompt(self, name, builder):
+        """Build the prompt and record its token usage under ``name``."""
+        prompt, usage = builder.build()
+        self.prompt_usage[name] = usage
+        logger.debug(f"{name} prompt tokens: {usage}")
+        return prompt
+
+    async def _llm_generate(self, name, builder, on_token=None):
+        """
+        Call the LLM with the built prompt; returns (text, duration).
+
+        With ``on_token`` the response is streamed and each piece is passed
+        to it as it arrives.
+        """
+        prompt = self._record_prompt(name, builder)
+        llm = self._get_async_llm()
+        if on_token is None:
+            return await llm.generate(prompt)
+
+        start = time.time()
+        parts = []
+        async for text in llm.stream(prompt):
+            parts.append(text)
+            await on_token(text)
+        return "".join(parts).strip(), round(time.time() - start, 3)
+
+    async def _classify_intent(
+        self, message: str, history: list, query_logs: list
+    ) -> list:
         """Classify user intent from message."""
         message_lower = message.lower()
-        print(f"==>> message_lower: {message_lower}")
         logger.debug(f"Classifying intent for message: {message_lower[:100]}...")
 
-        # Note: These return coroutines but are used as context in prompt
-        ai_query_logs = self.get_ai_query_logs()
-        conversation_data = self.get_conversation_data(conversation)
-        db_schema = self.get_db_schema()
-        prompt = f"""
+        # Unambiguous questions are classified locally, without an LLM call
+        self.intent_matches = intent_classifier.classify(message)
+        intents = intent_classifier.predict(message, self.intent_matches)
+        if intents:
+            return intents
+
+        instructions = """
             You are an HRMS AI intent classifier.
 
             Your job is to identify the user's intent(s) from the message and return ONLY the
@@ -275,19 +457,8 @@ class AIService:
             - create_
             - update_
             - delete_
-
-            USER MESSAGE:
-            {message_lower}
-
-            CONVERSATION HISTORY (same conversation ID):
-            {conversation_data}
-
-            PREVIOUS QUERY LOGS:
-            {ai_query_logs}
-
-            DB_SCHEMA:
-            {db_schema}
-
+        """
+        rules = """
             CLASSIFICATION RULES:
 
             CONTEXT AWARENESS:
@@ -343,12 +514,29 @@ class AIService:
             IMPORTANT:
             - Intent detection accuracy is critical because DB context will be fetched based on this.
         """
+        # The classifier only needs table names to pick a create_/update_/delete_
+        # target; field level schema is added to the response prompt per intent
+
+        builder = PromptBuilder()
+        builder.add("instructions", instructions)
+        builder.add("message", message_lower, heading="USER MESSAGE:")
+        builder.add(
+            "history",
+            summarize_history(history),
+            heading="CONVERSATION HISTORY (same conversation ID):",
+        )
+        builder.add(
+            "query_logs",
+            self._format_query_logs(query_logs),
+            heading="PREVIOUS QUERY LOGS:",
+        )
+        builder.add("schema", ", ".join(table_names()), heading="DB TABLES:")
+        builder.add("rules", rules)
 
         try:
-            llm = self._get_llm()
-            response = llm.generate(prompt)
+            response = await self._llm_generate("intent", builder)
             logger.debug(f"Intent classification response: {response}")
-            return response[0] if response else None
+            return parse_intents(response[0]) if response else ["other"]
         except Exception as e:
             logger.error(f"Error classifying intent: {str(e)}")
             return ["other"]
@@ -356,12 +544,20 @@ class AIService:
     async def _build_context(self, message: str, intent: list) -> Dict[str, Any]:
         """Build context data based on user role and intent using mapping."""
         context = {}
+        extra_details = {}
 
         # Build context for matched intents
         for intent_key in intent:
             if intent_key in self._intent_context_map:
                 context_builder = self._intent_context_map[intent_key]
                 context.update(await context_builder())
+            if intent_key in self._intent_patterns_map:
+                extra_details[intent_key] = await database_sync_to_async(
+                    self._intent_patterns_map[intent_key]
+                )()
+
+        if extra_details:
+            context["extra_details"] = extra_details
 
         # Add default context if no intents matched
         if not context:
@@ -369,154 +565,149 @@ class AIService:
 
         return context
 
+    @staticmethod
+    def _recent_since():
+        return timezone.now().date() - timedelta(days=settings.AI_CONTEXT_DAYS)
+
+    @staticmethod
+    def _rows(queryset, limit=None):
+        """Evaluate ``queryset`` capped at ``limit`` (AI_CONTEXT_MAX_ROWS by default)."""
+        return list(queryset[: limit or settings.AI_CONTEXT_MAX_ROWS])
+
     @database_sync_to_async
     def _get_leave_context(self) -> Dict[str, Any]:
         """Get leave-related context based on user role."""
         context = {}
+        leave_fields = (
+            "from_date",
+            "to_date",
+            "day_part",
+            "is_sandwich_applied",
+            "leave_type__name",
+            "status",
+            "total_days",
+        )
+
+        # The user's own data comes first so it survives prompt truncation;
+        # admin/hr also use it for "my leaves" questions
+        context["my_leave_balance"] = (
+            LeaveBalance.objects.filter(employee=self.user)
+            .values("year", "pl", "sl", "lop", "used_pl", "used_sl", "used_lop")
+            .first()
+        )
+        context["my_leaves"] = self._rows(
+            Leave.objects.filter(employee=self.user)
+            .order_by("-from_date")
+            .values("approved_by__email", *leave_fields)
+        )
 
         if self.role in ["admin", "hr"]:
-            # Admin/HR can see all leave data
+            # Admin/HR get counts, recent applications and the heaviest users
+            # rather than every leave and balance row
+            recent_leaves = Leave.objects.filter(from_date__gte=self._recent_since())
             context["pending_leaves"] = Leave.objects.filter(status="pending").count()
             context["total_employees"] = Users.objects.filter(role="employee").count()
-            context["all_employees_leave_balances"] = (
-                {
-                    "employee": leave_balance.employee,
-                    "year": leave_balance.year,
-                    "pl_leave": leave_balance.pl,
-                    "sl_leave": leave_balance.sl,
-                    "lop_leave": leave_balance.lop,
-                    "used_pl": leave_balance.used_pl,
-                    "used_sl": leave_balance.used_sl,
-                    "used_lop": leave_balance.used_lop,
-                }
-                for leave_balance in LeaveBalance.objects.all()
+            context["recent_leave_status_counts"] = {
+                row["status"]: row["count"]
+                for row in recent_leaves.values("status")
+                .annotate(count=Count("id"))
+                .order_by()
+            }
+            context["pending_leave_requests"] = self._rows(
+                Leave.objects.filter(status="pending")
+                .order_by("from_date")
+                .values("employee__first_name", "employee__last_name", *leave_fields)
             )
-            context["all_employees_leaves"] = (
-                {
-                    "employee": leave.employee,
-                    "from_date": leave.from_date,
-                    "to_date": leave.to_date,
-                    "day_part": leave.day_part,
-                    "is_sandwich_applied": leave.is_sandwich_applied,
-                    "leave_type": leave.leave_type,
-                    "status": leave.status,
-                    "total_days": leave.total_days,
-                    "approved_by": leave.approved_by,
-                }
-                for leave in Leave.objects.all()
+            context["recent_leaves"] = self._rows(
+                recent_leaves.order_by("-from_date").values(
+                    "employee__first_name",
+                    "employee__last_name",
+                    "approved_by__email",
+                    *leave_fields,
+                )
+            )
+            context["top_leave_users"] = self._rows(
+                LeaveBalance.objects.filter(year=timezone.now().year)
+                .annotate(used_total=F("used_pl") + F("used_sl") + F("used_lop"))
+                .order_by("-used_total")
+                .values(
+                    "employee__first_name",
+                    "employee__last_name",
+                    "pl",
+                    "sl",
+                    "used_pl",
+                    "used_sl",
+                    "used_lop",
+                    "used_total",
+                ),
+                settings.AI_CONTEXT_TOP_K,
             )
-
-        if self.role == "employee" or self.role in ["admin", "hr"]:
-            # Employee sees own data, admin/hr can see in context of specific queries
-            try:
-                leave_balance = LeaveBalance.objects.get(employee=self.user)
-                leaves = Leave.objects.filter(employee=self.user)
-                context["my_leave_balance"] = {
-                    "employee": leave_balance.employee,
-                    "year": leave_balance.year,
-                    "pl_leave": leave_balance.pl,
-                    "sl_leave": leave_balance.sl,
-                    "lop_leave": leave_balance.lop,
-                    "used_pl": leave_balance.used_pl,
-                    "used_sl": leave_balance.used_sl,
-                    "used_lop": leave_balance.used_lop,
-                }
-                context["my_leaves"] = [
-                    {
-                        "employee": leave.employee,
-                        "from_date": leave.from_date,
-                        "to_date": leave.to_date,
-                        "day_part": leave.day_part,
-                        "is_sandwich_applied": leave.is_sandwich_applied,
-                        "leave_type": leave.leave_type,
-                        "status": leave.status,
-                        "total_days": leave.total_days,
-                        "approved_by": leave.approved_by,
-                    }
-                    for leave in leaves
-                ]
-
-            except LeaveBalance.DoesNotExist:
-                context["my_leave_balance"] = None
-
-        context["extra_details"] = calculate_leave_patterns()
         return context
 
     @database_sync_to_async
     def _get_attendance_context(self) -> Dict[str, Any]:
         """Get attendance-related context."""
         context = {}
+        since = self._recent_since()
+        attendance_fields = (
+            "day",
+            "status",
+            "check_in",
+            "check_out",
+            "work_hours",
+            "break_hours",
+        )
 
         if self.role == "employee":
-            # Employee's own attendance
-            recent_attendance = EmployeeAttendance.objects.filter(
-                employee=self.user
-            ).order_by("-day")
-            context["my_recent_attendance"] = [
-                {
-                    "employee": att.employee.email,
-                    "day": str(att.day),
-                    "status": att.status,
-                    "check_in": att.check_in,
-                    "check_out": att.check_out,
-                    "work_hours": att.work_hours,
-                    "break_hours": att.break_hours,
-                    "break_logs": att.attendance_break_logs.all(),
-                }
-                for att in recent_attendance
-            ]
+            # Employee's own attendance for the recent window
+            my_attendance = EmployeeAttendance.objects.filter(
+                employee=self.user, day__gte=since
+            )
+            context["my_recent_attendance"] = self._rows(
+                my_attendance.order_by("-day")
+                .annotate(break_count=Count("attendance_break_logs"))
+                .values(*attendance_fields, "break_count")
+            )
+            context["my_status_counts"] = {
+                row["status"]: row["count"]
+                for row in my_attendance.values("status")
+                .annotate(count=Count("id"))
+                .order_by()
+            }
         if self.role in ["admin", "hr"]:
-            employees_attendance = EmployeeAttendance.objects.filter(
-                employee__is_active=True
-            ).values(
-                "check_in",
-                "check_out",
-                "status",
-                "work_hours",
-                "break_hours",
-                "day",
-                "employee__first_name",
-                "employee__last_name",
+            recent = EmployeeAttendance.objects.filter(
+                employee__is_active=True, day__gte=since
+            )
+            context["todays_attendance"] = self._rows(
+                EmployeeAttendance.objects.filter(day=timezone.now().date())
+                .order_by("employee__first_name")
+                .values(
+                    "employee__first_name", "employee__last_name", *attendance_fields
+                )
+            )
+            context["recent_status_counts"] = {
+                row["status"]: row["count"]
+                for row in recent.values("status")
+                .annotate(count=Count("id"))
+                .order_by()
+            }
+            context["most_late_comings"] = self._rows(
+                recent.filter(is_late_coming=True)
+                .values("employee__first_name", "employee__last_name")
+                .annotate(count=Count("id"))
+                .order_by("-count"),
+                settings.AI_CONTEXT_TOP_K,
             )
-            employees = EmployeeAttendance.objects.filter(
-                day=timezone.now().date()
-            ).values(
-                "check_in",
-                "check_out",
-                "status",
-                "work_hours",
-                "break_hours",
-                "day",
-                "employee__first_name",
-                "employee__last_name",
+            context["lowest_average_work_hours"] = self._rows(
+                recent.filter(check_out__isnull=False)
+                .values("employee__first_name", "employee__last_name")
+                .annotate(average_work_hours=Avg("work_hours"), days=Count("id"))
+                .order_by("average_work_hours"),
+                settings.AI_CONTEXT_TOP_K,
             )
-            context["todays_attendance"] = list(employees)
-            context["all_attendances"] = list(employees_attendance)
 
-        context["extra_details"] = calculate_attendance_patterns()
         return context
 
-    @staticmethod
-    def _format_payslip(ps):
-        """Format payslip data for context."""
-        return {
-            "employee": ps.employee,
-            "start_date": ps.start_date,
-            "end_date": ps.end_date,
-            "month": ps.month,
-            "days": ps.days,
-            "basic_salary": ps.basic_salary,
-            "hr_allowance": ps.hr_allowance,
-            "special_allowance": ps.special_allowance,
-            "total_earnings": ps.total_earnings,
-            "other_deductions": ps.other_deductions,
-            "leave_deductions": ps.leave_deductions,
-            "tax_deductions": ps.tax_deductions,
-            "total_deductions": ps.total_deductions,
-            "net_salary": ps.net_salary,
-            "pdf_file": ps.pdf_file.url if ps.pdf_file else None,
-        }
-
     @database_sync_to_async
     def _get_payroll_context(self) -> Dict[str, Any]:
         """Get payroll-related context."""
@@ -524,18 +715,34 @@ class AIService:
 
         if self.role == "employee":
             # Employee's own payslips
-            recent_payslips = PaySlip.objects.filter(employee=self.user).order_by(
-                "-created_at"
-            )[:5]
+            recent_payslips = PaySlip.objects.filter(employee=self.user)
+            limit = 5
         else:
             # Admin/HR: show total count and recent payslips
             context["total_payslips_generated"] = PaySlip.objects.count()
-            recent_payslips = PaySlip.objects.all().order_by("-created_at")[:10]
-
-        context["my_recent_payslips"] = [
-            self._format_payslip(ps) for ps in recent_payslips
-        ]
-        context["extra_details"] = calculate_payroll_patterns()
+            recent_payslips = PaySlip.objects.all()
+            limit = 10
+
+        context["my_recent_payslips"] = self._rows(
+            recent_payslips.order_by("-created_at").values(
+                "employee__email",
+                "start_date",
+                "end_date",
+                "month",
+                "days",
+                "basic_salary",
+                "hr_allowance",
+                "special_allowance",
+                "total_earnings",
+                "other_deductions",
+                "leave_deductions",
+                "tax_deductions",
+                "total_deductions",
+                "net_salary",
+                "pdf_file",
+            ),
+            limit,
+        )
         return context
 
     @database_sync_to_async
@@ -554,48 +761,52 @@ class AIService:
             "salary_ctc": self.user.salary_ctc,
             "profile_image": self.user.profile.url if self.user.profile else None,
         }
-
-        context["extra_details"] = calculate_profile_patterns()
         return context
 
     @database_sync_to_async
     def _get_general_context(self) -> Dict[str, Any]:
         """Get general company context based on role."""
         context = {}
+        top_k = settings.AI_CONTEXT_TOP_K
 
         # Common stats for all roles
         company_stats = {
             "total_employees": Users.objects.filter(role="employee").count(),
             "total_departments": Department.objects.count(),
-            "announcements": list(Announcement.objects.values("title", "created_at")),
-            "leave_types": list(LeaveType.objects.values("name", "code")),
-            "holidays": list(Holiday.objects.values("name", "date")),
+            "latest_announcements": self._rows(
+                Announcement.objects.order_by("-created_at").values(
+                    "title", "created_at"
+                ),
+                top_k,
+            ),
+            "leave_types": self._rows(LeaveType.objects.values("name", "code")),
+            "upcoming_holidays": self._rows(
+                Holiday.objects.filter(date__gte=timezone.now().date())
+                .order_by("date")
+                .values("name", "date"),
+                top_k,
+            ),
         }
 
         # Add admin-specific stats
         if self.role in ["admin", "hr"]:
             company_stats["total_positions"] = Position.objects.count()
-            company_stats["common_data"] = CommonData.objects.first()
+            company_stats["common_data"] = CommonData.objects.values(
+                "name", "company_link", "pl_leave", "sl_leave", "lop_leave"
+            ).first()
 
         context["company_stats"] = company_stats
-        context["extra_details"] = calculate_general_patterns()
         return context
 
     @database_sync_to_async
     def _get_holiday_context(self) -> Dict[str, Any]:
         """Get holiday-related context."""
         context = {}
-
-        if self.role == "employee":
-            context["holidays_data"] = list(
-                Holiday.objects.filter(date__year=timezone.now().year).values(
-                    "name", "date"
-                )
-            )
-        elif self.role in ["admin", "hr"]:
-            context["holidays_data"] = list(Holiday.objects.values("name", "date"))
-
-        context["extra_details"] = calculate_holiday_patterns()
+        context["holidays_data"] = self._rows(
+            Holiday.objects.filter(date__year=timezone.now().year)
+            .order_by("date")
+            .values("name", "date")
+        )
         return context
 
     @database_sync_to_async
@@ -603,30 +814,32 @@ class AIService:
         """Get announcement-related context."""
         context = {}
         # Same query for all roles
-        context["announcements_data"] = list(
-            Announcement.objects.values("title", "description", "date", "created_at")
+        context["announcements_data"] = self._rows(
+            Announcement.objects.order_by("-created_at").values(
+                "title", "description", "date", "created_at"
+            ),
+            settings.AI_CONTEXT_TOP_K,
         )
-        context["extra_details"] = calculate_announcement_patterns()
         return context
 
     @database_sync_to_async
     def _get_department_context(self) -> Dict[str, Any]:
         context = {}
-        context["department_data"] = list(Department.objects.values("name"))
+        context["department_data"] = self._rows(Department.objects.values("name"))
         context["department_count"] = Department.objects.count()
         return context
 
     @database_sync_to_async
     def _get_position_context(self) -> Dict[str, Any]:
         context = {}
-        context["position_data"] = list(Position.objects.values("name"))
+        context["position_data"] = self._rows(Position.objects.values("name"))
         context["position_count"] = Position.objects.count()
         return context
 
     @database_sync_to_async
     def _get_commondata_context(self) -> Dict[str, Any]:
         context = {}
-        context["common_data"] = list(
+        context["common_data"] = self._rows(
             CommonData.objects.values(
                 "name",
                 "company_link",
@@ -635,65 +848,54 @@ class AIService:
                 "sl_leave",
                 "lop_leave",
                 "policy_file",
-                "policy_content",
                 "policy_last_updated",
-            )
+            ),
+            1,
         )
         return context
 
     @database_sync_to_async
     def _get_leave_type_context(self) -> Dict[str, Any]:
         context = {}
-        context["leave_type_data"] = list(LeaveType.objects.values("name", "code"))
+        context["leave_type_data"] = self._rows(
+            LeaveType.objects.values("name", "code")
+        )
         return context
 
     @database_sync_to_async
     def _get_employee_context(self) -> Dict[str, Any]:
         context = {}
+        employee_fields = (
+            "first_name",
+            "last_name",
+            "email",
+            "role",
+            "position__name",
+            "department__name",
+            "joining_date",
+            "birthdate",
+            "salary_ctc",
+            "profile",
+        )
         if self.role == "employee":
-            context["employee_data"] = list(
-                Users.objects.filter(id=self.user.id).values(
-                    "first_name",
-                    "last_name",
-                    "email",
-                    "role",
-                    "position__name",
-                    "department__name",
-                    "joining_date",
-                    "birthdate",
-                    "salary_ctc",
-                    "profile",
-                )
+            context["employee_data"] = self._rows(
+                Users.objects.filter(id=self.user.id).values(*employee_fields)
             )
         elif self.role in ["admin", "hr"]:
-            context["employee_data"] = list(
-                Users.objects.filter(role="employee").values(
-                    "first_name",
-                    "last_name",
-                    "email",
-                    "role",
-                    "position__name",
-                    "department__name",
-                    "joining_date",
-                    "birthdate",
-                    "salary_ctc",
-                    "profile",
-                )
+            employees = Users.objects.filter(role="employee")
+            context["employee_count"] = employees.count()
+            context["employee_data"] = self._rows(
+                employees.order_by("first_name").values(*employee_fields)
             )
-
-        context["extra_details"] = calculate_employee_patterns()
         return context
 
     @database_sync_to_async
     def _get_handbook_context(self) -> Dict[str, Any]:
+        # The handbook text itself goes into the prompt's handbook section,
+        # trimmed to the passages relevant to the question
         context = {}
         context["handbook_data"] = list(
-            CommonData.objects.values(
-                "handbook_file",
-                "handbook_content",
-                "handbook_content_html",
-                "handbook_last_updated",
-            )
+            CommonData.objects.values("handbook_file", "handbook_last_updated")
         )
         return context
 
@@ -705,8 +907,14 @@ class AIService:
         return context
 
     def _build_prompt(
-        self, message: str, context: Dict[str, Any], intent: str, conversation: str
-    ) -> str:
+        self,
+        message: str,
+        context: Dict[str, Any],
+        intent: list,
+        history: list,
+        query_logs: list,
+        handbook_sections: str,
+    ) -> PromptBuilder:
         """Build prompt using system context, intent template, HRMS data, and conversation history."""
 
         # Role-based system context
@@ -715,52 +923,15 @@ class AIService:
         )
 
         # Intent-specific instructions
-        intent_template = PromptTemplates.get_template_for_intent(str(intent))
-
-        # Additional knowledge sources
-        query_logs = self.get_ai_query_logs()
-        handbook_data = self.get_handbook_details()
-        conversation_data = self.get_conversation_data(conversation)
-        db_schema = self.get_db_schema()
-
-        prompt = f"""
-        {system_context}
-
-        USER INPUT
-        User Question: {message}
-        Detected Intent: {intent}
-
-        INTENT-SPECIFIC INSTRUCTION
-        {intent_template}
-
-        HRMS DATABASE CONTEXT
-        Relevant HRMS Data:
-        {context}
-
-        Company HRMS Handbook (Policies, Leave Rules, Sandwich Leave, etc.):
-        {handbook_data}
-
-        DB SCHEMA
-        This refers to database schema. and make understand the structure and
-        architecture to LLM model.
-        {db_schema}
-
-        PREVIOUS LEARNING DATA
-        Previous Query Logs:
-        {query_logs}
-
-        - Learn from past responses
-        - Consider user feedback priority (5 to 1 scale)
-        - Improve clarity, accuracy, and response quality
-
-        CONVERSATION HISTORY
-        Same Conversation Context:
-        {conversation_data}
+        intent_template = "\n".join(
+            dict.fromkeys(PromptTemplates.get_template_for_intent(i) for i in intent)
+        )
 
-        - Use this to maintain continuity
-        - Understand user's ongoing requirement
-        - Avoid repeating previously provided information
+        # Additional knowledge sources, each cut to its token budget
+        model_labels = models_for_intents(intent)
+        db_schema = schema_digest(model_labels)
 
+        guidelines = """
         RESPONSE GUIDELINES
 
         ROLE & PURPOSE:
@@ -804,12 +975,9 @@ class AIService:
         - Maintain continuity.
         - If there's start_date and no end_date for leave or anything, then its easy
           guessing that it must be for one day only.
-        - Suggest helpful next steps based on previous queries.
-        (Example: suggest next month's leaves after leave inquiry.)
 
         USER EXPERIENCE ENHANCEMENTS:
         - Appreciate thoughtful questions.
-        - Offer relevant suggestions connected to past queries.
         - Respond quickly and efficiently.
 
         FOLLOW-UP QUESTIONS (MANDATORY):
@@ -822,26 +990,82 @@ class AIService:
         - Plain text only
         - Do NOT provide answers
         - Be prepared with answers internally
-
         """
-        return prompt
+        if history or query_logs:
+            # Only when the prompt carries them; cached answers are built
+            # without either
+            guidelines += """
+        PAST QUERIES:
+        - Suggest helpful next steps based on previous queries.
+        (Example: suggest next month's leaves after leave inquiry.)
+        - Offer relevant suggestions connected to past queries.
+        """
 
-    def _generate_response(
-        self, message: str, context: Dict[str, Any], intent: str, conversation: str
-    ) -> str:
+        builder = PromptBuilder()
+        builder.add("system", system_context)
+        builder.add(
+            "question",
+            f"User Question: {message}\nDetected Intent: {intent}",
+            heading="USER INPUT",
+        )
+        builder.add("intent", intent_template, heading="INTENT-SPECIFIC INSTRUCTION")
+        builder.add(
+            "context",
+            fit_context(context, SECTION_BUDGETS["context"]),
+            heading="HRMS DATABASE CONTEXT\nRelevant HRMS Data:",
+        )
+        builder.add(
+            "history",
+            summarize_history(history),
+            heading="CONVERSATION HISTORY\n"
+            "Use this to maintain continuity and avoid repeating information:",
+        )
+        builder.add(
+            "handbook",
+            handbook_sections,
+            heading="Company Handbook and Policy, sections relevant to the question:",
+        )
+        builder.add(
+            "schema",
+            db_schema,
+            heading="DB SCHEMA\nTables relevant to the question:",
+        )
+        builder.add(
+            "query_logs",
+            self._format_query_logs(query_logs),
+            heading="PREVIOUS LEARNING DATA\n"
+            "Recent queries and user ratings (5 to 1 scale), learn from them:",
+        )
+        builder.add("guidelines", guidelines)
+        return builder
+
+    async def _generate_response(
+        self,
+        message: str,
+        context: Dict[str, Any],
+        intent: list,
+        history: list,
+        query_logs: list,
+        handbook_sections: str,
+        on_token=None,
+    ) -> tuple:
         """Generate AI response based on context and intent using structured templates."""
         logger.debug(f"Generating response for intent: {intent}")
 
         # Build structured prompt with templates
-        prompt = self._build_prompt(message, context, intent, conversation)
+        builder = self._build_prompt(
+            message, context, intent, history, query_logs, handbook_sections
+        )
 
         try:
-            llm = self._get_llm()
-            response = llm.generate(prompt)
+            response = await self._llm_generate("response", builder, on_token)
             return response
         except Exception as e:
             logger.error(f"Error generating AI response: {str(e)}")
-            return "I'm having trouble generating a response right now. Please try again in a moment."
+            return (
+                "I'm having trouble generating a response right now. Please try again in a moment.",
+                None,
+            )
 
     def _generate_title_with_llm(self, message: str) -> str:
         """Generate a concise title from the user's message using LLM"""
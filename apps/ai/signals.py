@@ -0,0 +1,104 @@
+from celery import current_app
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+from apps.ai.analytics import record_change
+from apps.ai.handbook import SOURCE_FIELDS
+from apps.ai.response_cache import bump_data_version
+from apps.ai.schema import clear_schema_cache
+from apps.attendance.models import AttendanceBreakLogs, EmployeeAttendance
+from apps.employee.models import LeaveBalance, PaySlip
+from apps.superadmin.models import (
+    Announcement,
+    CommonData,
+    Department,
+    Holiday,
+    Leave,
+    LeaveType,
+    Position,
+    Users,
+)
+
+# Models whose changes make an analytics snapshot stale
+SNAPSHOT_SOURCES = {
+    Leave: "leave",
+    LeaveBalance: "leave",
+    EmployeeAttendance: "attendance",
+    AttendanceBreakLogs: "attendance",
+    PaySlip: "payroll",
+}
+
+# Models whose changes make cached AI answers of a data domain stale
+RESPONSE_CACHE_SOURCES = {
+    Leave: "leave",
+    LeaveBalance: "leave",
+    LeaveType: "leave",
+    EmployeeAttendance: "attendance",
+    AttendanceBreakLogs: "attendance",
+    PaySlip: "payroll",
+    Holiday: "holiday",
+    Announcement: "announcement",
+    Users: "employee",
+    Department: "employee",
+    Position: "employee",
+    CommonData: "company",
+}
+
+
+def count_snapshot_change(sender, **kwargs):
+    record_change(SNAPSHOT_SOURCES[sender])
+
+
+def expire_cached_responses(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no AI answer depends on
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    bump_data_version(RESPONSE_CACHE_SOURCES[sender])
+
+
+def queue_handbook_index(sender, update_fields=None, **kwargs):
+    if update_fields and not set(SOURCE_FIELDS.values()).intersection(update_fields):
+        return
+
+    def send():
+        try:
+            current_app.send_task("apps.ai.tasks.build_ai_handbook_index")
+        except Exception as e:
+            print(f"Could not queue handbook indexing: {e}")
+
+    transaction.on_commit(send)
+
+
+for model in SNAPSHOT_SOURCES:
+    post_save.connect(
+        count_snapshot_change,
+        sender=model,
+        dispatch_uid=f"ai_analytics_{model.__name__}_saved",
+    )
+    post_delete.connect(
+        count_snapshot_change,
+        sender=model,
+        dispatch_uid=f"ai_analytics_{model.__name__}_deleted",
+    )
+
+for model in RESPONSE_CACHE_SOURCES:
+    post_save.connect(
+        expire_cached_responses,
+        sender=model,
+        dispatch_uid=f"ai_response_cache_{model.__name__}_saved",
+    )
+    post_delete.connect(
+        expire_cached_responses,
+        sender=model,
+        dispatch_uid=f"ai_response_cache_{model.__name__}_deleted",
+    )
+
+post_save.connect(
+    queue_handbook_index, sender=CommonData, dispatch_uid="ai_handbook_index_saved"
+)
+post_delete.connect(
+    queue_handbook_index, sender=CommonData, dispatch_uid="ai_handbook_index_deleted"
+)
+
+# The schema digest only changes with migrations
+post_migrate.connect(clear_schema_cache, dispatch_uid="ai_schema_digest_migrated")
@@ -0,0 +1,43 @@
+from celery import shared_task
+
+from apps.ai.analytics import SNAPSHOT_CALCULATORS, prune_snapshots, refresh_snapshot
+from apps.ai.handbook import build_index
+from apps.ai.intent import train_intent_model
+from apps.ai.response_cache import bump_data_version
+from apps.superadmin.models import CommonData
+
+
+@shared_task
+def refresh_ai_analytics_snapshots():
+    """Recompute every AI analytics snapshot for today and drop old ones."""
+    for kind in SNAPSHOT_CALCULATORS:
+        refresh_snapshot(kind)
+    pruned = prune_snapshots()
+    print(f"Refreshed AI analytics snapshots, pruned {pruned} old snapshots")
+    return list(SNAPSHOT_CALCULATORS)
+
+
+@shared_task
+def refresh_ai_analytics_snapshot(kind):
+    """Recompute one snapshot after enough of its data has changed."""
+    refresh_snapshot(kind)
+    return kind
+
+
+@shared_task
+def train_ai_intent_model():
+    """Retrain the local intent classifier's TF-IDF model from query logs."""
+    samples = train_intent_model()
+    print(f"Trained AI intent model on {samples} logged queries")
+    return samples
+
+
+@shared_task
+def build_ai_handbook_index():
+    """Re-chunk and re-index the handbook and policy after their text changed."""
+    common_data = CommonData.objects.first() or CommonData()
+    chunks = build_index(common_data)
+    # Cached answers may quote the previous text
+    bump_data_version("company")
+    print(f"Indexed {chunks} handbook and policy chunks")
+    return chunks
@@ -1,3 +1,304 @@
-# from django.test import TestCase
+import asyncio
+import json
 
-# Create your tests here.
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.ai.hugging_face import AsyncHuggingFaceLLM
+from apps.ai.models import AIConversation, AIMessage, AIQueryLog
+from apps.ai.prompt_budget import estimate_tokens, fit_context
+from apps.ai.response_cache import ResponseCache
+from apps.ai.services import AIService
+from apps.superadmin.models import Department, Position, Users
+
+# Queries each context builder may run, per role. Builders aggregate and cap
+# their rows in the database, so these counts do not grow with the data
+CONTEXT_QUERY_BUDGETS = {
+    "_get_leave_context": {"admin": 8, "employee": 2},
+    "_get_attendance_context": {"admin": 4, "employee": 2},
+    "_get_payroll_context": {"admin": 2, "employee": 1},
+    "_get_profile_context": {"admin": 2, "employee": 2},
+    "_get_general_context": {"admin": 7, "employee": 5},
+    "_get_holiday_context": {"admin": 1, "employee": 1},
+    "_get_announcement_context": {"admin": 1, "employee": 1},
+    "_get_department_context": {"admin": 2, "employee": 2},
+    "_get_position_context": {"admin": 2, "employee": 2},
+    "_get_commondata_context": {"admin": 1, "employee": 1},
+    "_get_leave_type_context": {"admin": 1, "employee": 1},
+    "_get_employee_context": {"admin": 2, "employee": 1},
+    "_get_handbook_context": {"admin": 1, "employee": 1},
+}
+
+
+class ContextBuilderQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Engineering")
+        position = Position.objects.create(name="Developer")
+        for role in ("admin", "employee"):
+            Users.objects.create(
+                email=f"{role}@example.com",
+                role=role,
+                department=department,
+                position=position,
+            )
+
+    def test_context_builders_stay_within_query_budget(self):
+        for builder, budgets in CONTEXT_QUERY_BUDGETS.items():
+            for role, expected in budgets.items():
+                # Fresh instance so related objects are not already cached
+                service = AIService(Users.objects.get(role=role))
+                with self.subTest(builder=builder, role=role):
+                    with self.assertNumQueries(expected):
+                        # The sync function behind database_sync_to_async
+                        vars(AIService)[builder].func(service)
+
+
+class FitContextTests(TestCase):
+    def test_later_keys_keep_a_share_of_the_budget(self):
+        context = {
+            "my_leave_balance": {"pl": 3, "sl": 2},
+            "recent_leaves": [{"employee__first_name": "A" * 40}] * 200,
+            "extra_details": {"leave_inquiry": {"pending": 4}},
+        }
+
+        fitted = fit_context(context, 300)
+
+        self.assertLessEqual(estimate_tokens(fitted), 300)
+        lines = fitted.split("\n")
+        self.assertTrue(lines[0].startswith("my_leave_balance: "))
+        self.assertIn("more rows omitted", lines[1])
+        self.assertEqual(lines[2], "extra_details: {'leave_inquiry': {'pending': 4}}")
+
+    def test_small_context_is_rendered_whole(self):
+        self.assertEqual(
+            fit_context({"pending_leaves": 2, "my_leaves": []}, 1500),
+            "pending_leaves: 2\nmy_leaves: []",
+        )
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Users.objects.create(email="cache@example.com", role="employee")
+
+    def setUp(self):
+        self.cache = ResponseCache(timeout=60, similarity=0.6)
+
+    def test_rewording_with_filler_words_reuses_the_answer(self):
+        self.cache.set(
+            self.user, ["leave_inquiry"], "what is my leave balance", "4", 2.0
+        )
+
+        entry, similarity = self.cache.get(
+            self.user, ["leave_inquiry"], "what's my leave balance please"
+        )
+
+        self.assertEqual(entry["response"], "4")
+        self.assertLess(similarity, 1.0)
+
+    def test_different_dates_never_match(self):
+        self.cache.set(
+            self.user, ["payroll_inquiry"], "show my payslip for january 2025", "x", 2.0
+        )
+        self.cache.set(
+            self.user, ["attendance_inquiry"], "hours worked on 12 march", "y", 2.0
+        )
+
+        self.assertIsNone(
+            self.cache.get(
+                self.user, ["payroll_inquiry"], "show my payslip for january 2024"
+            )
+        )
+        self.assertIsNone(
+            self.cache.get(
+                self.user, ["attendance_inquiry"], "hours worked on 13 march"
+            )
+        )
+
+
+class PromptRecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        return f"answer {len(self.prompts)}", 1.5
+
+
+class CachedAnswerHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Users.objects.create(email="first@example.com", role="employee")
+        cls.second = Users.objects.create(email="second@example.com", role="employee")
+        cls.conversation = AIConversation.objects.create(
+            user=cls.first, session_id="first-session"
+        )
+        message = AIMessage.objects.create(
+            conversation=cls.conversation,
+            message_type="user",
+            content="I am planning my wedding in Goa",
+        )
+        AIQueryLog.objects.create(
+            user=cls.first,
+            ai_message=message,
+            query="wedding leave",
+            intent="leave_inquiry",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.llm = PromptRecordingLLM()
+        AIService._async_llm_instance = self.llm
+
+    def tearDown(self):
+        AIService._async_llm_instance = None
+
+    async def test_role_cached_answer_carries_no_user_history(self):
+        question = "when is the next holiday"
+        first = await AIService(self.first).process_query(
+            question, self.conversation.session_id
+        )
+        second = await AIService(self.second).process_query(question)
+
+        self.assertEqual(len(self.llm.prompts), 1)
+        self.assertEqual(second["response"][0], first["response"][0])
+        prompt = self.llm.prompts[0]
+        self.assertNotIn("Goa", prompt)
+        self.assertNotIn("PREVIOUS LEARNING DATA", prompt)
+        self.assertNotIn("previous queries", prompt)
+
+    async def test_follow_up_prompt_keeps_history(self):
+        await AIService(self.first).process_query(
+            "what about the one after that", self.conversation.session_id
+        )
+
+        self.assertIn("Goa", self.llm.prompts[-1])
+
+
+def completion(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def event_stream(*deltas):
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": delta}}]})
+        for delta in deltas
+    ]
+    return httpx.Response(200, text="\n\n".join(events + ["data: [DONE]"]) + "\n\n")
+
+
+@override_settings(
+    HF_API_URL="https://llm.test/v1/chat/completions",
+    AI_LLM_MAX_RETRIES=2,
+    AI_LLM_RETRY_BACKOFF_SECONDS=0,
+    AI_LLM_MAX_CONCURRENCY=2,
+)
+class AsyncHuggingFaceLLMTests(SimpleTestCase):
+    def setUp(self):
+        self.requests = []
+
+    def tearDown(self):
+        AsyncHuggingFaceLLM._client = None
+        AsyncHuggingFaceLLM._semaphore = None
+        AsyncHuggingFaceLLM._loop = None
+
+    def use_responses(self, *responses):
+        """Answer successive requests with ``responses`` on the running loop."""
+        responses = list(responses)
+
+        def handler(request):
+            self.requests.append(request)
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.use_handler(handler)
+
+    def use_handler(self, handler):
+        AsyncHuggingFaceLLM._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        AsyncHuggingFaceLLM._semaphore = asyncio.Semaphore(
+            settings.AI_LLM_MAX_CONCURRENCY
+        )
+        AsyncHuggingFaceLLM._loop = asyncio.get_running_loop()
+
+    async def collect(self, llm, prompt):
+        return [delta async for delta in llm.stream(prompt)]
+
+    async def test_generate_returns_content(self):
+        self.use_responses(completion("  You have 4 PL left.  "))
+
+        text, duration = await AsyncHuggingFaceLLM().generate("leave balance?")
+
+        self.assertEqual(text, "You have 4 PL left.")
+        self.assertGreaterEqual(duration, 0)
+        body = json.loads(self.requests[0].content)
+        self.assertEqual(body["messages"][1]["content"], "leave balance?")
+        self.assertNotIn("stream", body)
+
+    async def test_generate_retries_transient_failures(self):
+        self.use_responses(
+            httpx.Response(503),
+            httpx.ConnectError("connection refused"),
+            completion("ok"),
+        )
+
+        text, _ = await AsyncHuggingFaceLLM().generate("hi")
+
+        self.assertEqual(text, "ok")
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_generate_gives_up_after_max_retries(self):
+        self.use_responses(*[httpx.Response(429)] * 3)
+
+        with self.assertRaises(RuntimeError):
+            await AsyncHuggingFaceLLM().generate("hi")
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_generate_does_not_retry_client_errors(self):
+        self.use_responses(httpx.Response(400, text="bad model"))
+
+        with self.assertLogs("apps.ai.hugging_face", "ERROR"):
+            with self.assertRaises(RuntimeError):
+                await AsyncHuggingFaceLLM().generate("hi")
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_stream_yields_deltas_until_done(self):
+        self.use_responses(event_stream("You have ", "", "4 PL left."))
+
+        deltas = await self.collect(AsyncHuggingFaceLLM(), "leave balance?")
+
+        self.assertEqual(deltas, ["You have ", "4 PL left."])
+        self.assertTrue(json.loads(self.requests[0].content)["stream"])
+
+    async def test_stream_retries_before_first_token(self):
+        self.use_responses(httpx.Response(502), event_stream("ok"))
+
+        deltas = await self.collect(AsyncHuggingFaceLLM(), "hi")
+
+        self.assertEqual(deltas, ["ok"])
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_concurrent_requests_are_capped_by_the_semaphore(self):
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return completion("ok")
+
+        self.use_handler(handler)
+        llm = AsyncHuggingFaceLLM()
+
+        results = await asyncio.gather(*(llm.generate("hi") for _ in range(6)))
+
+        self.assertEqual([text for text, _ in results], ["ok"] * 6)
+        self.assertEqual(peak, 2)
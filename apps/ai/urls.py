@@ -1,12 +1,34 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import AIAnalyticsViewSet, AIConversationViewSet
+from .views import (
+    AIAnalyticsViewSet,
+    AIConversationViewSet,
+    AIExecuteToolView,
+    AIQuickQueryView,
+    AISendMessageView,
+)
 
 router = DefaultRouter()
 router.register(r"conversations", AIConversationViewSet, basename="ai-conversations")
 router.register(r"analytics", AIAnalyticsViewSet, basename="ai-analytics")
 
 urlpatterns = [
+    # Async views, served on the event loop; kept at their former viewset URLs
+    path(
+        "conversations/<int:pk>/send_message/",
+        AISendMessageView.as_view(),
+        name="ai-conversations-send-message",
+    ),
+    path(
+        "conversations/quick_query/",
+        AIQuickQueryView.as_view(),
+        name="ai-conversations-quick-query",
+    ),
+    path(
+        "conversations/execute_tool/",
+        AIExecuteToolView.as_view(),
+        name="ai-conversations-execute-tool",
+    ),
     path("", include(router.urls)),
 ]
@@ -240,7 +240,6 @@ def calculate_leave_patterns():
             "lop_heavy_users": lop_heavy_users,
         },
     }
-    print(f"==>> context: {context}")
     return context
 
 
@@ -344,7 +343,6 @@ def calculate_attendance_patterns():
             "paused_not_resumed": paused_not_resumed,
         },
     }
-    print(f"==>> context: {context}")
     return context
 
 
@@ -433,7 +431,6 @@ def calculate_payroll_patterns():
             "zero_net_salary_payslips": zero_net_salary,
         },
     }
-    print(f"==>> context: {context}")
     return context
 
 
@@ -522,7 +519,6 @@ def calculate_profile_patterns():
             "salary_bands": salary_bands,
         },
     }
-    print(f"==>> context: {context}")
     return context
 
 
@@ -596,7 +592,6 @@ def calculate_holiday_patterns():
         "average_gap_between_holidays_days": avg_gap,
         "holiday_dense_months": dense_months,
     }
-    print(f"==>> context: {context}")
     return context
 
 
@@ -620,7 +615,6 @@ def calculate_announcement_patterns():
         "announcement_count": announcement_count,
         "annoucement_montly": month_wise,
     }
-    print(f"==>> context: {context}")
     return context
 
 
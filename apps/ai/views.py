@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from django.db.models import Avg
@@ -13,6 +12,7 @@ from apps.ai.serializers import (
     AIQueryLogSerializer,
 )
 from apps.ai.services import AIService
+from apps.base.async_view import AsyncAPIView
 from apps.base.permissions import IsAuthenticated
 
 logger = logging.getLogger(__name__)
@@ -44,10 +44,41 @@ class AIConversationViewSet(viewsets.ModelViewSet):
         serializer = AIMessageSerializer(messages, many=True)
         return Response(serializer.data)
 
-    @action(detail=True, methods=["post"])
-    def send_message(self, request, pk=None):
-        """Send message to AI in specific conversation."""
-        conversation = self.get_object()
+    @action(detail=False, methods=["get"])
+    def available_tools(self, request):
+        """Get all MCP tools available for the user's role."""
+        try:
+            ai_service = AIService(request.user)
+            tools_data = ai_service.get_user_available_tools()
+
+            return Response(
+                {
+                    "success": True,
+                    "data": tools_data,
+                }
+            )
+        except Exception as e:
+            logger.exception(
+                f"Error fetching available tools for user {request.user.id}"
+            )
+            return Response(
+                {"error": f"Failed to fetch available tools: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class AISendMessageView(AsyncAPIView):
+    """Send message to AI in a specific conversation."""
+
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request, pk=None):
+        try:
+            conversation = await AIConversation.objects.aget(pk=pk, user=request.user)
+        except AIConversation.DoesNotExist:
+            return Response(
+                {"error": "Conversation not found"}, status=status.HTTP_404_NOT_FOUND
+            )
         message = request.data.get("message", "").strip()
 
         if not message:
@@ -57,16 +88,9 @@ class AIConversationViewSet(viewsets.ModelViewSet):
 
         try:
             ai_service = AIService(request.user)
-
-            # Run async query processing in event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response_data = loop.run_until_complete(
-                    ai_service.process_query(message, conversation.session_id)
-                )
-            finally:
-                loop.close()
+            response_data = await ai_service.process_query(
+                message, conversation.session_id
+            )
 
             return Response(
                 {
@@ -84,9 +108,13 @@ class AIConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @action(detail=False, methods=["post"])
-    def quick_query(self, request):
-        """Send a quick query without creating a persistent conversation."""
+
+class AIQuickQueryView(AsyncAPIView):
+    """Send a quick query without creating a persistent conversation."""
+
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request):
         message = request.data.get("message", "").strip()
 
         if not message:
@@ -96,16 +124,7 @@ class AIConversationViewSet(viewsets.ModelViewSet):
 
         try:
             ai_service = AIService(request.user)
-
-            # Run async query processing in event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response_data = loop.run_until_complete(
-                    ai_service.process_query(message)
-                )
-            finally:
-                loop.close()
+            response_data = await ai_service.process_query(message)
 
             return Response(
                 {
@@ -123,31 +142,13 @@ class AIConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    @action(detail=False, methods=["get"])
-    def available_tools(self, request):
-        """Get all MCP tools available for the user's role."""
-        try:
-            ai_service = AIService(request.user)
-            tools_data = ai_service.get_user_available_tools()
 
-            return Response(
-                {
-                    "success": True,
-                    "data": tools_data,
-                }
-            )
-        except Exception as e:
-            logger.exception(
-                f"Error fetching available tools for user {request.user.id}"
-            )
-            return Response(
-                {"error": f"Failed to fetch available tools: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+class AIExecuteToolView(AsyncAPIView):
+    """Execute a specific MCP tool based on user role and parameters."""
 
-    @action(detail=False, methods=["post"])
-    def execute_tool(self, request):
-        """Execute a specific MCP tool based on user role and parameters."""
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request):
         tool_name = request.data.get("tool_name", "").strip()
         parameters = request.data.get("parameters", {})
 
@@ -159,16 +160,7 @@ class AIConversationViewSet(viewsets.ModelViewSet):
 
         try:
             ai_service = AIService(request.user)
-
-            # Run async task execution in event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(
-                    ai_service.execute_user_task(tool_name, parameters)
-                )
-            finally:
-                loop.close()
+            result = await ai_service.execute_user_task(tool_name, parameters)
 
             return Response(
                 {
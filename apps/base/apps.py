@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class BaseConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.base"
+    label = "base"
+
+    def ready(self):
+        # Each app registers its outbox event handlers in its outbox module
+        autodiscover_modules("outbox")
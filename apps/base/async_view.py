@@ -0,0 +1,46 @@
+"""
+Base APIView for endpoints that await I/O-bound work.
+
+Django serves coroutine views directly on the ASGI server's event loop, so
+a request waiting on the LLM or another upstream no longer holds the thread
+that runs sync views. DRF views are sync only; ``AsyncAPIView`` keeps DRF's
+request parsing, authentication, permissions, throttling and exception
+handling, running the sync checks in a thread and awaiting the handler.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView whose ``get``/``post``/... handlers are coroutines."""
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Async counterpart of ``APIView.dispatch``."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and permission checks may query the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -26,3 +26,23 @@ def send_fcm_notification(message):
         print(f"Notification sent successfully: {response}")
     except Exception as exc:
         print(f"Failed to send notification: {exc}")
+
+
+# messaging.send_each() rejects requests with more than 500 messages
+FCM_BATCH_LIMIT = 500
+
+
+def send_fcm_notifications(messages):
+    """Send several FCM messages in batch requests of at most FCM_BATCH_LIMIT."""
+    if not firebase_admin._apps or not messages:
+        return
+
+    for start in range(0, len(messages), FCM_BATCH_LIMIT):
+        try:
+            response = messaging.send_each(messages[start : start + FCM_BATCH_LIMIT])
+            print(
+                f"Notifications sent: {response.success_count} ok, "
+                f"{response.failure_count} failed"
+            )
+        except Exception as exc:
+            print(f"Failed to send notifications: {exc}")
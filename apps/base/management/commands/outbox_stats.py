@@ -0,0 +1,43 @@
+"""Django management command to report transactional outbox backlog and lag."""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.base.outbox import outbox_stats
+
+
+class Command(BaseCommand):
+    help = "Show pending outbox events per type, dead events and drain lag"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Print raw JSON")
+
+    def handle(self, *args, **options):
+        stats = outbox_stats()
+        if options["json"]:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        self.stdout.write(self.style.NOTICE("Outbox backlog"))
+        if not stats["pending"]:
+            self.stdout.write("  no pending events")
+        for event_type, row in sorted(stats["pending"].items()):
+            self.stdout.write(
+                f"  {event_type}: {row['pending']} pending, "
+                f"oldest {row['oldest_seconds']:.1f}s"
+            )
+        self.stdout.write(f"  dead (max attempts reached): {stats['dead']}")
+
+        drain = stats["drain"]
+        if drain:
+            self.stdout.write(self.style.NOTICE("Drain"))
+            for key in (
+                "last_drain_at",
+                "processed",
+                "failed",
+                "last_max_lag_seconds",
+                "last_avg_lag_seconds",
+            ):
+                if key in drain:
+                    self.stdout.write(f"  {key}: {drain[key]}")
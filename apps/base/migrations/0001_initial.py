@@ -0,0 +1,55 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_type", models.CharField(max_length=100)),
+                ("payload", models.JSONField(default=dict)),
+                (
+                    "idempotency_key",
+                    models.CharField(max_length=255, null=True, unique=True),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("processed_at__isnull", True)),
+                        fields=["available_at", "id"],
+                        name="base_outbox_pending_idx",
+                    ),
+                    models.Index(
+                        fields=["processed_at"], name="base_outbox_process_be05ba_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
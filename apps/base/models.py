@@ -60,3 +60,32 @@ class BaseModel(models.Model):
     def force_delete(self):
         """Permanently delete the record from database."""
         super().delete()
+
+
+class OutboxEvent(models.Model):
+    """Side effect recorded in the producer's transaction and run by a worker."""
+
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Events sharing a key are only ever recorded (and delivered) once
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    available_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                condition=models.Q(processed_at__isnull=True),
+                name="base_outbox_pending_idx",
+            ),
+            models.Index(fields=["processed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk}"
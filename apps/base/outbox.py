@@ -0,0 +1,227 @@
+"""
+Transactional outbox for cross-subsystem side effects.
+
+Producers (views, signals, tasks) call ``publish`` inside their own
+transaction; it only writes an ``OutboxEvent`` row, so the event exists if
+and only if the producer's data was committed. After commit a drain task is
+scheduled, which claims pending events in batches and hands each event type
+to the handler registered for it with ``outbox_handler``. Claimed events
+are leased rather than kept locked, so handlers (mail, pushes) run without
+holding row locks. Failed events are retried with exponential backoff, and
+events published with the same idempotency key are recorded, and therefore
+delivered, only once.
+
+Handlers live in each app's ``outbox`` module, which is imported at startup:
+
+    @outbox_handler("chat.message_created", required=("message_id",))
+    def handle_message_created(payloads):
+        ...
+"""
+
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from apps.base.models import OutboxEvent
+
+DRAIN_SCHEDULED_KEY = "outbox:drain_scheduled"
+METRICS_KEY = "outbox:metrics"
+
+# {event_type: {"handler": callable, "required": tuple}}
+_handlers = {}
+
+
+def outbox_handler(event_type, required=(), atomic=True):
+    """
+    Register a batch handler for ``event_type``.
+
+    The handler receives the list of payloads claimed in one batch. If it
+    raises, every event of the batch is retried. Handlers whose items can
+    fail independently return ``{index: error}`` for the failed payloads
+    instead, so only those are retried and the delivered ones are not
+    sent twice.
+
+    Handlers run in a transaction unless ``atomic=False``, which is meant
+    for handlers that write nothing and only hand work to Celery. Slow work
+    (SMTP, PDF rendering) belongs in that task rather than in the handler,
+    so a batch finishes well within ``OUTBOX_LEASE_SECONDS``.
+    """
+
+    def decorator(func):
+        _handlers[event_type] = {
+            "handler": func,
+            "required": tuple(required),
+            "atomic": atomic,
+        }
+        return func
+
+    return decorator
+
+
+def publish(event_type, payload, idempotency_key=None):
+    """Record an event in the current transaction; it is drained after commit."""
+    spec = _handlers.get(event_type)
+    if spec is None:
+        raise ValueError(f"Unknown outbox event type: {event_type}")
+    missing = [key for key in spec["required"] if key not in payload]
+    if missing:
+        raise ValueError(f"{event_type} payload is missing {', '.join(missing)}")
+
+    # ignore_conflicts turns a duplicate idempotency key into a no-op rather
+    # than an error that would abort the producer's transaction
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(
+                event_type=event_type,
+                payload=payload,
+                idempotency_key=idempotency_key,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(schedule_drain)
+
+
+def schedule_drain():
+    """Schedule one drain task for everything committed within the next moment."""
+    countdown = settings.OUTBOX_DRAIN_DELAY_SECONDS
+    if cache.add(DRAIN_SCHEDULED_KEY, 1, countdown + 30):
+        try:
+            current_app.send_task(
+                "apps.base.tasks.drain_outbox_events", countdown=countdown
+            )
+        except Exception as e:
+            cache.delete(DRAIN_SCHEDULED_KEY)
+            print(f"Could not schedule outbox drain: {e}")
+
+
+def drain(batch_size=None):
+    """Run pending events in batches; returns (processed, failed) counts."""
+    # Cleared before reading so anything committed from now on schedules a
+    # fresh drain instead of waiting for the periodic sweep
+    cache.delete(DRAIN_SCHEDULED_KEY)
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+
+    processed = failed = 0
+    while True:
+        events = _claim(batch_size)
+        if not events:
+            break
+
+        by_type = {}
+        for event in events:
+            by_type.setdefault(event.event_type, []).append(event)
+        for event_type, group in by_type.items():
+            delivered = _run_handler(event_type, group)
+            processed += delivered
+            failed += len(group) - delivered
+
+        OutboxEvent.objects.bulk_update(
+            events, ["attempts", "last_error", "available_at", "processed_at"]
+        )
+        _record_metrics(events)
+        if len(events) < batch_size:
+            break
+
+    return processed, failed
+
+
+def _claim(batch_size):
+    """Lease a batch of due events so their handlers run without row locks."""
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True,
+                attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+                available_at__lte=timezone.now(),
+            )[:batch_size]
+        )
+        if events:
+            # Other drains skip leased events; if this worker dies mid-batch
+            # they become due again once the lease runs out
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+                available_at=timezone.now()
+                + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+    return events
+
+
+def _run_handler(event_type, events):
+    """Run one event type's batch; returns how many events were delivered."""
+    try:
+        spec = _handlers.get(event_type)
+        if spec is None:
+            raise LookupError(f"No outbox handler registered for {event_type}")
+        payloads = [event.payload for event in events]
+        if spec["atomic"]:
+            with transaction.atomic():
+                failures = spec["handler"](payloads) or {}
+        else:
+            failures = spec["handler"](payloads) or {}
+    except Exception as e:
+        print(f"Outbox handler for {event_type} failed: {e}")
+        failures = dict.fromkeys(range(len(events)), e)
+
+    now = timezone.now()
+    for index, event in enumerate(events):
+        error = failures.get(index)
+        if error is None:
+            event.processed_at = now
+            continue
+        event.attempts += 1
+        event.last_error = str(error)[:1000]
+        event.available_at = now + timedelta(
+            seconds=settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (event.attempts - 1)
+        )
+    return len(events) - len(failures)
+
+
+def _record_metrics(events):
+    now = timezone.now()
+    lags = [
+        (now - event.created_at).total_seconds()
+        for event in events
+        if event.processed_at
+    ]
+    metrics = cache.get(METRICS_KEY) or {"processed": 0, "failed": 0}
+    metrics["processed"] += len(lags)
+    metrics["failed"] += len(events) - len(lags)
+    metrics["last_drain_at"] = now.isoformat()
+    if lags:
+        metrics["last_max_lag_seconds"] = round(max(lags), 3)
+        metrics["last_avg_lag_seconds"] = round(sum(lags) / len(lags), 3)
+    cache.set(METRICS_KEY, metrics, None)
+
+
+def outbox_stats():
+    """Pending backlog per event type, oldest pending age and drain metrics."""
+    now = timezone.now()
+    pending = {
+        row["event_type"]: {
+            "pending": row["pending"],
+            "oldest_seconds": round((now - row["oldest"]).total_seconds(), 3),
+        }
+        for row in OutboxEvent.objects.filter(processed_at__isnull=True)
+        .values("event_type")
+        .annotate(pending=Count("id"), oldest=Min("created_at"))
+        .order_by()
+    }
+    return {
+        "pending": pending,
+        "dead": OutboxEvent.objects.filter(
+            processed_at__isnull=True, attempts__gte=settings.OUTBOX_MAX_ATTEMPTS
+        ).count(),
+        "drain": cache.get(METRICS_KEY) or {},
+    }
+
+
+def prune(days=None):
+    """Delete processed events older than ``days``; returns the number removed."""
+    days = days if days is not None else settings.OUTBOX_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    return OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()[0]
@@ -5,7 +5,14 @@ Provides standardized pagination with configurable page sizes
 for consistent API response formatting across all endpoints.
 """
 
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -14,3 +21,141 @@ class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+def encode_cursor(timestamp, pk):
+    """Encode a (timestamp, pk) keyset position into an opaque cursor string."""
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor into a (timestamp, pk) tuple, or raise ValueError."""
+    try:
+        raw = urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, pk = raw.rsplit("|", 1)
+        parsed = parse_datetime(timestamp)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if parsed is None:
+        raise ValueError("Invalid cursor")
+    return parsed, int(pk)
+
+
+def keyset_filter(queryset, before=None, after=None, timestamp_field="created_at"):
+    """
+    Filter and order a queryset by (timestamp_field, id) keyset.
+
+    ``before`` walks towards older rows and ``after`` towards newer rows; with
+    neither, the newest rows come first. The queryset is ordered in traversal
+    order (newest first for ``before``/default, oldest first for ``after``).
+    """
+    if after:
+        timestamp, pk = decode_cursor(after)
+        return queryset.filter(
+            Q(**{f"{timestamp_field}__gt": timestamp})
+            | Q(**{timestamp_field: timestamp, "id__gt": pk})
+        ).order_by(timestamp_field, "id")
+
+    if before:
+        timestamp, pk = decode_cursor(before)
+        queryset = queryset.filter(
+            Q(**{f"{timestamp_field}__lt": timestamp})
+            | Q(**{timestamp_field: timestamp, "id__lt": pk})
+        )
+    return queryset.order_by(f"-{timestamp_field}", "-id")
+
+
+def keyset_paginate(
+    queryset, before=None, after=None, limit=50, timestamp_field="created_at"
+):
+    """
+    Slice a queryset by (timestamp_field, id) keyset instead of OFFSET.
+
+    Returns up to ``limit`` rows in traversal order (see ``keyset_filter``)
+    together with a flag telling whether more rows exist in that direction.
+    """
+    queryset = keyset_filter(queryset, before, after, timestamp_field)
+    rows = list(queryset[: limit + 1])
+    has_more = len(rows) > limit
+    return rows[:limit], has_more
+
+
+class KeysetPagination(BasePagination):
+    """
+    Bidirectional keyset pagination on (created_at, id).
+
+    Clients pass ``before``/``after`` cursors taken from a previous response
+    instead of page numbers, so deep scrolling stays an index range scan.
+    Results are always returned newest first; ``before`` points past the
+    oldest row on the page and ``after`` past the newest one.
+    """
+
+    page_size = 50
+    page_size_query_param = "limit"
+    max_page_size = 100
+    timestamp_field = "created_at"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, 0))
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        before = request.query_params.get("before")
+        after = request.query_params.get("after")
+        try:
+            rows, has_more = keyset_paginate(
+                queryset,
+                before=before,
+                after=after,
+                limit=self.get_page_size(request),
+                timestamp_field=self.timestamp_field,
+            )
+        except ValueError as e:
+            raise NotFound(str(e))
+
+        if after:
+            rows.reverse()
+            self.has_older = True
+            self.has_newer = has_more
+        else:
+            self.has_older = has_more
+            self.has_newer = bool(before)
+        self.page = rows
+        return rows
+
+    def _cursor(self, obj):
+        return encode_cursor(getattr(obj, self.timestamp_field), obj.id)
+
+    def get_paginated_response(self, data):
+        newest = self.page[0] if self.page else None
+        oldest = self.page[-1] if self.page else None
+        return Response(
+            OrderedDict(
+                [
+                    ("before", self._cursor(oldest) if oldest else None),
+                    ("after", self._cursor(newest) if newest else None),
+                    ("has_older", self.has_older),
+                    ("has_newer", self.has_newer),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "before": {"type": "string", "nullable": True},
+                "after": {"type": "string", "nullable": True},
+                "has_older": {"type": "boolean"},
+                "has_newer": {"type": "boolean"},
+                "results": schema,
+            },
+        }
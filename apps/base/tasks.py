@@ -0,0 +1,24 @@
+"""
+Celery tasks for draining and pruning the transactional outbox.
+"""
+
+from celery import shared_task
+
+from apps.base.outbox import drain, prune
+
+
+@shared_task
+def drain_outbox_events():
+    """Run side effects recorded in the outbox since the last drain."""
+    processed, failed = drain()
+    if processed or failed:
+        print(f"Outbox drained: {processed} processed, {failed} failed")
+    return {"processed": processed, "failed": failed}
+
+
+@shared_task
+def prune_outbox_events():
+    """Remove processed outbox events past their retention window."""
+    pruned = prune()
+    print(f"Pruned {pruned} processed outbox events")
+    return pruned
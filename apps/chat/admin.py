@@ -9,3 +9,4 @@ admin.site.register(models.Conversation, BaseAdmin)
 admin.site.register(models.Message, BaseAdmin)
 admin.site.register(models.MessageStatus, BaseAdmin)
 admin.site.register(models.MessageReaction, BaseAdmin)
+admin.site.register(models.ChatMediaUpload, BaseAdmin)
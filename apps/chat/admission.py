@@ -0,0 +1,124 @@
+"""
+WebSocket connection admission control.
+
+Protects a daphne worker from reconnect storms (e.g. every browser tab
+reconnecting right after a deploy). Each process admits new sockets through
+a token bucket and caps concurrent sockets per user. Rejected clients are
+accepted just long enough to receive a close code that carries a jittered
+retry hint, so they spread their reconnects out instead of retrying in
+lockstep.
+
+Limits are per worker process; no network round trip is made on the
+connect path.
+"""
+
+import json
+import random
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Close codes 4100-4199 mean "retry after (code - 4100) seconds"
+CLOSE_CODE_RETRY_BASE = 4100
+CLOSE_CODE_RETRY_MAX = 4199
+
+
+class ConnectionAdmission:
+    """Token-bucket admission with per-user concurrent connection caps."""
+
+    def __init__(self, rate=None, burst=None, per_user=None):
+        self.rate = rate or getattr(settings, "WS_ADMISSION_RATE", 200)
+        self.burst = burst or getattr(settings, "WS_ADMISSION_BURST", 400)
+        self.per_user = per_user or getattr(settings, "WS_MAX_CONNECTIONS_PER_USER", 10)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._connections = defaultdict(int)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_admit(self, user_id):
+        """Reserve a slot for ``user_id``; returns (admitted, retry_after_seconds)."""
+        if self._connections[user_id] >= self.per_user:
+            return False, self.retry_hint(base=30)
+
+        self._refill()
+        if self._tokens < 1:
+            # Rejections do not consume tokens: debiting them would let a storm
+            # of refused sockets starve the bucket long after it has passed.
+            # The hint is the time until the next token, spread out by jitter
+            return False, self.retry_hint(
+                base=max(1, int((1 - self._tokens) / self.rate))
+            )
+
+        self._tokens -= 1
+        self._connections[user_id] += 1
+        return True, 0
+
+    def release(self, user_id):
+        """Free the slot held by a socket that was admitted."""
+        if self._connections.get(user_id, 0) <= 1:
+            self._connections.pop(user_id, None)
+        else:
+            self._connections[user_id] -= 1
+
+    def retry_hint(self, base):
+        """Jittered retry delay in seconds that fits in the close-code range."""
+        limit = CLOSE_CODE_RETRY_MAX - CLOSE_CODE_RETRY_BASE
+        jittered = base + random.uniform(0, base / 2 + 2)  # nosec B311
+        return min(limit, max(1, int(jittered)))
+
+    @property
+    def under_pressure(self):
+        """True while the bucket is below half full, i.e. during a connect burst."""
+        self._refill()
+        return self._tokens < self.burst / 2
+
+    def sync_delay(self):
+        """Seconds to defer non-essential connect work; zero outside bursts."""
+        if not self.under_pressure:
+            return 0
+        max_delay = getattr(settings, "WS_DEFERRED_SYNC_MAX_MS", 2000) / 1000
+        return random.uniform(0, max_delay)  # nosec B311
+
+    @property
+    def active_connections(self):
+        return sum(self._connections.values())
+
+
+class AdmissionMixin:
+    """
+    Consumer mixin gating ``connect`` through the process admission layer.
+
+    Call ``await self.admit(user_id)`` before doing any connect work; when it
+    returns False the socket has already been closed with a retry hint.
+    Call ``self.release_admission()`` from ``disconnect``.
+    """
+
+    async def admit(self, user_id):
+        admitted, retry_after = admission.try_admit(user_id)
+        if admitted:
+            self._admitted_user_id = user_id
+            return True
+
+        await self.accept()
+        await self.send(
+            text_data=json.dumps(
+                {"type": "reconnect", "reason": "busy", "retry_after": retry_after}
+            )
+        )
+        await self.close(code=CLOSE_CODE_RETRY_BASE + retry_after)
+        return False
+
+    def release_admission(self):
+        user_id = getattr(self, "_admitted_user_id", None)
+        if user_id is not None:
+            admission.release(user_id)
+            self._admitted_user_id = None
+
+
+# Global instance
+admission = ConnectionAdmission()
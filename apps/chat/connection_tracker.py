@@ -5,7 +5,7 @@ Tracks active WebSocket connections to prevent duplicate notifications
 when users are actively connected to chat conversations.
 """
 
-from typing import Set
+from typing import Dict, Iterable, Set, Tuple
 
 import redis
 from django.conf import settings
@@ -146,6 +146,46 @@ class ChatConnectionTracker:
         except Exception as e:
             print(f"Redis connection error in set_tab_visibility: {e}")
 
+    def get_presence(
+        self, user_ids: Iterable[int], conversation_id: int
+    ) -> Dict[int, Tuple[bool, bool]]:
+        """Return {user_id: (is_connected, is_tab_visible)} in one round trip."""
+        user_ids = list(user_ids)
+        presence = {user_id: (False, False) for user_id in user_ids}
+        if not self.redis_client or not user_ids:
+            return presence
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.sismember(f"chat_connections:{user_id}", str(conversation_id))
+                pipe.get(f"chat_visible:{user_id}:{conversation_id}")
+            results = pipe.execute()
+            for index, user_id in enumerate(user_ids):
+                connected, visible = results[index * 2], results[index * 2 + 1]
+                presence[user_id] = (bool(connected), visible == "1")
+        except Exception as e:
+            print(f"Redis connection error in get_presence: {e}")
+        return presence
+
+    def get_connected_pairs(
+        self, pairs: Iterable[Tuple[int, int]]
+    ) -> Set[Tuple[int, int]]:
+        """Return which (user_id, conversation_id) pairs are connected, in one round trip."""
+        pairs = list(pairs)
+        if not self.redis_client or not pairs:
+            return set()
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for user_id, conversation_id in pairs:
+                pipe.sismember(f"chat_connections:{user_id}", str(conversation_id))
+            results = pipe.execute()
+            return {pair for pair, connected in zip(pairs, results) if connected}
+        except Exception as e:
+            print(f"Redis connection error in get_connected_pairs: {e}")
+            return set()
+
     def get_user_connections(self, user_id: int) -> Set[int]:
         """Get all conversation IDs user is connected to."""
         if not self.redis_client:
@@ -2,9 +2,10 @@
 WebSocket consumer for real-time chat functionality.
 """
 
+import asyncio
 from datetime import timedelta
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
@@ -12,19 +13,23 @@ from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.db.models import Count, OuterRef, Subquery
 from django.utils import timezone
 
+from apps.base.pagination import encode_cursor, keyset_filter
+from apps.chat.admission import AdmissionMixin, admission
 from apps.chat.connection_tracker import chat_tracker
 from apps.chat.models import Conversation, Message, MessageReaction, MessageStatus
+from apps.chat.typing import typing_coalescer
 
 # from apps.notification.models import Notification, NotificationType
 from apps.superadmin.models import Users
 
 
-class ChatConsumer(AsyncJsonWebsocketConsumer):
+class ChatConsumer(AdmissionMixin, AsyncJsonWebsocketConsumer):
     """WebSocket consumer for handling real-time chat operations."""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.is_tab_visible = True
+        self._sync_task = None
 
     async def connect(self):
         """Handle WebSocket connection."""
@@ -33,6 +38,19 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4001)
             return
 
+        if not await self.admit(user.id):
+            return
+
+        try:
+            await self.complete_connect(user)
+        except Exception:
+            # disconnect() is not called for a connect that raised, so give
+            # the admission slot back here or it leaks for the process lifetime
+            self.release_admission()
+            raise
+
+    async def complete_connect(self, user):
+        """Join groups and accept the socket once admission has succeeded."""
         self.user = user
 
         # Join global user group
@@ -49,7 +67,9 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
                 await self.channel_layer.group_add(
                     self.room_group_name, self.channel_name
                 )
-                chat_tracker.add_connection(self.user.id, self.conversation_id)
+                await sync_to_async(chat_tracker.add_connection)(
+                    self.user.id, self.conversation_id
+                )
                 print(
                     f"\n{'='*70}"
                     f"\n✅ USER CONNECTED TO WEBSOCKET"
@@ -62,6 +82,17 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
 
         await self.accept()
         # await self.send_missed_messages()
+        # Unread sync is deferred (jittered during connect bursts) so sockets
+        # that drop straight away never pay for it; clients may also request
+        # it explicitly with {"type": "sync_unread"}
+        self._sync_task = asyncio.create_task(
+            self.deferred_connect_sync(admission.sync_delay())
+        )
+
+    async def deferred_connect_sync(self, delay=0):
+        """Send unread counts and mark the open conversation read."""
+        if delay:
+            await asyncio.sleep(delay)
         await self.send_unread_counts()
 
         # Mark messages as read if in specific conversation
@@ -71,8 +102,20 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
                 self.global_user_group, {"type": "global.unread_update"}
             )
 
+    async def handle_sync_unread(self, content):
+        """Run the connect-time unread sync now if it has not happened yet."""
+        if self._sync_task and not self._sync_task.done():
+            self._sync_task.cancel()
+            self._sync_task = None
+            await self.deferred_connect_sync()
+        else:
+            await self.send_unread_counts()
+
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
+        self.release_admission()
+        if self._sync_task and not self._sync_task.done():
+            self._sync_task.cancel()
         if hasattr(self, "room_group_name"):
             await self.channel_layer.group_discard(
                 self.room_group_name, self.channel_name
@@ -82,7 +125,10 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
                 self.global_user_group, self.channel_name
             )
         if hasattr(self, "user") and hasattr(self, "conversation_id"):
-            chat_tracker.remove_connection(self.user.id, int(self.conversation_id))
+            await sync_to_async(chat_tracker.remove_connection)(
+                self.user.id, int(self.conversation_id)
+            )
+            await typing_coalescer.stop(int(self.conversation_id), self.user.id)
             print(
                 f"\n{'='*70}"
                 f"\n❌ USER DISCONNECTED FROM WEBSOCKET"
@@ -105,6 +151,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             "add_reaction": self.handle_add_reaction,
             "remove_reaction": self.handle_remove_reaction,
             "get_messages": self.handle_get_messages,
+            "sync_unread": self.handle_sync_unread,
             "remove_user": self.handle_remove_user_group,
             "add_user": self.handle_add_user_group,
             # "change_group_name":self.handle_change_group_name,
@@ -311,51 +358,32 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
                     )
 
     async def handle_start_typing(self, content):
-        """Broadcast typing start to all participants."""
-        await self.broadcast_typing(content)
-
-    async def handle_stop_typing(self, content):
-        """Broadcast typing stop to all participants."""
-        await self.broadcast_typing(content)
-
-    async def broadcast_typing(self, data):
-        """Broadcast typing indicator to conversation and global groups."""
-        payload = {
-            "type": data.get("type"),
-            "conversation_id": data.get("conversation_id"),
-            "user": {
-                "id": self.user.id,
-                "email": self.user.email,
-                "first_name": self.user.first_name,
-                "last_name": self.user.last_name,
-            },
-        }
-
-        # Send to conversation group
-        if hasattr(self, "room_group_name"):
-            await self.channel_layer.group_send(
-                self.room_group_name,
+        """Record typing start; broadcasts are coalesced into snapshots."""
+        conversation_id = self._typing_conversation_id(content)
+        if conversation_id:
+            await typing_coalescer.start(
+                conversation_id,
                 {
-                    "type": "global.typing_indicator",
-                    "payload": payload,
-                    "sender_id": self.user.id,
+                    "id": self.user.id,
+                    "email": self.user.email,
+                    "first_name": self.user.first_name,
+                    "last_name": self.user.last_name,
                 },
             )
 
-        # Send to participants' global groups
-        participants = await self.get_conversation_participants(
-            data.get("conversation_id")
-        )
-        for participant_id in participants:
-            if participant_id != self.user.id:
-                await self.channel_layer.group_send(
-                    f"user_{participant_id}",
-                    {
-                        "type": "global.typing",
-                        "payload": payload,
-                        "sender_id": self.user.id,
-                    },
-                )
+    async def handle_stop_typing(self, content):
+        """Record typing stop; broadcasts are coalesced into snapshots."""
+        conversation_id = self._typing_conversation_id(content)
+        if conversation_id:
+            await typing_coalescer.stop(conversation_id, self.user.id)
+
+    def _typing_conversation_id(self, content):
+        try:
+            return int(
+                content.get("conversation_id") or getattr(self, "conversation_id", 0)
+            )
+        except (TypeError, ValueError):
+            return None
 
     async def mark_and_broadcast_read_messages(self):
         """Mark messages as read and broadcast to participants."""
@@ -451,7 +479,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
 
         if hasattr(self, "conversation_id"):
             # Update visibility in Redis tracker
-            chat_tracker.set_tab_visibility(
+            await sync_to_async(chat_tracker.set_tab_visibility)(
                 self.user.id, int(self.conversation_id), self.is_tab_visible
             )
             # Mark messages as read if tab is now visible
@@ -546,27 +574,26 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         ).delete()
         return True
 
-    @database_sync_to_async
-    def get_messages_for_read_receipt(self, message_ids):
+    async def get_messages_for_read_receipt(self, message_ids):
         """
         Returns minimal data required to notify senders
         """
-        return list(
-            Message.objects.filter(id__in=message_ids).values(
+        return [
+            row
+            async for row in Message.objects.filter(id__in=message_ids).values(
                 "id", "sender_id", "conversation_id"
             )
-        )
+        ]
 
-    @database_sync_to_async
-    def get_messages_with_senders(self, message_ids):
-        return list(
-            Message.objects.filter(id__in=message_ids).only(
+    async def get_messages_with_senders(self, message_ids):
+        return [
+            msg
+            async for msg in Message.objects.filter(id__in=message_ids).only(
                 "id", "conversation_id", "sender_id"
             )
-        )
+        ]
 
-    @database_sync_to_async
-    def get_unread_counts(self, user_id):
+    async def get_unread_counts(self, user_id):
         """Get count of unread messages for user across all conversations."""
         last_message_subquery = (
             Message.objects.filter(conversation_id=OuterRef("message__conversation_id"))
@@ -585,20 +612,18 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             )
         )
 
-        by_conversation = {
-            str(row["message__conversation_id"]): {
+        by_conversation = {}
+        async for row in qs:
+            by_conversation[str(row["message__conversation_id"])] = {
                 "conversation_id": str(row["message__conversation_id"]),
                 "text": row["last_message"],
                 "count": row["unread_count"],
             }
-            for row in qs
-        }
 
         total = sum(item["count"] for item in by_conversation.values())
         return {"total": total, "by_conversation": by_conversation}
 
-    @database_sync_to_async
-    def mark_all_messages_read(self, conversation_id, user_id):
+    async def mark_all_messages_read(self, conversation_id, user_id):
         """Mark all unread messages in conversation as read when user opens chat."""
         # Get all messages not sent by this user that aren't already read
         unread_statuses = MessageStatus.objects.filter(
@@ -607,49 +632,50 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             status__in=["sent", "delivered"],
         ).exclude(message__sender_id=user_id)
 
-        message_ids = list(unread_statuses.values_list("message_id", flat=True))
-        count = len(message_ids)
+        message_ids = [
+            message_id
+            async for message_id in unread_statuses.values_list("message_id", flat=True)
+        ]
+        if not message_ids:
+            return []
 
-        unread_statuses.update(status="read", updated_at=timezone.now())
+        await MessageStatus.objects.filter(
+            user_id=user_id, message_id__in=message_ids
+        ).aupdate(status="read", updated_at=timezone.now())
 
-        if count > 0:
-            user = Users.objects.get(id=user_id)
-            print(
-                f"\n{'-'*70}"
-                f"\n📖 MESSAGES MARKED AS READ"
-                f"\n  User: {user.email} (ID: {user_id})"
-                f"\n  Conversation: {conversation_id}"
-                f"\n  Messages Marked: {count}"
-                f"\n  Message IDs: {message_ids}"
-                f"\n{'-'*70}\n"
-            )
+        print(
+            f"\n{'-'*70}"
+            f"\n📖 MESSAGES MARKED AS READ"
+            f"\n  User: {self.user.email} (ID: {user_id})"
+            f"\n  Conversation: {conversation_id}"
+            f"\n  Messages Marked: {len(message_ids)}"
+            f"\n  Message IDs: {message_ids}"
+            f"\n{'-'*70}\n"
+        )
 
         return message_ids
 
-    @database_sync_to_async
-    def mark_single_message_read(self, message_id, user_id):
+    async def mark_single_message_read(self, message_id, user_id):
         """Mark a single message as read."""
         try:
             updated = (
-                MessageStatus.objects.filter(message_id=message_id, user_id=user_id)
+                await MessageStatus.objects.filter(
+                    message_id=message_id, user_id=user_id
+                )
                 .exclude(message__sender_id=user_id)
-                .update(status="read")
+                .aupdate(status="read")
             )
             return updated > 0
         except Exception as e:
             print(f"Error marking message as read: {e}")
 
-    @database_sync_to_async
-    def is_participant(self, conversation_id, user_id):
+    async def is_participant(self, conversation_id, user_id):
         """Check if user is a participant in the conversation."""
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            return conversation.participants.filter(id=user_id).exists()
-        except Conversation.DoesNotExist:
-            return False
+        return await Conversation.participants.through.objects.filter(
+            conversation_id=conversation_id, users_id=user_id
+        ).aexists()
 
-    @database_sync_to_async
-    def create_message_with_data(
+    async def create_message_with_data(
         self, conversation_id, user_id, text, msg_type, reply_to, additional_data=None
     ):
         """Create new message and return simple data dict."""
@@ -657,123 +683,122 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             additional_data = {}
 
         try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            user = Users.objects.get(id=user_id)
+            conversation_id = int(conversation_id)
+        except (TypeError, ValueError):
+            return None
+        user = self.user if self.user.id == user_id else None
+        if user is None:
+            user = await Users.objects.filter(id=user_id).afirst()
+        if user is None or not await self.is_participant(conversation_id, user_id):
+            return None
 
-            reply_message = None
-            if reply_to:
-                try:
-                    reply_message = Message.objects.get(id=reply_to)
-                except Message.DoesNotExist:
-                    pass
-
-            # Create message with optional encryption data
-            message = Message.objects.create(
-                conversation=conversation,
-                sender=user,
-                text=(
-                    text if not additional_data else None
-                ),  # Don't store plaintext if encrypted
-                encrypted_text=additional_data.get("encrypted_text"),
-                nonce=additional_data.get("nonce"),
-                is_encrypted=additional_data.get("is_encrypted", False),
-                msg_type=msg_type,
-                reply_to=reply_message,
+        reply_message_id = None
+        if reply_to:
+            reply_message_id = (
+                await Message.objects.filter(id=reply_to)
+                .values_list("id", flat=True)
+                .afirst()
             )
-            participants = conversation.participants.exclude(id=user.id)
 
-            for participant in participants:
-                is_connected = chat_tracker.is_connected(
-                    participant.id, int(conversation_id)
-                )
-                is_visible = chat_tracker.is_tab_visible(
-                    participant.id, int(conversation_id)
-                )
-
-                # Determine message status: read if actively viewing, delivered if connected, sent if disconnected
-                if is_connected and is_visible:
-                    status = "read"
-                elif is_connected:
-                    status = "delivered"
-                else:
-                    status = "sent"
-                print(f"==>> status: {status}")
+        # Create message with optional encryption data
+        message = await Message.objects.acreate(
+            conversation_id=conversation_id,
+            sender=user,
+            text=(
+                text if not additional_data else None
+            ),  # Don't store plaintext if encrypted
+            encrypted_text=additional_data.get("encrypted_text"),
+            nonce=additional_data.get("nonce"),
+            is_encrypted=additional_data.get("is_encrypted", False),
+            msg_type=msg_type,
+            reply_to_id=reply_message_id,
+        )
 
-                MessageStatus.objects.create(
-                    message=message,
-                    user=participant,
-                    status=status,
-                )
+        participants = [
+            participant
+            async for participant in Users.objects.filter(
+                conversations__id=conversation_id
+            )
+            .exclude(id=user.id)
+            .values("id", "email", "first_name", "last_name")
+        ]
+        presence = await sync_to_async(chat_tracker.get_presence)(
+            [participant["id"] for participant in participants], conversation_id
+        )
 
-                # Broadcast message read notification if user is connected and visible
-                if status == "read":
-                    # Notify sender that message was read immediately
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"user_{user.id}",
-                        {
-                            "type": "global.message_read",
-                            "payload": {
-                                "type": "message_read",
-                                "conversation_id": conversation_id,
-                                "message_id": message.id,
-                                "reply_to": message.reply_to,
-                                "text": message.text,
-                                "status": message.get_status_for_user(user.id),
-                                "reader": {
-                                    "id": participant.id,
-                                    "email": participant.email,
-                                    "first_name": participant.first_name,
-                                    "last_name": participant.last_name,
-                                },
-                                "read_at": timezone.now().isoformat(),
-                            },
-                        },
-                    )
+        statuses = []
+        readers = []
+        for participant in participants:
+            is_connected, is_visible = presence[participant["id"]]
+
+            # Determine message status: read if actively viewing, delivered if connected, sent if disconnected
+            if is_connected and is_visible:
+                status = "read"
+                readers.append(participant)
+            elif is_connected:
+                status = "delivered"
+            else:
+                status = "sent"
+            statuses.append(
+                MessageStatus(message=message, user_id=participant["id"], status=status)
+            )
 
-                    # Also broadcast to chat conversation group so all connected participants get read status
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"chat_{conversation_id}",
-                        {
-                            "type": "chat.message_read",
-                            "payload": {
-                                "type": "message_read",
-                                "conversation_id": conversation_id,
-                                "reply_to": message.reply_to,
-                                "text": message.text,
-                                "message_id": message.id,
-                                "status": message.get_status_for_user(user.id),
-                                "reader": {
-                                    "id": participant.id,
-                                    "email": participant.email,
-                                    "first_name": participant.first_name,
-                                    "last_name": participant.last_name,
-                                },
-                                "read_at": timezone.now().isoformat(),
-                            },
-                        },
-                    )
+        await MessageStatus.objects.abulk_create(statuses)
+
+        if readers:
+            await self.broadcast_instant_reads(message, user, readers, statuses)
+
+        return {
+            "id": message.id,
+            "text": message.text,
+            "encrypted_text": message.encrypted_text,
+            "is_encrypted": message.is_encrypted,
+            "nonce": message.nonce,
+            "reply_to": message.reply_to_id,
+            "msg_type": message.msg_type,
+            "sender": {
+                "id": user.id,
+                "email": user.email,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+            },
+            "created_at": message.created_at.isoformat(),
+            "conversation_id": conversation_id,
+            "status": "sent",
+        }
 
-            return {
-                "id": message.id,
+    async def broadcast_instant_reads(self, message, sender, readers, statuses):
+        """Tell the sender and the room that actively viewing participants read it."""
+        values = [status.status for status in statuses]
+        if all(value == "read" for value in values):
+            sender_status = "read"
+        elif any(value in ("delivered", "read") for value in values):
+            sender_status = "delivered"
+        else:
+            sender_status = "sent"
+
+        read_at = timezone.now().isoformat()
+        for reader in readers:
+            payload = {
+                "type": "message_read",
+                "conversation_id": message.conversation_id,
+                "message_id": message.id,
+                "reply_to": message.reply_to_id,
                 "text": message.text,
-                "encrypted_text": message.encrypted_text,
-                "is_encrypted": message.is_encrypted,
-                "nonce": message.nonce,
-                "reply_to": message.reply_to,
-                "msg_type": message.msg_type,
-                "sender": {
-                    "id": user.id,
-                    "email": user.email,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                },
-                "created_at": message.created_at.isoformat(),
-                "conversation_id": conversation_id,
-                "status": "sent",
+                "status": sender_status,
+                "reader": reader,
+                "read_at": read_at,
             }
-
-        except (Conversation.DoesNotExist, Users.DoesNotExist):
-            return None
+            # Notify sender that message was read immediately
+            await self.channel_layer.group_send(
+                f"user_{sender.id}",
+                {"type": "global.message_read", "payload": payload},
+            )
+            # Also broadcast to chat conversation group so all connected participants get read status
+            await self.channel_layer.group_send(
+                f"chat_{message.conversation_id}",
+                {"type": "chat.message_read", "payload": payload},
+            )
 
     @database_sync_to_async
     def update_message_status(self, message_id, user_id, status):
@@ -787,112 +812,108 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         except (Message.DoesNotExist, Users.DoesNotExist):
             pass
 
-    @database_sync_to_async
-    def add_reaction(self, message_id, user_id, emoji):
+    async def add_reaction(self, message_id, user_id, emoji):
         """Add emoji reaction to message."""
-        try:
-            message = Message.objects.get(id=message_id)
-            user = Users.objects.get(id=user_id)
-
-            reaction, created = MessageReaction.objects.get_or_create(
-                message=message, user=user, emoji=emoji, defaults={"is_deleted": False}
-            )
-
-            if not created and reaction.is_deleted:
-                reaction.is_deleted = False
-                reaction.save()
-                created = True
-
-            if created:
-                return {
-                    "id": reaction.id,
-                    "emoji": reaction.emoji,
-                    "user": {
-                        "id": user.id,
-                        "email": user.email,
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                    },
-                    "created_at": reaction.created_at.isoformat(),
-                }
+        if not await Message.objects.filter(id=message_id).aexists():
             return None
-        except (Message.DoesNotExist, Users.DoesNotExist):
+        user = self.user if self.user.id == user_id else None
+        if user is None:
+            user = await Users.objects.filter(id=user_id).afirst()
+        if user is None:
             return None
 
-    @database_sync_to_async
-    def remove_reaction(self, message_id, user_id, emoji):
+        # The default manager hides soft-deleted rows, so a previously removed
+        # reaction is recreated rather than matched
+        reaction, created = await MessageReaction.objects.aget_or_create(
+            message_id=message_id, user_id=user.id, emoji=emoji
+        )
+
+        if created:
+            return {
+                "id": reaction.id,
+                "emoji": reaction.emoji,
+                "user": {
+                    "id": user.id,
+                    "email": user.email,
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                },
+                "created_at": reaction.created_at.isoformat(),
+            }
+        return None
+
+    async def remove_reaction(self, message_id, user_id, emoji):
         """Remove emoji reaction from message."""
-        try:
-            reaction = MessageReaction.objects.get(
-                message_id=message_id, user_id=user_id, emoji=emoji, is_deleted=False
-            )
-            reaction.is_deleted = True
-            reaction.save()
-            return True
-        except MessageReaction.DoesNotExist:
-            return False
+        updated = await MessageReaction.objects.filter(
+            message_id=message_id, user_id=user_id, emoji=emoji
+        ).aupdate(is_deleted=True, deleted_at=timezone.now())
+        return updated > 0
 
-    @database_sync_to_async
-    def get_conversation_participants(self, conversation_id):
+    async def get_conversation_participants(self, conversation_id):
         """Get list of participant IDs for a conversation."""
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            return list(conversation.participants.values_list("id", flat=True))
-        except Conversation.DoesNotExist:
-            return []
-
-    @database_sync_to_async
-    def update_message(self, message_id, user_id, new_text):
+        return [
+            user_id
+            async for user_id in Conversation.participants.through.objects.filter(
+                conversation_id=conversation_id
+            ).values_list("users_id", flat=True)
+        ]
+
+    async def update_message(self, message_id, user_id, new_text):
         """Update a message's text."""
-        try:
-            message = Message.objects.filter(id=message_id).first()
-            if message and message.sender.id == user_id:
-                message.text = new_text
-                message.is_edited = True
-                message.updated_at = timezone.now()
-                message.save()
-                return "Message updated successfully"
-            return "Unauthorized to update this message"
-        except Message.DoesNotExist:
+        sender_id = (
+            await Message.objects.filter(id=message_id)
+            .values_list("sender_id", flat=True)
+            .afirst()
+        )
+        if sender_id is None:
             return "Message does not exist"
+        if sender_id != user_id:
+            return "Unauthorized to update this message"
 
-    @database_sync_to_async
-    def delete_message(self, message_id, user_id, conversation_id):
+        await Message.objects.filter(id=message_id).aupdate(
+            text=new_text, is_edited=True, updated_at=timezone.now()
+        )
+        return "Message updated successfully"
+
+    async def delete_message(self, message_id, user_id, conversation_id):
         """Delete a message."""
-        try:
-            message = Message.objects.filter(id=message_id).first()
-            if not message:
-                return "Message not found....."
-            if message and message.sender.id == user_id:
-                message.delete()
+        sender_id = (
+            await Message.objects.filter(id=message_id)
+            .values_list("sender_id", flat=True)
+            .afirst()
+        )
+        if sender_id is None:
+            return "Message not found....."
+        if sender_id != user_id:
+            return "Unauthorized to delete this message"
 
-                payload = {
-                    "type": "delete_message",
-                    "conversation_id": conversation_id,
-                    "message_id": message_id,
-                    "deleted_at": timezone.now().isoformat(),
-                }
+        now = timezone.now()
+        await Message.objects.filter(id=message_id).aupdate(
+            is_deleted=True, deleted_at=now, updated_at=now
+        )
 
-                # Broadcast to conversation group
-                async_to_sync(self.channel_layer.group_send)(
-                    f"chat_{conversation_id}",
-                    {"type": "chat.message", "payload": payload},
-                )
+        payload = {
+            "type": "delete_message",
+            "conversation_id": conversation_id,
+            "message_id": message_id,
+            "deleted_at": now.isoformat(),
+        }
 
-                # Broadcast to participants' global groups
-                conversation = Conversation.objects.get(id=conversation_id)
-                participants = conversation.participants.exclude(id=user_id)
-                for participant in participants:
-                    print(f"==>> participant: {participant}")
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"user_{participant.id}",
-                        {"type": "global.message", "payload": payload},
-                    )
+        # Broadcast to conversation group
+        await self.channel_layer.group_send(
+            f"chat_{conversation_id}",
+            {"type": "chat.message", "payload": payload},
+        )
 
-                return "Message deleted successfully"
-            return "Unauthorized to delete this message"
-        except Message.DoesNotExist:
-            return "Message does not exist"
+        # Broadcast to participants' global groups
+        for participant_id in await self.get_conversation_participants(conversation_id):
+            if participant_id != user_id:
+                await self.channel_layer.group_send(
+                    f"user_{participant_id}",
+                    {"type": "global.message", "payload": payload},
+                )
+
+        return "Message deleted successfully"
 
     # WebSocket event handlers
     async def global_message_read(self, event):
@@ -902,6 +923,29 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         if event.get("sender_id") != self.user.id:
             await self.send_json(event["payload"])
 
+    async def typing_snapshot(self, event):
+        """Forward batched typing state, leaving out the user's own typing."""
+        payload = event["payload"]
+        started = [uid for uid in payload["started"] if uid != self.user.id]
+        stopped = [uid for uid in payload["stopped"] if uid != self.user.id]
+        if not started and not stopped:
+            return
+        await self.send_json(
+            {
+                **payload,
+                "typing": [u for u in payload["typing"] if u["id"] != self.user.id],
+                "started": started,
+                "stopped": stopped,
+            }
+        )
+
+    async def global_typing_snapshot(self, event):
+        """Forward a snapshot sent to the user group, unless the room sent it."""
+        conversation_id = event["payload"]["conversation_id"]
+        if getattr(self, "room_group_name", None) == f"chat_{conversation_id}":
+            return
+        await self.typing_snapshot(event)
+
     async def global_typing_indicator(self, event):
         """Handle typing indicators in conversation group."""
         if event.get("sender_id") != self.user.id:
@@ -1045,36 +1089,74 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         )
 
     async def handle_get_messages(self, content):
-        """Handle message history requests."""
+        """
+        Handle message history requests.
+
+        Supports ``before``/``after`` keyset cursors (legacy ``last_message_id``
+        is still honoured) and a ``compact`` mode that sends ``sender_id``
+        instead of the sender details the client already has cached.
+        """
+        conversation_id = content.get("conversation_id") or getattr(
+            self, "conversation_id", None
+        )
+        if not conversation_id:
+            return await self.send_json(
+                {"type": "error", "message": "Conversation ID not provided"}
+            )
+        compact = bool(content.get("compact", False))
         try:
-            messages = await self.get_conversation_messages(
-                self.conversation_id,
+            limit = min(max(int(content.get("limit", 50)), 1), 100)
+        except (TypeError, ValueError):
+            limit = 50
+
+        try:
+            page = await self.get_conversation_messages(
+                int(conversation_id),
                 self.user.id,
                 content.get("last_message_id"),
-                content.get("limit", 50),
-            )
-
-            await self.send_json(
-                {
-                    "type": "messages",
-                    "conversation_id": self.conversation_id,
-                    "messages": [
-                        {
-                            "id": msg.id,
-                            "sender": msg.sender.email,
-                            "text": msg.text,
-                            "timestamp": msg.created_at.isoformat(),
-                            "status": msg.get_status_for_user(self.user.id),
-                        }
-                        for msg in messages
-                    ],
-                }
+                limit,
+                before=content.get("before"),
+                after=content.get("after"),
             )
+        except ValueError as e:
+            return await self.send_json({"type": "error", "message": str(e)})
         except Exception as e:
-            await self.send_json(
+            return await self.send_json(
                 {"type": "error", "message": f"Failed to get messages: {str(e)}"}
             )
 
+        messages = []
+        for msg in page["messages"]:
+            item = {
+                "id": msg["id"],
+                "sender_id": msg["sender_id"],
+                "text": msg["text"],
+                "encrypted_text": msg["encrypted_text"],
+                "is_encrypted": msg["is_encrypted"],
+                "nonce": msg["nonce"],
+                "msg_type": msg["msg_type"],
+                "reply_to": msg["reply_to_id"],
+                "is_edited": msg["is_edited"],
+                "timestamp": msg["created_at"].isoformat(),
+                "status": msg["status"],
+            }
+            if not compact:
+                item["sender"] = msg["sender__email"]
+            messages.append(item)
+
+        await self.send_json(
+            {
+                "type": "messages",
+                "conversation_id": int(conversation_id),
+                "compact": compact,
+                "before": page["before"],
+                "after": page["after"],
+                "has_older": page["has_older"],
+                "has_newer": page["has_newer"],
+                "messages": messages,
+            }
+        )
+
     @database_sync_to_async
     def get_unread_messages(self, user_id, since_minutes=60):
         """Get unread messages for user from last hour."""
@@ -1096,24 +1178,106 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
 
         return list(messages)
 
-    @database_sync_to_async
-    def get_conversation_messages(
-        self, conversation_id, user_id, last_message_id=None, limit=50
+    async def get_conversation_messages(
+        self,
+        conversation_id,
+        user_id,
+        last_message_id=None,
+        limit=50,
+        before=None,
+        after=None,
     ):
-        """Get messages for a conversation with pagination."""
-        # Verify user has access to conversation
-        conversation = Conversation.objects.filter(
-            id=conversation_id, participants=user_id
-        ).first()
+        """
+        Get a keyset page of messages for a conversation in chronological order.
 
-        if not conversation:
-            return []
+        Walks the (conversation, created_at) index via ``before``/``after``
+        cursors; per-user statuses are resolved in one query for the page.
+        """
+        # Verify user has access to conversation
+        if not await self.is_participant(conversation_id, user_id):
+            return {
+                "messages": [],
+                "before": None,
+                "after": None,
+                "has_older": False,
+                "has_newer": False,
+            }
 
         query = Message.objects.filter(conversation_id=conversation_id)
 
-        if last_message_id:
+        if last_message_id and not (before or after):
             query = query.filter(id__gt=last_message_id)
+            after_legacy = True
+        else:
+            after_legacy = False
+
+        query = query.values(
+            "id",
+            "sender_id",
+            "sender__email",
+            "text",
+            "encrypted_text",
+            "is_encrypted",
+            "nonce",
+            "msg_type",
+            "reply_to_id",
+            "is_edited",
+            "created_at",
+        )
 
-        messages = query.select_related("sender").order_by("created_at")[:limit]
+        if after_legacy:
+            query = query.order_by("created_at", "id")
+        else:
+            query = keyset_filter(query, before=before, after=after)
+
+        rows = [row async for row in query[: limit + 1]]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if after_legacy:
+            has_older, has_newer = True, has_more
+        else:
+            if after:
+                has_older, has_newer = True, has_more
+            else:
+                # Newest-first traversal; flip to chronological for the client
+                rows.reverse()
+                has_older, has_newer = has_more, bool(before)
+
+        ids = [row["id"] for row in rows]
+        own_ids = [row["id"] for row in rows if row["sender_id"] == user_id]
+        statuses = {}
+        async for message_id, status in MessageStatus.objects.filter(
+            message_id__in=own_ids
+        ).values_list("message_id", "status"):
+            statuses.setdefault(message_id, []).append(status)
+        own_statuses = {
+            message_id: status
+            async for message_id, status in MessageStatus.objects.filter(
+                message_id__in=set(ids) - set(own_ids), user_id=user_id
+            ).values_list("message_id", "status")
+        }
 
-        return list(messages)
+        for row in rows:
+            if row["sender_id"] == user_id:
+                values = statuses.get(row["id"], [])
+                if values and all(s == "read" for s in values):
+                    row["status"] = "read"
+                elif any(s in ("delivered", "read") for s in values):
+                    row["status"] = "delivered"
+                else:
+                    row["status"] = "sent"
+            else:
+                row["status"] = own_statuses.get(row["id"], "sent")
+
+        return {
+            "messages": rows,
+            "before": (
+                encode_cursor(rows[0]["created_at"], rows[0]["id"]) if rows else None
+            ),
+            "after": (
+                encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if rows else None
+            ),
+            "has_older": has_older,
+            "has_newer": has_newer,
+        }
@@ -0,0 +1,142 @@
+"""
+WebSocket connection load test against the in-process ASGI application.
+
+Opens N simulated clients (JWT-authenticated, spread over existing active
+users) through the real middleware and routing with the in-memory channel
+layer, then reports connects/sec, latency percentiles and how many sockets
+the admission layer turned away.
+
+    python manage.py ws_loadtest --clients 5000 --concurrency 500
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+from channels.layers import channel_layers
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.superadmin.models import Users
+
+
+class Command(BaseCommand):
+    help = "Simulate a WebSocket reconnect storm and report admission throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument(
+            "--path",
+            default="/ws/notifications/",
+            help="WebSocket path to connect to, e.g. /ws/chat/ or /ws/notifications/",
+        )
+        parser.add_argument(
+            "--users", type=int, default=100, help="Distinct users to spread over"
+        )
+        parser.add_argument(
+            "--hold",
+            action="store_true",
+            help="Keep every socket open until all clients have connected",
+        )
+
+    def handle(self, *args, **options):
+        settings.CHANNEL_LAYERS = {
+            "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+        }
+        channel_layers.backends = {}
+
+        users = list(
+            Users.objects.filter(is_active=True).only("id")[: options["users"]]
+        )
+        if not users:
+            raise CommandError("No active users to authenticate simulated clients")
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+
+        from hrms.routing import application
+
+        results = asyncio.run(self.run_storm(application, tokens, options))
+        self.report(results, options)
+
+    async def run_storm(self, application, tokens, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        open_sockets = []
+
+        async def client(index):
+            token = tokens[index % len(tokens)]
+            communicator = WebsocketCommunicator(
+                application, f"{options['path']}?token={token}"
+            )
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    connected, _ = await communicator.connect(timeout=30)
+                except Exception:
+                    return "error", time.perf_counter() - started
+                elapsed = time.perf_counter() - started
+                if not connected:
+                    return "refused", elapsed
+
+                # Admission rejects by accepting, sending a reconnect hint and
+                # closing straight away
+                first = None
+                if not await communicator.receive_nothing(timeout=0.05):
+                    first = await communicator.receive_output(timeout=5)
+
+            text = (first or {}).get("text") or ""
+            if '"reconnect"' in text:
+                return "rejected", elapsed, json.loads(text).get("retry_after")
+            if options["hold"]:
+                open_sockets.append(communicator)
+            else:
+                await communicator.disconnect()
+            return "accepted", elapsed
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(client(index) for index in range(options["clients"]))
+        )
+        duration = time.perf_counter() - started
+
+        for communicator in open_sockets:
+            await communicator.disconnect()
+        return outcomes, duration
+
+    def report(self, results, options):
+        outcomes, duration = results
+        by_kind = {}
+        for outcome in outcomes:
+            by_kind.setdefault(outcome[0], []).append(outcome)
+
+        accepted = sorted(outcome[1] for outcome in by_kind.get("accepted", []))
+        retry_hints = [outcome[2] for outcome in by_kind.get("rejected", [])]
+
+        def percentile(values, pct):
+            if not values:
+                return 0.0
+            return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+        self.stdout.write(self.style.NOTICE(f"WebSocket storm on {options['path']}"))
+        self.stdout.write(f"  clients:          {options['clients']}")
+        self.stdout.write(f"  concurrency:      {options['concurrency']}")
+        self.stdout.write(f"  duration:         {duration:.2f}s")
+        self.stdout.write(f"  accepted:         {len(accepted)}")
+        self.stdout.write(f"  rejected (retry): {len(retry_hints)}")
+        self.stdout.write(
+            f"  refused/errors:   {len(by_kind.get('refused', []))}"
+            f"/{len(by_kind.get('error', []))}"
+        )
+        self.stdout.write(f"  connects/sec:     {len(accepted) / duration:.1f}")
+        self.stdout.write(f"  p50 latency:      {percentile(accepted, 50):.1f}ms")
+        self.stdout.write(f"  p99 latency:      {percentile(accepted, 99):.1f}ms")
+        if accepted:
+            self.stdout.write(
+                f"  mean latency:     {statistics.mean(accepted) * 1000:.1f}ms"
+            )
+        if retry_hints:
+            self.stdout.write(
+                f"  retry hints:      {min(retry_hints)}-{max(retry_hints)}s"
+            )
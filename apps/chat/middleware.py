@@ -3,16 +3,77 @@ JWT authentication middleware for WebSocket connections.
 
 Handles JWT token authentication for Django Channels WebSocket connections,
 extracting tokens from query parameters and setting user context for chat functionality.
+Resolved users are cached briefly per (user id, token jti) so reconnect storms
+do not turn into one full user query per socket.
 """
 
 from urllib.parse import parse_qs
 
-from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from rest_framework_simplejwt.tokens import AccessToken
 
 from apps.superadmin.models import Users
 
+# Columns the chat, notification and AI consumers read from scope["user"];
+# large or sensitive columns such as password and public_key are left out.
+WS_USER_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "role",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "employee_id",
+    "department_id",
+    "position_id",
+    "profile",
+    "joining_date",
+    "birthdate",
+    "salary_ctc",
+    "encryption_enabled",
+)
+
+
+def _generation_key(user_id):
+    return f"ws_user_gen:{user_id}"
+
+
+async def get_ws_user(user_id, jti=""):
+    """Return the active user for a WebSocket token, served from cache when possible."""
+    generation = await cache.aget(_generation_key(user_id), 0)
+    key = f"ws_user:{user_id}:{generation}:{jti}"
+
+    user = await cache.aget(key)
+    if user is None:
+        user = (
+            await Users.objects.only(*WS_USER_FIELDS)
+            .filter(id=user_id, is_active=True)
+            .afirst()
+        )
+        if user is None:
+            return None
+        await cache.aset(key, user, settings.WS_USER_CACHE_SECONDS)
+    return user
+
+
+async def resolve_ws_user(raw_token):
+    """Validate a raw JWT access token and return its user, or None."""
+    access_token = AccessToken(raw_token)
+    return await get_ws_user(int(access_token["user_id"]), access_token.get("jti", ""))
+
+
+def invalidate_ws_user(user_id):
+    """Drop every cached WebSocket identity for a user (e.g. on deactivation)."""
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
 
 class JwtAuthMiddleware:
     """Middleware for authenticating WebSocket connections using JWT tokens."""
@@ -28,9 +89,7 @@ class JwtAuthMiddleware:
 
         if token:
             try:
-                access_token = AccessToken(token[0])
-                user_id = int(access_token["user_id"])
-                user = await self.get_user(user_id)
+                user = await resolve_ws_user(token[0])
                 scope["user"] = user if user else AnonymousUser()
             except Exception as e:
                 print(f"JWT auth error: {e}")
@@ -40,20 +99,3 @@ class JwtAuthMiddleware:
             scope["user"] = AnonymousUser()
 
         return await self.inner(scope, receive, send)
-
-    @database_sync_to_async
-    def get_user(self, user_id):
-        """Retrieve active user by ID from database asynchronously."""
-        try:
-            user = Users.objects.get(id=user_id)
-            print(f"Found user via ORM: {user} (email: {user.email})")
-            return user
-        except Users.DoesNotExist:
-            print(f"User {user_id} not found via ORM")
-            return None
-        except Exception as e:
-            print(f"Database error: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return None
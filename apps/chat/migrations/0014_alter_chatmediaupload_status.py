@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0013_message_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chatmediaupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("receiving", "Receiving"),
+                    ("completed", "Completed"),
+                    ("expired", "Expired"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0014_alter_chatmediaupload_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chatmediaupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("receiving", "Receiving"),
+                    ("completing", "Completing"),
+                    ("completed", "Completed"),
+                    ("expired", "Expired"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -5,6 +5,10 @@ Handles conversations, messages, message status tracking, and reactions
 for the HRMS internal communication system.
 """
 
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.db.models import Q
 
@@ -121,6 +125,12 @@ class Message(BaseModel):
         help_text="Base64-encoded nonce for encryption",
     )
     media = models.FileField(upload_to="chat_media/", null=True, blank=True)
+    thumbnail = models.ImageField(
+        upload_to="chat_media/thumbnails/",
+        null=True,
+        blank=True,
+        help_text="Preview generated in the background for images and PDFs",
+    )
     msg_type = models.CharField(max_length=20, choices=MSG_TYPE_CHOICES, default="text")
     reply_to = models.ForeignKey(
         "self", on_delete=models.CASCADE, null=True, blank=True, related_name="replies"
@@ -226,3 +236,47 @@ class MessageReaction(BaseModel):
 
     def __str__(self):
         return f"{self.user.email} reacted {self.emoji} to message"
+
+
+class ChatMediaUpload(BaseModel):
+    """Resumable chunked upload session for chat media attachments."""
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("receiving", "Receiving"),  # A chunk is being written
+        ("completing", "Completing"),  # The message is being created
+        ("completed", "Completed"),
+        ("expired", "Expired"),
+    )
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    uploader = models.ForeignKey(
+        Users, on_delete=models.CASCADE, related_name="chat_uploads"
+    )
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="media_uploads"
+    )
+    file_name = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="uploads",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"Upload({self.upload_id}) {self.file_name} - {self.status}"
+
+    @property
+    def temp_path(self):
+        """Local path where received chunks are appended until completion."""
+        return os.path.join(settings.CHAT_UPLOAD_TEMP_DIR, f"{self.upload_id}.part")
@@ -0,0 +1,105 @@
+"""
+Full-text search over chat messages.
+
+PostgreSQL matches against a generated ``search_vector`` tsvector column
+backed by a GIN index; SQLite (local development) uses an FTS5 external
+content table kept in sync by triggers. Both are created by migration
+0013, so writes never run search-indexing code in Python.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from apps.chat.models import Message
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "chat_message_fts"
+# Private use code points mark the matches so the message text can be
+# escaped before the <mark> tags go in
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+
+def _fts5_query(query):
+    """Quote each term so user input cannot inject FTS5 query syntax."""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _render_snippet(snippet):
+    """HTML-escape a snippet, then turn the match sentinels into <mark> tags."""
+    return (
+        escape(snippet or "")
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def search_messages(queryset, query):
+    """Restrict a Message queryset to rows whose text matches ``query``."""
+    queryset = queryset.filter(is_encrypted=False)
+    table = Message._meta.db_table
+
+    if connection.vendor == "postgresql":
+        return queryset.alias(
+            search_match=RawSQL(
+                f'"{table}"."search_vector" @@ websearch_to_tsquery(%s, %s)',
+                (SEARCH_CONFIG, query),
+                output_field=BooleanField(),
+            )
+        ).filter(search_match=True)
+
+    fts_query = _fts5_query(query)
+    if not fts_query:
+        return queryset.none()
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (fts_query,),
+        )
+    )
+
+
+def highlight_messages(message_ids, query):
+    """
+    Return ``{message_id: snippet}`` with matched terms wrapped in <mark>.
+
+    The snippet is HTML-escaped, so it is safe to render as markup.
+    """
+    if not message_ids:
+        return {}
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery
+
+        headlines = (
+            Message.objects.filter(id__in=message_ids)
+            .annotate(
+                headline=SearchHeadline(
+                    "text",
+                    SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG),
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_words=30,
+                    min_words=10,
+                )
+            )
+            .values_list("id", "headline")
+        )
+        return {pk: _render_snippet(headline) for pk, headline in headlines}
+
+    fts_query = _fts5_query(query)
+    placeholders = ", ".join(["%s"] * len(message_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, '...', 30) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"AND rowid IN ({placeholders})",
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, fts_query, *message_ids],
+        )
+        return {pk: _render_snippet(snippet) for pk, snippet in cursor.fetchall()}
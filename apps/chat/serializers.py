@@ -5,8 +5,9 @@ Handles serialization for conversations, messages, reactions, and message status
 for the HRMS chat system with support for media attachments and reply functionality.
 """
 
+from collections import Counter
+
 # from django.contrib.auth import get_user_model
-from django.db.models import Count
 from rest_framework import serializers
 
 from apps.chat.models import Conversation, Message, MessageReaction, MessageStatus
@@ -49,6 +50,7 @@ class MessageSerializer(serializers.ModelSerializer):
 
     sender = UserSerializer(read_only=True)
     media_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
     reactions = MessageReactionSerializer(many=True, read_only=True)
     reply_to_id = serializers.PrimaryKeyRelatedField(
         queryset=Message.objects.all(),
@@ -74,6 +76,7 @@ class MessageSerializer(serializers.ModelSerializer):
             "is_edited",
             "media",
             "media_url",
+            "thumbnail_url",
             "msg_type",
             "reply_to",
             "reply_to_id",
@@ -99,6 +102,15 @@ class MessageSerializer(serializers.ModelSerializer):
             return obj.media.url
         return None
 
+    def get_thumbnail_url(self, obj):
+        """Preview URL so chat lists can avoid fetching the original media."""
+        if not obj.thumbnail:
+            return None
+        request = self.context.get("request")
+        if request:
+            return request.build_absolute_uri(obj.thumbnail.url)
+        return obj.thumbnail.url
+
     def get_reply_to(self, obj):
         """Get reply message details for threaded conversations (supports encrypted messages)."""
         if obj.reply_to:
@@ -118,7 +130,10 @@ class MessageSerializer(serializers.ModelSerializer):
 
     def get_reaction_counts(self, obj):
         """Get aggregated reaction counts by emoji type."""
-        return obj.reactions.values("emoji").annotate(count=Count("emoji"))
+        # Counted in Python so views that prefetch "reactions" stay at one
+        # query per page instead of one per message
+        counts = Counter(reaction.emoji for reaction in obj.reactions.all())
+        return [{"emoji": emoji, "count": count} for emoji, count in counts.items()]
 
     def get_read_by(self, obj):
         """Get list of users who have read this message."""
@@ -147,6 +162,31 @@ class MessageSerializer(serializers.ModelSerializer):
         return data
 
 
+class CompactMessageSerializer(MessageSerializer):
+    """Lightweight message payload referencing the sender by id only."""
+
+    sender_id = serializers.IntegerField(read_only=True)
+    reply_to = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(MessageSerializer.Meta):
+        fields = (
+            "id",
+            "conversation",
+            "sender_id",
+            "text",
+            "encrypted_text",
+            "is_encrypted",
+            "nonce",
+            "is_edited",
+            "media_url",
+            "thumbnail_url",
+            "msg_type",
+            "reply_to",
+            "reaction_counts",
+            "created_at",
+        )
+
+
 class ConversationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new conversations with participant selection."""
 
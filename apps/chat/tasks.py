@@ -0,0 +1,113 @@
+"""
+Celery tasks for chat media processing.
+
+Generates lightweight thumbnails for image and PDF attachments so chat
+lists never need to download the original file, and cleans up abandoned
+chunked upload sessions.
+"""
+
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from apps.chat.models import ChatMediaUpload, Message
+
+THUMBNAIL_SIZE = (320, 320)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+PDF_EXTENSIONS = {".pdf"}
+
+
+def _render_pdf_preview(file_obj):
+    """Render the first page of a PDF to a PIL image."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_obj.read())
+    try:
+        page = pdf[0]
+        # Render close to the thumbnail size instead of full resolution
+        width, height = page.get_size()
+        scale = max(THUMBNAIL_SIZE) / max(width, height, 1)
+        return page.render(scale=max(scale, 0.1)).to_pil()
+    finally:
+        pdf.close()
+
+
+@shared_task
+def generate_message_thumbnail(message_id):
+    """Create a thumbnail for an image or PDF message and notify the conversation."""
+    message = Message.objects.filter(id=message_id).first()
+    if not message or not message.media or message.thumbnail:
+        return
+
+    ext = os.path.splitext(message.media.name)[1].lower()
+    if ext not in IMAGE_EXTENSIONS | PDF_EXTENSIONS:
+        return
+
+    try:
+        with message.media.open("rb") as media:
+            if ext in PDF_EXTENSIONS:
+                image = _render_pdf_preview(media)
+            else:
+                image = Image.open(media)
+                # Let JPEG decoding downscale while reading
+                image.draft("RGB", THUMBNAIL_SIZE)
+                image = ImageOps.exif_transpose(image)
+
+            image.thumbnail(THUMBNAIL_SIZE)
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=80, optimize=True)
+    except Exception as e:
+        print(f"Thumbnail generation failed for message {message_id}: {e}")
+        return
+
+    base_name = os.path.splitext(os.path.basename(message.media.name))[0]
+    message.thumbnail.save(
+        f"{base_name}_thumb.jpg", ContentFile(buffer.getvalue()), save=False
+    )
+    Message.objects.filter(id=message.id).update(thumbnail=message.thumbnail.name)
+
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        async_to_sync(channel_layer.group_send)(
+            f"chat_{message.conversation_id}",
+            {
+                "type": "chat.message",
+                "payload": {
+                    "type": "message_thumbnail",
+                    "conversation_id": message.conversation_id,
+                    "message_id": message.id,
+                    "thumbnail_url": message.thumbnail.url,
+                },
+            },
+        )
+
+
+@shared_task
+def purge_stale_chat_uploads():
+    """Expire chunked upload sessions that were abandoned and delete their parts."""
+    cutoff = timezone.now() - timedelta(hours=settings.CHAT_UPLOAD_SESSION_HOURS)
+    stale = ChatMediaUpload.objects.filter(
+        status__in=["pending", "receiving", "completing"], updated_at__lt=cutoff
+    )
+
+    expired = 0
+    for upload in stale.iterator():
+        try:
+            os.remove(upload.temp_path)
+        except FileNotFoundError:
+            pass
+        expired += 1
+
+    stale.update(status="expired", updated_at=timezone.now())
+    return f"Expired {expired} chat upload sessions"
@@ -1,3 +1,86 @@
-# from django.test import TestCase
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, TransactionTestCase, override_settings
 
-# Create your tests here.
+from apps.chat.models import Conversation, Message
+from apps.chat.routing import websocket_urlpatterns
+from apps.chat.search import highlight_messages, search_messages
+from apps.chat.typing import TypingCoalescer
+from apps.superadmin.models import Users
+
+
+class MessageSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Users.objects.create(email="search@example.com", role="employee")
+        cls.conversation = Conversation.objects.create(type="private")
+        cls.conversation.participants.add(cls.user)
+
+    def send(self, text):
+        return Message.objects.create(
+            conversation=self.conversation, sender=self.user, text=text
+        )
+
+    def test_highlight_wraps_matches_in_mark(self):
+        message = self.send("The payroll report is ready")
+
+        snippet = highlight_messages([message.id], "payroll")[message.id]
+
+        self.assertIn("<mark>payroll</mark>", snippet)
+
+    def test_highlight_escapes_message_markup(self):
+        message = self.send('<script>alert("payroll")</script> <b>payroll</b>')
+
+        matches = search_messages(Message.objects.all(), "payroll")
+        snippet = highlight_messages([msg.id for msg in matches], "payroll")[message.id]
+
+        self.assertNotIn("<script>", snippet)
+        self.assertNotIn("<b>", snippet)
+        self.assertIn("&lt;script&gt;", snippet)
+        self.assertIn("<mark>payroll</mark>", snippet)
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class TypingSnapshotTests(TransactionTestCase):
+    def setUp(self):
+        self.typist = Users.objects.create(email="typist@example.com", role="employee")
+        self.reader = Users.objects.create(email="reader@example.com", role="employee")
+        self.conversation = Conversation.objects.create(type="private")
+        self.conversation.participants.add(self.typist, self.reader)
+
+    async def connect(self, user, path):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def snapshots(self, communicator):
+        """Drain the socket and return the typing snapshots it received."""
+        received = []
+        while not await communicator.receive_nothing(timeout=0.3):
+            content = await communicator.receive_json_from()
+            if content.get("type") == "typing_snapshot":
+                received.append(content)
+        return received
+
+    async def test_each_socket_gets_one_snapshot_per_flush(self):
+        coalescer = TypingCoalescer(window=0.05, ttl=5)
+        room = f"/ws/chat/{self.conversation.id}/"
+        in_room = await self.connect(self.reader, room)
+        elsewhere = await self.connect(self.reader, "/ws/chat/")
+        await self.snapshots(in_room)
+        await self.snapshots(elsewhere)
+
+        await coalescer.start(
+            self.conversation.id, {"id": self.typist.id, "email": self.typist.email}
+        )
+
+        self.assertEqual(len(await self.snapshots(in_room)), 1)
+        self.assertEqual(len(await self.snapshots(elsewhere)), 1)
+        await coalescer.stop(self.conversation.id, self.typist.id)
+        self.assertEqual(len(await self.snapshots(in_room)), 1)
+        await in_room.disconnect()
+        await elsewhere.disconnect()
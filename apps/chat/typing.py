@@ -0,0 +1,167 @@
+"""
+Typing-indicator coalescer for chat WebSocket consumers.
+
+Clients emit typing_start/typing_stop on nearly every keystroke. Instead of
+fanning each event out to the channel layer, the coalescer keeps per-process
+typing state per (user, conversation), drops repeats, expires state that is
+not refreshed within a TTL, and flushes one batched ``typing_snapshot`` per
+conversation per window.
+"""
+
+import asyncio
+import time
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from apps.chat.models import Conversation
+
+
+class TypingCoalescer:
+    """Deduplicates typing events and broadcasts them as batched snapshots."""
+
+    PARTICIPANTS_CACHE_SECONDS = 60
+
+    def __init__(self, window=None, ttl=None):
+        self.window = (
+            window
+            if window is not None
+            else getattr(settings, "CHAT_TYPING_WINDOW_MS", 300) / 1000
+        )
+        self.ttl = (
+            ttl if ttl is not None else getattr(settings, "CHAT_TYPING_TTL_SECONDS", 6)
+        )
+        # {conversation_id: {user_id: {"user": {...}, "expires": float}}}
+        self._typing = {}
+        # {conversation_id: {"started": {user_id: {...}}, "stopped": set()}}
+        self._pending = {}
+        self._flush_tasks = {}
+        self._expiry_tasks = {}
+        self._participants = {}
+
+    async def start(self, conversation_id, user):
+        """Record that ``user`` is typing; only new typers trigger a broadcast."""
+        conversation_typing = self._typing.setdefault(conversation_id, {})
+        is_new = user["id"] not in conversation_typing
+        conversation_typing[user["id"]] = {
+            "user": user,
+            "expires": time.monotonic() + self.ttl,
+        }
+        self._schedule_expiry(conversation_id, user["id"])
+
+        if is_new:
+            pending = self._get_pending(conversation_id)
+            pending["stopped"].discard(user["id"])
+            pending["started"][user["id"]] = user
+            self._schedule_flush(conversation_id)
+
+    async def stop(self, conversation_id, user_id):
+        """Record that ``user_id`` stopped typing, if they were typing."""
+        conversation_typing = self._typing.get(conversation_id, {})
+        if conversation_typing.pop(user_id, None) is None:
+            return
+        if not conversation_typing:
+            self._typing.pop(conversation_id, None)
+
+        task = self._expiry_tasks.pop((conversation_id, user_id), None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+        pending = self._get_pending(conversation_id)
+        if pending["started"].pop(user_id, None) is None:
+            pending["stopped"].add(user_id)
+        self._schedule_flush(conversation_id)
+
+    def _get_pending(self, conversation_id):
+        return self._pending.setdefault(
+            conversation_id, {"started": {}, "stopped": set()}
+        )
+
+    def _schedule_flush(self, conversation_id):
+        task = self._flush_tasks.get(conversation_id)
+        if task is None or task.done():
+            self._flush_tasks[conversation_id] = asyncio.create_task(
+                self._flush_later(conversation_id)
+            )
+
+    def _schedule_expiry(self, conversation_id, user_id):
+        key = (conversation_id, user_id)
+        task = self._expiry_tasks.get(key)
+        if task is None or task.done():
+            self._expiry_tasks[key] = asyncio.create_task(
+                self._expire_later(conversation_id, user_id)
+            )
+
+    async def _expire_later(self, conversation_id, user_id):
+        """Stop typing once the TTL lapses without a refresh."""
+        while True:
+            entry = self._typing.get(conversation_id, {}).get(user_id)
+            if entry is None:
+                return
+            remaining = entry["expires"] - time.monotonic()
+            if remaining <= 0:
+                self._expiry_tasks.pop((conversation_id, user_id), None)
+                await self.stop(conversation_id, user_id)
+                return
+            await asyncio.sleep(remaining)
+
+    async def _flush_later(self, conversation_id):
+        await asyncio.sleep(self.window)
+        pending = self._pending.pop(conversation_id, None)
+        self._flush_tasks.pop(conversation_id, None)
+        if not pending or not (pending["started"] or pending["stopped"]):
+            return
+
+        payload = {
+            "type": "typing_snapshot",
+            "conversation_id": conversation_id,
+            "typing": [
+                entry["user"]
+                for entry in self._typing.get(conversation_id, {}).values()
+            ],
+            "started": list(pending["started"].keys()),
+            "stopped": list(pending["stopped"]),
+        }
+        await self._broadcast(conversation_id, payload)
+
+    async def _broadcast(self, conversation_id, payload):
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        # Sockets opened on the conversation are in both groups; the user
+        # group copy has its own type so those sockets can skip it
+        try:
+            await channel_layer.group_send(
+                f"chat_{conversation_id}",
+                {"type": "typing.snapshot", "payload": payload},
+            )
+            user_event = {"type": "global.typing_snapshot", "payload": payload}
+            for participant_id in await self._get_participants(conversation_id):
+                await channel_layer.group_send(f"user_{participant_id}", user_event)
+        except Exception as e:
+            print(f"Typing snapshot broadcast failed: {e}")
+
+    async def _get_participants(self, conversation_id):
+        cached = self._participants.get(conversation_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        participant_ids = await self._load_participants(conversation_id)
+        self._participants[conversation_id] = (
+            participant_ids,
+            time.monotonic() + self.PARTICIPANTS_CACHE_SECONDS,
+        )
+        return participant_ids
+
+    @database_sync_to_async
+    def _load_participants(self, conversation_id):
+        return list(
+            Conversation.participants.through.objects.filter(
+                conversation_id=conversation_id
+            ).values_list("users_id", flat=True)
+        )
+
+
+# Global instance
+typing_coalescer = TypingCoalescer()
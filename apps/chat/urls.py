@@ -23,11 +23,31 @@ urlpatterns = [
         name="group-profile-upload",
     ),
     path("upload/", views.FileUploadView.as_view(), name="chat-file-upload"),
+    path(
+        "uploads/",
+        views.ChunkedUploadStartView.as_view(),
+        name="chat-chunked-upload-start",
+    ),
+    path(
+        "uploads/<uuid:upload_id>/",
+        views.ChunkedUploadChunkView.as_view(),
+        name="chat-chunked-upload-chunk",
+    ),
+    path(
+        "uploads/<uuid:upload_id>/complete/",
+        views.ChunkedUploadCompleteView.as_view(),
+        name="chat-chunked-upload-complete",
+    ),
     path(
         "get_conversation_messages/<int:conversation>/",
         views.ConversationMessageView.as_view(),
         name="get_conversation_messages",
     ),
+    path(
+        "messages/search/",
+        views.MessageSearchView.as_view(),
+        name="message-search",
+    ),
     path(
         "message_read/<int:message_id>/",
         views.MessageReadView.as_view(),
@@ -1,6 +1,12 @@
 import os
+from datetime import timedelta
 
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.text import get_valid_filename
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
@@ -10,15 +16,24 @@ from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 
 from apps.base import permissions
-from apps.base.pagination import CustomPageNumberPagination
+from apps.base.pagination import KeysetPagination
 from apps.base.response import ApiResponse
-from apps.chat.models import Conversation, Message, MessageReaction, MessageStatus
+from apps.chat.models import (
+    ChatMediaUpload,
+    Conversation,
+    Message,
+    MessageReaction,
+    MessageStatus,
+)
+from apps.chat.search import highlight_messages, search_messages
 from apps.chat.serializers import (
+    CompactMessageSerializer,
     ConversationCreateSerializer,
     ConversationSerializer,
     MessageReactionSerializer,
     MessageSerializer,
 )
+from apps.chat.tasks import IMAGE_EXTENSIONS, generate_message_thumbnail
 
 # from apps.employee.custom_filters import ConversationMessageFilter
 from apps.employee.serializers import EmployeeListSerializer
@@ -30,6 +45,17 @@ from apps.superadmin.models import Users
 
 # Create your views here.
 
+ALLOWED_EXTENSIONS = {
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".pdf",
+    ".doc",
+    ".docx",
+    ".txt",
+}
+
 
 class CreateConversationView(generics.CreateAPIView):
     serializer_class = ConversationCreateSerializer
@@ -134,16 +160,7 @@ class FileUploadView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = MessageSerializer
 
-    ALLOWED_EXTENSIONS = {
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".gif",
-        ".pdf",
-        ".doc",
-        ".docx",
-        ".txt",
-    }
+    ALLOWED_EXTENSIONS = ALLOWED_EXTENSIONS
     MAX_FILE_SIZE = 10 * 1024 * 1024
 
     def post(self, request, *args, **kwargs):
@@ -200,7 +217,11 @@ class FileUploadView(generics.CreateAPIView):
             )
 
             if serializer.is_valid():
-                serializer.save(sender=request.user)
+                message = serializer.save(sender=request.user)
+                if message.media:
+                    transaction.on_commit(
+                        lambda: generate_message_thumbnail.delay(message.id)
+                    )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -212,27 +233,341 @@ class FileUploadView(generics.CreateAPIView):
             )
 
 
+class ChunkedUploadStartView(generics.GenericAPIView):
+    """
+    Open a resumable chunked upload session for a chat attachment.
+
+    POST { "conversation": 1, "file_name": "report.pdf", "total_size": 123456 }
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        conv_id = request.data.get("conversation")
+        file_name = get_valid_filename(request.data.get("file_name") or "")
+        try:
+            total_size = int(request.data.get("total_size", 0))
+        except (TypeError, ValueError):
+            total_size = 0
+
+        if not conv_id or not file_name or total_size <= 0:
+            return Response(
+                {"error": "conversation, file_name and total_size are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if total_size > settings.CHAT_UPLOAD_MAX_SIZE:
+            return Response(
+                {"error": "File size exceeds upload limit"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if os.path.splitext(file_name)[1].lower() not in ALLOWED_EXTENSIONS:
+            return Response(
+                {"error": "File type not allowed"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        conv = get_object_or_404(Conversation, id=conv_id)
+        if not conv.participants.filter(id=request.user.id).exists():
+            return Response(
+                {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = ChatMediaUpload.objects.create(
+            uploader=request.user,
+            conversation=conv,
+            file_name=file_name,
+            total_size=total_size,
+        )
+        os.makedirs(settings.CHAT_UPLOAD_TEMP_DIR, exist_ok=True)
+        open(upload.temp_path, "wb").close()
+
+        return Response(
+            {
+                "upload_id": str(upload.upload_id),
+                "chunk_size": settings.CHAT_UPLOAD_CHUNK_SIZE,
+                "received_size": 0,
+                "total_size": total_size,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ChunkedUploadChunkView(generics.GenericAPIView):
+    """
+    Query or append to a chunked upload session.
+
+    GET returns the bytes received so far so clients can resume.
+    PUT ?offset=<received_size> with the raw chunk as the request body
+    (application/octet-stream); the body is streamed to disk, never parsed.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    STREAM_BLOCK_SIZE = 64 * 1024
+
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(
+            ChatMediaUpload, upload_id=upload_id, uploader=request.user
+        )
+
+    def get(self, request, upload_id, *args, **kwargs):
+        upload = self.get_upload(request, upload_id)
+        return Response(
+            {
+                "upload_id": str(upload.upload_id),
+                "status": upload.status,
+                "received_size": upload.received_size,
+                "total_size": upload.total_size,
+            }
+        )
+
+    def put(self, request, upload_id, *args, **kwargs):
+        try:
+            offset = int(request.query_params.get("offset", -1))
+        except (TypeError, ValueError):
+            offset = -1
+
+        stream = request.stream
+        if stream is None:
+            return Response(
+                {"error": "Chunk body is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        upload = self.get_upload(request, upload_id)
+        if upload.status not in ("pending", "receiving"):
+            return Response(
+                {"error": f"Upload is {upload.status}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Reserve the offset without holding a row lock while the body is
+        # written; a concurrent or out of sync chunk does not match. A
+        # reservation whose writer went away is taken over once its lease ends
+        reserved_at = timezone.now()
+        lease = timedelta(seconds=settings.CHAT_UPLOAD_CHUNK_LEASE_SECONDS)
+        reserved = (
+            ChatMediaUpload.objects.filter(pk=upload.pk, received_size=offset)
+            .filter(
+                Q(status="pending")
+                | Q(status="receiving", updated_at__lt=reserved_at - lease)
+            )
+            .update(status="receiving", updated_at=reserved_at)
+        )
+        if not reserved:
+            upload.refresh_from_db(fields=["status", "received_size"])
+            # Client is out of sync; tell it where to resume from
+            return Response(
+                {
+                    "error": "Offset mismatch",
+                    "received_size": upload.received_size,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        max_chunk = settings.CHAT_UPLOAD_CHUNK_SIZE
+        # Stays at the offset unless the whole chunk is written
+        upload.received_size = offset
+        try:
+            written = 0
+            with open(upload.temp_path, "r+b") as part:
+                part.seek(offset)
+                while True:
+                    block = stream.read(self.STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > max_chunk or offset + written > upload.total_size:
+                        part.truncate(offset)
+                        return Response(
+                            {"error": "Chunk exceeds allowed size"},
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
+                    part.write(block)
+            upload.received_size = offset + written
+        finally:
+            # Release the reservation, unless it expired and another
+            # request has taken it over since
+            ChatMediaUpload.objects.filter(
+                pk=upload.pk, status="receiving", updated_at=reserved_at
+            ).update(
+                status="pending",
+                received_size=upload.received_size,
+                updated_at=timezone.now(),
+            )
+
+        return Response(
+            {
+                "upload_id": str(upload.upload_id),
+                "received_size": upload.received_size,
+                "total_size": upload.total_size,
+            }
+        )
+
+
+class ChunkedUploadCompleteView(generics.GenericAPIView):
+    """
+    Finish a chunked upload and post it as a chat message.
+
+    POST { "text": "", "msg_type": "file", "reply_to_id": null }
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id, *args, **kwargs):
+        upload = get_object_or_404(
+            ChatMediaUpload, upload_id=upload_id, uploader=request.user
+        )
+        # Claim the session in one short update so the file copy below runs
+        # without a row lock; a second complete request finds it taken
+        claimed = ChatMediaUpload.objects.filter(
+            pk=upload.pk, status="pending", received_size=F("total_size")
+        ).update(status="completing", updated_at=timezone.now())
+        if not claimed:
+            upload.refresh_from_db(fields=["status", "received_size"])
+            if upload.status != "pending":
+                return Response(
+                    {"error": f"Upload is {upload.status}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "error": "Upload is incomplete",
+                    "received_size": upload.received_size,
+                    "total_size": upload.total_size,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ext = os.path.splitext(upload.file_name)[1].lower()
+        default_type = "image" if ext in IMAGE_EXTENSIONS else "file"
+
+        message = None
+        try:
+            with open(upload.temp_path, "rb") as part:
+                serializer = MessageSerializer(
+                    data={
+                        "conversation": upload.conversation_id,
+                        "text": request.data.get("text", ""),
+                        "reply_to_id": request.data.get("reply_to_id") or None,
+                        "media": File(part, name=upload.file_name),
+                        "msg_type": request.data.get("msg_type", default_type),
+                    },
+                    context={"request": request},
+                )
+                if not serializer.is_valid():
+                    return Response(
+                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
+                    )
+                # Storage reads the part file in chunks; it is never held in memory
+                with transaction.atomic():
+                    message = serializer.save(sender=request.user)
+                    ChatMediaUpload.objects.filter(pk=upload.pk).update(
+                        status="completed", message=message, updated_at=timezone.now()
+                    )
+                    transaction.on_commit(
+                        lambda: generate_message_thumbnail.delay(message.id)
+                    )
+        finally:
+            if message is None:
+                # Let the client fix the request and complete again
+                ChatMediaUpload.objects.filter(
+                    pk=upload.pk, status="completing"
+                ).update(status="pending", updated_at=timezone.now())
+
+        try:
+            os.remove(upload.temp_path)
+        except FileNotFoundError:
+            pass
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class ConversationMessageView(generics.ListAPIView):
+    """
+    Message history for a conversation, newest first.
+
+    Paginated by ``before``/``after`` keyset cursors; pass ``compact=1`` to
+    receive ``sender_id`` instead of nested sender objects.
+    """
+
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
-        filters.OrderingFilter,
         filters.SearchFilter,
     ]
     # filterset_class = ConversationMessageFilter
-    pagination_class = CustomPageNumberPagination
+    pagination_class = KeysetPagination
+
+    def is_compact(self):
+        return self.request.query_params.get("compact") in ("1", "true", "True")
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return CompactMessageSerializer
+        return MessageSerializer
 
     def get_queryset(self):
         conv = self.kwargs["conversation"]
-        print(f"==>> conv: {conv}")
-        return (
-            Message.objects.filter(conversation=conv)
-            .prefetch_related("sender__department", "sender__position")
-            .order_by("-created_at")
+        queryset = Message.objects.filter(
+            conversation=conv, conversation__participants=self.request.user
+        ).select_related("reply_to")
+        if self.is_compact():
+            return queryset.prefetch_related("reactions")
+        return queryset.select_related("sender", "reply_to__sender").prefetch_related(
+            "reactions__user"
         )
 
 
+class MessageSearchView(generics.ListAPIView):
+    """
+    Full-text search across the user's conversations, newest first.
+
+    GET ?q=<terms>[&conversation=<id>][&before=<cursor>][&limit=<n>]
+    Encrypted messages are never matched. Each result carries a
+    ``highlight`` snippet with matched terms wrapped in <mark> tags.
+    """
+
+    serializer_class = CompactMessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    conversation_id = None
+    pagination_class = KeysetPagination
+
+    def get_search_query(self):
+        return (self.request.query_params.get("q") or "").strip()
+
+    def get_queryset(self):
+        queryset = Message.objects.filter(
+            conversation__participants=self.request.user,
+            conversation__is_deleted=False,
+        )
+        if self.conversation_id is not None:
+            queryset = queryset.filter(conversation_id=self.conversation_id)
+        return search_messages(queryset, self.get_search_query()).prefetch_related(
+            "reactions"
+        )
+
+    def list(self, request, *args, **kwargs):
+        query = self.get_search_query()
+        if len(query) < 2:
+            return Response(
+                {"error": "Search query must be at least 2 characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        conversation_id = request.query_params.get("conversation")
+        if conversation_id and not conversation_id.isdigit():
+            return Response(
+                {"error": "conversation must be a conversation id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        self.conversation_id = int(conversation_id) if conversation_id else None
+
+        page = self.paginate_queryset(self.get_queryset())
+        highlights = highlight_messages([msg.id for msg in page], query)
+        data = self.get_serializer(page, many=True).data
+        for item in data:
+            item["highlight"] = highlights.get(item["id"])
+        return self.get_paginated_response(data)
+
+
 class MessageReadView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
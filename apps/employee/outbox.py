@@ -0,0 +1,34 @@
+"""
+Outbox events for payslip delivery.
+
+Generating the payslip PDF and mailing it is the slowest part of payslip
+generation, so producers publish ``payslip.email`` and, once the payslip
+row has committed, the outbox queues ``send_payslip_email_task`` to render
+and send it.
+"""
+
+from apps.base.outbox import outbox_handler, publish
+
+
+def enqueue_payslip_email(payslip):
+    publish(
+        "payslip.email",
+        {"payslip_id": payslip.id},
+        idempotency_key=f"payslip.email:{payslip.id}",
+    )
+
+
+@outbox_handler("payslip.email", required=("payslip_id",), atomic=False)
+def send_payslip_emails(payloads):
+    # Imported here because the tasks module publishes these events
+    from apps.employee.tasks import send_payslip_email_task
+
+    failures = {}
+    for index, payload in enumerate(payloads):
+        try:
+            send_payslip_email_task.delay(payload["payslip_id"])
+        except Exception as e:
+            # Only this payslip is retried; the rest of the batch was queued
+            print(f"Could not queue payslip email {payload['payslip_id']}: {e}")
+            failures[index] = e
+    return failures
@@ -24,7 +24,7 @@ from apps.employee.models import (
 )
 from apps.employee.utils import calculate_leave_deduction, weekdays_count
 from apps.superadmin import models
-from apps.superadmin.tasks import send_email_task
+from apps.superadmin.outbox import enqueue_email
 
 
 class EmployeeCreateSerializer(serializers.ModelSerializer):
@@ -100,13 +100,11 @@ class EmployeeCreateSerializer(serializers.ModelSerializer):
                 HR Team
                 {common_data.name}
             """
-            send_email_task(
+            enqueue_email(
                 subject=f"Welcome to {common_data.name}!",
                 to_email=user.email,
                 text_body=text_body,
-                html_body=None,
-                pdf_bytes=None,
-                filename=None,
+                idempotency_key=f"welcome:{user.id}",
             )
             print("done success.......")
         except Exception as e:
@@ -5,6 +5,7 @@ from apps.attendance.models import EmployeeAttendance
 from apps.base import constants
 from apps.employee.models import LeaveBalance, PaySlip
 from apps.notification.models import NotificationType
+from apps.notification.outbox import enqueue_notification
 from apps.notification.services import create_notification
 from apps.superadmin.models import CommonData
 
@@ -25,6 +26,12 @@ def leave_balance_post_save(sender, instance, **kwargs):
 @receiver(post_save, sender=EmployeeAttendance)
 def notify_on_attendance(sender, instance, created, **kwargs):
     print("this signal called.....notify_on_attendance.........")
+    # Runs inside the check-in/out transaction, so only queue the
+    # notifications; the outbox worker delivers them after commit. Keys make
+    # repeated saves of the same state (pause/resume, recalculation) no-ops.
+    key = f"attendance:{instance.id}"
+    if instance.check_out:
+        key = f"{key}:{instance.check_out.isoformat()}"
     if (
         instance.check_in
         and not instance.check_out
@@ -32,74 +39,68 @@ def notify_on_attendance(sender, instance, created, **kwargs):
         and instance.break_hours == 0
         and created
     ):
-        notification_type = NotificationType.objects.filter(
-            code=constants.ATTENDANCE_REMINDER
-        ).first()
-        create_notification(
+        notification_type = NotificationType.by_code(constants.ATTENDANCE_REMINDER)
+        enqueue_notification(
             recipient=instance.employee,
             notification_type=notification_type,
             title="Attendance Alert",
             message="Let's begin on a positive note.",
             related_object=instance,
+            idempotency_key=f"{key}:check_in",
         )
 
     if instance.check_in and instance.check_out and instance.work_hours >= 0:
-        notification_type = NotificationType.objects.filter(
-            code=constants.ATTENDANCE_REMINDER
-        ).first()
-        create_notification(
+        notification_type = NotificationType.by_code(constants.ATTENDANCE_REMINDER)
+        enqueue_notification(
             recipient=instance.employee,
             notification_type=notification_type,
             title="Attendance Alert",
             message="Wrapped up for the day, see you soon.",
             related_object=instance,
+            idempotency_key=f"{key}:check_out",
         )
 
     if instance.check_out:
         if instance.status == constants.PENDING:
-            notification_type = NotificationType.objects.filter(
-                code=constants.PENDING
-            ).first()
-            create_notification(
+            notification_type = NotificationType.by_code(constants.PENDING)
+            enqueue_notification(
                 recipient=instance.employee,
                 notification_type=notification_type,
                 title="Working Hours Alert",
+                idempotency_key=f"{key}:{instance.status}",
                 message="Your attendance request is pending.",
                 related_object=instance,
             )
 
         if instance.status == constants.PRESENT:
-            notification_type = NotificationType.objects.filter(
-                code=constants.APPROVED
-            ).first()
-            create_notification(
+            notification_type = NotificationType.by_code(constants.APPROVED)
+            enqueue_notification(
                 recipient=instance.employee,
                 notification_type=notification_type,
                 title="Working Hours Alert",
+                idempotency_key=f"{key}:{instance.status}",
                 message="Your attendance has been completed.",
                 related_object=instance,
             )
 
         if instance.status == constants.REJECTED:
-            notification_type = NotificationType.objects.filter(
-                code=constants.ATTENDANCE_REJECTED
-            ).first()
-            create_notification(
+            notification_type = NotificationType.by_code(constants.ATTENDANCE_REJECTED)
+            enqueue_notification(
                 recipient=instance.employee,
                 notification_type=notification_type,
                 title="Working Hours Alert",
+                idempotency_key=f"{key}:{instance.status}",
                 message="Your attendance has been rejected.",
                 related_object=instance,
             )
 
         if instance.status == constants.INCOMPLETE_HOURS:
-            notification_type = NotificationType.objects.filter(
-                code=constants.ATTENDANCE_REMINDER
-            ).first()
-            create_notification(
+            notification_type = NotificationType.by_code(constants.ATTENDANCE_REMINDER)
+            enqueue_notification(
                 recipient=instance.employee,
                 notification_type=notification_type,
                 title="Working Hours Alert",
+                idempotency_key=f"{key}:{instance.status}",
                 message="Your work hours are incomplete today.",
                 related_object=instance,
             )
@@ -109,9 +110,7 @@ def notify_on_attendance(sender, instance, created, **kwargs):
 def notify_on_payslip_generated(sender, instance, created, **kwargs):
     print("this signal called.....notify_on_payslip_generated.........")
     if created:
-        notification_type = NotificationType.objects.filter(
-            code=constants.PAYSLIP_GENERATED
-        ).first()
+        notification_type = NotificationType.by_code(constants.PAYSLIP_GENERATED)
         create_notification(
             recipient=instance.employee,
             notification_type=notification_type,
@@ -10,15 +10,17 @@ from apps.attendance.models import EmployeeAttendance
 from apps.attendance.utils import check_out
 from apps.base import constants
 from apps.employee.models import LeaveBalance, PaySlip
+from apps.employee.outbox import enqueue_payslip_email
 from apps.employee.utils import (
     generate_payslip_pdf_bytes,
     holidays_in_month,
     weekdays_count,
 )
+from apps.notification.digest import NotificationDigest
 from apps.notification.models import NotificationType
 from apps.notification.services import create_notification
 from apps.superadmin import models
-from apps.superadmin.tasks import send_email_task
+from apps.superadmin.tasks import EMAIL_RETRY_ERRORS, send_email_task
 
 
 @shared_task
@@ -124,9 +126,7 @@ def notify_employee_birthday():
     recipients = models.Users.objects.filter(is_active=True)
     for birthday_employee in employee_birthday_today:
         for recipient in recipients.exclude(id=birthday_employee.id):
-            notification_type = NotificationType.objects.filter(
-                code=constants.BIRTHDAY
-            ).first()
+            notification_type = NotificationType.by_code(constants.BIRTHDAY)
             create_notification(
                 recipient=recipient,
                 actor=birthday_employee,
@@ -146,9 +146,7 @@ def notify_work_anniversary():
         if joining_date:
             anniversary_date = joining_date.replace(year=today.year)
             if anniversary_date == today:
-                notification_type = NotificationType.objects.filter(
-                    code=constants.WORK_ANNIVERSARY
-                ).first()
+                notification_type = NotificationType.by_code(constants.WORK_ANNIVERSARY)
                 create_notification(
                     recipient=employee,
                     notification_type=notification_type,
@@ -250,28 +248,35 @@ def generate_monthly_payslips():
             net_salary=net_salary,
         )
 
-        # Send email to user with generated payslip PDF
-        try:
-            payslip_pdf = generate_payslip_pdf_bytes(payslip)
-            send_email_task.delay(
-                subject=f"Payment-Slip Generated for {payslip.month}",
-                to_email=payslip.employee.email,
-                text_body=(
-                    f"Hi {payslip.employee.first_name} {payslip.employee.last_name},"
-                    f"\n\nYour Payment-slip has been generated for {payslip.month}."
-                    "\n\nYou can Download it from here."
-                ),
-                pdf_bytes=payslip_pdf,
-                filename=f"payslip_{payslip.id}.pdf",
-            )
-        except Exception as e:
-            print(f"Payslip email failed for {employee.email}: {e}")
+        # Payslip PDF rendering and mailing run in send_payslip_email_task
+        enqueue_payslip_email(payslip)
 
         print(f"Payslip generated for {employee.email} - {month_name}")
 
     return f"Payslips generated successfully for {month_name}"
 
 
+@shared_task(autoretry_for=EMAIL_RETRY_ERRORS, retry_backoff=True, max_retries=5)
+def send_payslip_email_task(payslip_id):
+    """Render a payslip PDF and mail it to the employee."""
+    payslip = PaySlip.objects.select_related("employee").filter(id=payslip_id).first()
+    if payslip is None:
+        return f"Payslip {payslip_id} no longer exists"
+
+    send_email_task(
+        subject=f"Payment-Slip Generated for {payslip.month}",
+        to_email=payslip.employee.email,
+        text_body=(
+            f"Hi {payslip.employee.first_name} {payslip.employee.last_name},"
+            f"\n\nYour Payment-slip has been generated for {payslip.month}."
+            "\n\nYou can Download it from here."
+        ),
+        pdf_bytes=generate_payslip_pdf_bytes(payslip),
+        filename=f"payslip_{payslip.id}.pdf",
+    )
+    return f"Payslip email sent to {payslip.employee.email}"
+
+
 def calculate_leave_deduction(employee, start_date, end_date, leave_balance):
     """Calculate leave deduction based on leave types and monthly allocation - UPDATES BALANCE."""
     # Get approved leaves in the month
@@ -571,25 +576,27 @@ def notify_frequent_late_comings():
     if not late_coming_employees.exists():
         return "No late comers today"
 
-    recipients = models.Users.objects.filter(is_active=True, role="admin")
+    recipients = list(models.Users.objects.filter(is_active=True, role="admin"))
     print(f"==>> recipients: {recipients}")
-    for late_coming_employee in late_coming_employees:
-        for recipient in recipients.exclude(id=late_coming_employee):
-            notification_type = NotificationType.objects.filter(
-                code=constants.LATE_COMING
-            ).first()
-            employee_data = models.Users.objects.filter(id=late_coming_employee).first()
-            create_notification(
-                recipient=recipient,
+    digest = NotificationDigest(
+        NotificationType.by_code(constants.LATE_COMING),
+        title="🚨 Late Coming Alert!",
+        summary="{count} employees are late today.",
+    )
+    for employee_data in models.Users.objects.filter(id__in=late_coming_employees):
+        for recipient in recipients:
+            if recipient.id == employee_data.id:
+                continue
+            digest.add(
+                recipient,
                 actor=employee_data,
-                notification_type=notification_type,
-                title="🚨 Late Coming Alert!",
                 message=(
-                    f"{employee_data.first_name}"
-                    f"{employee_data.last_name} is late today.",
+                    f"{employee_data.first_name} "
+                    f"{employee_data.last_name} is late today."
                 ),
                 related_object=employee_data,
             )
+    digest.send()
 
 
 @shared_task
@@ -631,9 +638,7 @@ def notify_employee_next_holiday():
 
     if next_day.weekday() == 5:
         receipents = models.Users.objects.filter(is_active=True)
-        notification_type = NotificationType.objects.filter(
-            code=constants.NEXT_DAY_HOLIDAY
-        ).first()
+        notification_type = NotificationType.by_code(constants.NEXT_DAY_HOLIDAY)
         for receipent in receipents:
             create_notification(
                 recipient=receipent,
@@ -645,9 +650,7 @@ def notify_employee_next_holiday():
 
     if next_holiday.date == next_day:
         receipents = models.Users.objects.filter(is_active=True)
-        notification_type = NotificationType.objects.filter(
-            code=constants.NEXT_DAY_HOLIDAY
-        ).first()
+        notification_type = NotificationType.by_code(constants.NEXT_DAY_HOLIDAY)
         for receipent in receipents:
             create_notification(
                 recipient=receipent,
@@ -677,9 +680,7 @@ def leave_balance_update_after_probation():
             receipent = models.Users.objects.filter(
                 Q(role="admin", is_active=True) | Q(id=employee.id)
             )
-            notification_type = NotificationType.objects.filter(
-                code=constants.LEAVE_BALANCE_UPDATE
-            ).first()
+            notification_type = NotificationType.by_code(constants.LEAVE_BALANCE_UPDATE)
             create_notification(
                 recipient=receipent,
                 notification_type=notification_type,
@@ -694,30 +695,30 @@ def leave_balance_update_after_probation():
 @shared_task
 def notify_employee_for_daily_report():
     today = timezone.now().date()
+    submitted_employee_ids = models.DailyReport.objects.filter(
+        report_date=today
+    ).values("employee_id")
     employees = models.Users.objects.filter(
         role=constants.EMPLOYEE_USER, is_active=True
+    ).exclude(id__in=submitted_employee_ids)
+    notification_type = NotificationType.by_code(constants.DAILY_REPORT)
+    admin_receipent = list(models.Users.objects.filter(role="admin", is_active=True))
+    digest = NotificationDigest(
+        notification_type,
+        title="Daily Report Alert",
+        summary="{count} employees have not submitted the daily report yet.",
     )
     for employee in employees:
-        daily_report = models.DailyReport.objects.filter(
-            employee=employee, report_date=today
-        ).exists()
-        if not daily_report:
-            notification_type = NotificationType.objects.filter(
-                code=constants.DAILY_REPORT
-            ).first()
-            create_notification(
-                recipient=employee,
-                notification_type=notification_type,
-                title="Daily Report Alert",
-                message="We have noticed that you have forgot to update today's report.",
-                related_object=daily_report,
+        create_notification(
+            recipient=employee,
+            notification_type=notification_type,
+            title="Daily Report Alert",
+            message="We have noticed that you have forgot to update today's report.",
+        )
+        for receipent in admin_receipent:
+            digest.add(
+                receipent,
+                actor=employee,
+                message=f"{employee.first_name} {employee.last_name} has not submitted the daily report yet.",
             )
-            admin_receipent = models.Users.objects.filter(role="admin", is_active=True)
-            for receipent in admin_receipent:
-                create_notification(
-                    recipient=receipent,
-                    notification_type=notification_type,
-                    title="Daily Report Alert",
-                    message=f"{employee.first_name} {employee.last_name} has not submitted the daily report yet.",
-                    related_object=daily_report,
-                )
+    digest.send()
@@ -7,3 +7,4 @@ from apps.superadmin.admin import BaseAdmin
 
 admin.site.register(models.NotificationType, BaseAdmin)
 admin.site.register(models.Notification, BaseAdmin)
+admin.site.register(models.ArchivedNotification, BaseAdmin)
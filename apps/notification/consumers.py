@@ -1,14 +1,14 @@
 import logging
 
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
-from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import AccessToken
 
-User = get_user_model()
+from apps.chat.admission import AdmissionMixin
+from apps.chat.middleware import resolve_ws_user
+
 logger = logging.getLogger(__name__)
 
 
-class NotificationConsumer(AsyncJsonWebsocketConsumer):
+class NotificationConsumer(AdmissionMixin, AsyncJsonWebsocketConsumer):
     async def connect(self):
         user = self.scope.get("user")
         print(f"==>> user: {user}")
@@ -22,9 +22,10 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
                 token = query_string.split("token=")[1].split("&")[0]
             if token:
                 try:
-                    access_token = AccessToken(token)
-                    user_id = access_token.payload.get("user_id")
-                    user = await User.objects.aget(id=user_id)
+                    user = await resolve_ws_user(token)
+                    if user is None:
+                        await self.close()
+                        return
                     self.scope["user"] = user
                 except Exception as e:
                     print(f"Token error: {e}")
@@ -34,6 +35,9 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
                 await self.close()
                 return
 
+        if not await self.admit(user.id):
+            return
+
         self.user = user
         self.room_group_name = f"notifications_{self.user.id}"
         try:
@@ -47,11 +51,13 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             logger.info("Connection established successfully - waiting for messages")
         except Exception as e:
             logger.error(f"Error in group_add or accept: {e}")
+            self.release_admission()
             await self.close()
             return
 
     async def disconnect(self, close_code):
         logger.info(f"WebSocket disconnecting with code: {close_code}")
+        self.release_admission()
         if hasattr(self, "room_group_name"):
             await self.channel_layer.group_discard(
                 self.room_group_name, self.channel_name
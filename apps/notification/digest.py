@@ -0,0 +1,85 @@
+"""
+Digest delivery for batch notification jobs.
+
+Scheduled jobs that alert the same recipients about many subjects (missing
+daily reports, late comers) collect their alerts in a ``NotificationDigest``.
+For notification types with ``digest`` enabled, each recipient gets one
+summary notification per job run whose ``details`` list keeps every
+individual alert; other types are delivered one notification per alert,
+exactly as before.
+"""
+
+from apps.notification.services import create_notification
+
+
+class NotificationDigest:
+    """Collects alerts per recipient for one job run and sends them together."""
+
+    def __init__(self, notification_type, title, summary):
+        """
+        ``summary`` is formatted with ``count`` for the digest message,
+        e.g. "{count} employees are late today."
+        """
+        self.notification_type = notification_type
+        self.title = title
+        self.summary = summary
+        self.enabled = bool(notification_type and notification_type.digest)
+        # {recipient_id: {"recipient": Users, "alerts": [...]}}
+        self._pending = {}
+
+    def add(self, recipient, *, message, actor=None, related_object=None):
+        """Queue an alert for ``recipient``; sent right away if digest is off."""
+        if not self.enabled:
+            create_notification(
+                recipient=recipient,
+                actor=actor,
+                notification_type=self.notification_type,
+                title=self.title,
+                message=message,
+                related_object=related_object,
+            )
+            return
+
+        entry = self._pending.setdefault(
+            recipient.id, {"recipient": recipient, "alerts": []}
+        )
+        entry["alerts"].append(
+            {"actor": actor, "message": message, "related_object": related_object}
+        )
+
+    def send(self):
+        """Create one notification per recipient; returns the number created."""
+        sent = 0
+        for entry in self._pending.values():
+            alerts = entry["alerts"]
+            if len(alerts) == 1:
+                create_notification(
+                    recipient=entry["recipient"],
+                    notification_type=self.notification_type,
+                    title=self.title,
+                    **alerts[0],
+                )
+            else:
+                create_notification(
+                    recipient=entry["recipient"],
+                    notification_type=self.notification_type,
+                    title=self.title,
+                    message=self.summary.format(count=len(alerts)),
+                    details=[self._detail(alert) for alert in alerts],
+                )
+            sent += 1
+
+        self._pending = {}
+        return sent
+
+    @staticmethod
+    def _detail(alert):
+        related_object = alert["related_object"]
+        return {
+            "actor_id": alert["actor"].id if alert["actor"] else None,
+            "object_type": (
+                related_object._meta.label_lower if related_object else None
+            ),
+            "object_id": related_object.pk if related_object else None,
+            "message": alert["message"],
+        }
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0009_alter_notificationtype_code"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("original_id", models.BigIntegerField(unique=True)),
+                ("actor_id", models.BigIntegerField(blank=True, null=True)),
+                ("content_type_id", models.IntegerField(blank=True, null=True)),
+                ("object_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("title", models.CharField(max_length=255)),
+                ("message", models.TextField(blank=True, null=True)),
+                ("url", models.CharField(blank=True, default="/", max_length=500)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "notification_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_notifications",
+                        to="notification.notificationtype",
+                    ),
+                ),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_notifications",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["recipient", "-created_at"],
+                        name="notificatio_recipie_b02f7a_idx",
+                    ),
+                    models.Index(
+                        fields=["archived_at"], name="notificatio_archive_cb7d4c_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
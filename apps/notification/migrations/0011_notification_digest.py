@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:57
+
+from django.db import migrations, models
+
+DIGEST_CODES = ["daily_report", "late_coming"]
+
+
+def enable_digest(apps, schema_editor):
+    NotificationType = apps.get_model("notification", "NotificationType")
+    NotificationType.objects.filter(code__in=DIGEST_CODES).update(digest=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0010_archivednotification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivednotification",
+            name="details",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="details",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="notificationtype",
+            name="digest",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(enable_digest, migrations.RunPython.noop),
+    ]
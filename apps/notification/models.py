@@ -5,9 +5,13 @@ Handles notification types, user notifications with generic content linking,
 and read status tracking for the HRMS notification system.
 """
 
+import time
+
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 
 from apps.base.models import BaseModel
 from apps.base.validators import BaseValidator
@@ -21,10 +25,72 @@ class NotificationType(BaseModel):
         max_length=50, unique=True, validators=[BaseValidator.validate_name]
     )
     name = models.CharField(max_length=100)
+    # Batch jobs group alerts of digest types into one summary per recipient
+    digest = models.BooleanField(default=False)
+
+    # Process-local {code: NotificationType} registry used by by_code()
+    _registry = {}
+    _registry_expires = 0.0
+    _registry_version = None
+    _registry_checked = 0.0
+    # Bumped in the shared cache whenever a type changes so every process
+    # reloads its registry instead of waiting out the expiry
+    REGISTRY_VERSION_KEY = "notification_type_registry_version"
+    # How often by_code() looks at the shared version
+    REGISTRY_CHECK_SECONDS = 5
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def by_code(cls, code):
+        """
+        Return the notification type for ``code`` (or None).
+
+        Served from the process registry; the shared version is read from the
+        cache at most every REGISTRY_CHECK_SECONDS and the database only when
+        the registry is reloaded.
+        """
+        now = time.monotonic()
+        if now >= cls._registry_expires:
+            cls.warm_registry()
+        elif now >= cls._registry_checked:
+            cls._registry_checked = now + cls.REGISTRY_CHECK_SECONDS
+            version = cache.get(cls.REGISTRY_VERSION_KEY)
+            if version != cls._registry_version:
+                cls.warm_registry(version)
+
+        notification_type = cls._registry.get(code)
+        if notification_type is None:
+            # Unknown codes are not cached, so a type created elsewhere is
+            # picked up on the next call
+            notification_type = cls.objects.filter(code=code).first()
+            if notification_type is not None:
+                cls._registry[code] = notification_type
+        return notification_type
+
+    @classmethod
+    def warm_registry(cls, version=None):
+        """Load every notification type into the registry in one query."""
+        if version is None:
+            version = cache.get(cls.REGISTRY_VERSION_KEY)
+        cls._registry = {
+            notification_type.code: notification_type
+            for notification_type in cls.objects.all()
+        }
+        cls._registry_version = version
+        cls._registry_checked = time.monotonic() + cls.REGISTRY_CHECK_SECONDS
+        cls._registry_expires = time.monotonic() + getattr(
+            settings, "NOTIFICATION_TYPE_REGISTRY_SECONDS", 300
+        )
+
+    @classmethod
+    def clear_registry(cls):
+        """Drop this process's registry and invalidate it in every other one."""
+        cls._registry = {}
+        cls._registry_expires = 0.0
+        cache.set(cls.REGISTRY_VERSION_KEY, time.time_ns(), None)
+
 
 class Notification(BaseModel):
     """User notifications with generic content linking and read tracking."""
@@ -54,6 +120,8 @@ class Notification(BaseModel):
     title = models.CharField(max_length=255)
     message = models.TextField(blank=True, null=True)
     url = models.CharField(max_length=500, default="/", blank=True)
+    # Individual alerts folded into a digest notification
+    details = models.JSONField(null=True, blank=True)
 
     is_read = models.BooleanField(default=False)
 
@@ -69,3 +137,50 @@ class Notification(BaseModel):
 
     def __str__(self):
         return f"{self.notification_type} → {self.recipient}"
+
+    def delete(self):
+        """Soft delete, taking an unread notification out of the unread count."""
+        from apps.notification.unread_counter import unread_counter
+
+        counted = not (self.is_read or self.is_deleted)
+        super().delete()
+        if counted:
+            recipient_id = self.recipient_id
+            transaction.on_commit(lambda: unread_counter.decrement(recipient_id))
+
+    soft_delete = delete
+
+
+class ArchivedNotification(models.Model):
+    """Compact copy of a read notification moved out of the hot table."""
+
+    original_id = models.BigIntegerField(unique=True)
+    recipient = models.ForeignKey(
+        Users, on_delete=models.CASCADE, related_name="archived_notifications"
+    )
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    notification_type = models.ForeignKey(
+        NotificationType,
+        on_delete=models.PROTECT,
+        related_name="archived_notifications",
+    )
+    content_type_id = models.IntegerField(null=True, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True, null=True)
+    url = models.CharField(max_length=500, default="/", blank=True)
+    details = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["recipient", "-created_at"]),
+            models.Index(fields=["archived_at"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.notification_type} → {self.recipient} (archived)"
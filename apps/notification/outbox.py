@@ -0,0 +1,103 @@
+"""
+Notification outbox events.
+
+Signals and views on hot request paths (attendance check-in/out, leave
+approval) call ``enqueue_notification``, which only records a
+``notification.create`` outbox event in the caller's transaction. The
+outbox drain bulk-creates the notifications of a whole batch, and WebSocket
+and FCM delivery runs once that batch has committed; delivery errors are
+logged rather than retried, as the notification rows already exist.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from apps.base.outbox import outbox_handler, publish
+from apps.notification.models import Notification, NotificationType
+from apps.notification.services import get_notification_url
+from apps.notification.tasks import create_chat_notifications
+from apps.notification.unread_counter import unread_counter
+from apps.notification.websocket_service import NotificationWebSocketService
+from apps.superadmin.models import Users
+
+
+def enqueue_notification(
+    *,
+    recipient,
+    notification_type,
+    title,
+    message="",
+    actor=None,
+    related_object=None,
+    idempotency_key=None,
+):
+    """Queue a notification for delivery after the current transaction commits."""
+    code = getattr(notification_type, "code", notification_type)
+    if not code:
+        return
+
+    content_type_id = None
+    object_id = None
+    if related_object:
+        content_type_id = ContentType.objects.get_for_model(related_object.__class__).id
+        object_id = related_object.pk
+
+    publish(
+        "notification.create",
+        {
+            "recipient_id": recipient.id,
+            "code": code,
+            "title": title,
+            "message": message,
+            "actor_id": actor.id if actor else None,
+            "content_type_id": content_type_id,
+            "object_id": object_id,
+        },
+        idempotency_key=idempotency_key,
+    )
+
+
+@outbox_handler("notification.create", required=("recipient_id", "code", "title"))
+def create_notifications(payloads):
+    recipients = Users.objects.only("id", "role").in_bulk(
+        {payload["recipient_id"] for payload in payloads}
+    )
+
+    notifications = []
+    for payload in payloads:
+        notification_type = NotificationType.by_code(payload["code"])
+        recipient = recipients.get(payload["recipient_id"])
+        if notification_type is None or recipient is None:
+            print(f"Dropping outbox notification {payload}")
+            continue
+        notifications.append(
+            Notification(
+                recipient=recipient,
+                actor_id=payload.get("actor_id"),
+                notification_type=notification_type,
+                title=payload["title"],
+                message=payload.get("message", ""),
+                url=get_notification_url(notification_type, recipient),
+                content_type_id=payload.get("content_type_id"),
+                object_id=payload.get("object_id"),
+            )
+        )
+    notifications = Notification.objects.bulk_create(notifications)
+    transaction.on_commit(lambda: _deliver(notifications))
+
+
+@outbox_handler("chat.message_created", required=("message_id",))
+def notify_message_created(payloads):
+    # Messages published since the last drain are handled as one batch
+    create_chat_notifications([payload["message_id"] for payload in payloads])
+
+
+def _deliver(notifications):
+    # The notifications are committed by now, so a failed push must not fail
+    # the outbox batch: a retry would create them a second time
+    for notification in notifications:
+        try:
+            unread_counter.increment(notification.recipient_id)
+            NotificationWebSocketService.send_notification(notification)
+        except Exception as e:
+            print(f"Could not deliver notification {notification.id}: {e}")
@@ -0,0 +1,114 @@
+"""
+Notification retention: archive old read notifications and purge the archive.
+
+Read notifications older than NOTIFICATION_RETENTION_DAYS are copied into
+``ArchivedNotification`` and removed from the hot ``Notification`` table in
+batches, so the list endpoint, the (recipient, is_read) index and unread
+counts only ever scan recent rows. Soft-deleted rows past the cutoff are
+dropped without being archived. Archived rows are purged after
+NOTIFICATION_ARCHIVE_RETENTION_DAYS.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.notification.models import ArchivedNotification, Notification
+
+ARCHIVE_FIELDS = (
+    "id",
+    "recipient_id",
+    "actor_id",
+    "notification_type_id",
+    "content_type_id",
+    "object_id",
+    "title",
+    "message",
+    "url",
+    "details",
+    "created_at",
+    "is_read",
+    "is_deleted",
+)
+
+
+def _batch_size(batch_size):
+    return batch_size or getattr(settings, "NOTIFICATION_ARCHIVE_BATCH_SIZE", 1000)
+
+
+def archive_notifications(days=None, batch_size=None, max_batches=None):
+    """
+    Move read notifications older than ``days`` into the archive table.
+
+    Each batch is archived and deleted in its own transaction so a long run
+    never holds locks on the hot table for more than one batch.
+    Returns (archived, dropped) row counts.
+    """
+    days = days if days is not None else settings.NOTIFICATION_RETENTION_DAYS
+    batch_size = _batch_size(batch_size)
+    cutoff = timezone.now() - timedelta(days=days)
+
+    candidates = (
+        Notification.all_objects.filter(created_at__lt=cutoff)
+        .filter(Q(is_read=True) | Q(is_deleted=True))
+        .order_by("id")
+    )
+
+    archived = dropped = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            rows = list(candidates.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+
+            archive_rows = [
+                ArchivedNotification(
+                    original_id=row["id"],
+                    recipient_id=row["recipient_id"],
+                    actor_id=row["actor_id"],
+                    notification_type_id=row["notification_type_id"],
+                    content_type_id=row["content_type_id"],
+                    object_id=row["object_id"],
+                    title=row["title"],
+                    message=row["message"],
+                    url=row["url"],
+                    details=row["details"],
+                    created_at=row["created_at"],
+                )
+                for row in rows
+                if not row["is_deleted"]
+            ]
+            # ignore_conflicts keeps a re-run after a crash idempotent
+            ArchivedNotification.objects.bulk_create(
+                archive_rows, ignore_conflicts=True
+            )
+            Notification.all_objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+        archived += len(archive_rows)
+        dropped += len(rows) - len(archive_rows)
+        batches += 1
+
+    return archived, dropped
+
+
+def purge_archived_notifications(days=None, batch_size=None):
+    """Permanently delete archived notifications older than ``days``."""
+    days = days if days is not None else settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS
+    batch_size = _batch_size(batch_size)
+    cutoff = timezone.now() - timedelta(days=days)
+
+    purged = 0
+    while True:
+        ids = list(
+            ArchivedNotification.objects.filter(created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        purged += ArchivedNotification.objects.filter(id__in=ids).delete()[0]
+
+    return purged
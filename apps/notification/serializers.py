@@ -7,7 +7,11 @@ management for the HRMS notification system.
 
 from rest_framework import serializers
 
-from apps.notification.models import Notification, NotificationType
+from apps.notification.models import (
+    ArchivedNotification,
+    Notification,
+    NotificationType,
+)
 from apps.superadmin.models import Users
 
 
@@ -16,6 +20,7 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     actor = serializers.PrimaryKeyRelatedField(queryset=Users.objects.all())
     recipient = serializers.PrimaryKeyRelatedField(queryset=Users.objects.all())
+    details_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -30,8 +35,34 @@ class NotificationSerializer(serializers.ModelSerializer):
             "is_read",
             "created_at",
             "object_id",
+            "details_count",
         ]
 
+    def get_details_count(self, obj):
+        return len(obj.details) if obj.details else 0
+
+
+class ArchivedNotificationSerializer(serializers.ModelSerializer):
+    """Read-only serializer for archived notifications."""
+
+    id = serializers.IntegerField(source="original_id", read_only=True)
+
+    class Meta:
+        model = ArchivedNotification
+        fields = [
+            "id",
+            "notification_type",
+            "title",
+            "message",
+            "url",
+            "actor_id",
+            "created_at",
+            "archived_at",
+            "object_id",
+            "details",
+        ]
+        read_only_fields = fields
+
 
 class NotificationTypeSerializer(serializers.ModelSerializer):
     """Serializer for notification type configuration and management."""
@@ -42,4 +73,5 @@ class NotificationTypeSerializer(serializers.ModelSerializer):
             "id",
             "code",
             "name",
+            "digest",
         ]
@@ -14,7 +14,14 @@ def get_notification_url(notification_type, recipient):
 
 
 def create_notification(
-    *, recipient, actor=None, notification_type, title, message="", related_object=None
+    *,
+    recipient,
+    actor=None,
+    notification_type,
+    title,
+    message="",
+    related_object=None,
+    details=None,
 ):
     content_type = None
     object_id = None
@@ -32,6 +39,7 @@ def create_notification(
         url=get_notification_url(notification_type, recipient),
         content_type=content_type,
         object_id=object_id,
+        details=details,
     )
 
     # Send real-time notification
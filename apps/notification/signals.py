@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.base.outbox import publish
 from apps.chat.models import Message
+from apps.notification.models import Notification, NotificationType
+from apps.notification.unread_counter import unread_counter
 
 
 @receiver(
@@ -13,9 +17,31 @@ def notify_on_message(sender, instance, created, **kwargs):
     if not created:
         return
 
-    # Use Celery task to avoid async context issues
-    from celery import current_app
-
-    current_app.send_task(
-        "apps.notification.tasks.create_chat_notification", args=[instance.id]
+    # Recorded in the outbox so notifications fan out only for committed
+    # messages, once per message
+    publish(
+        "chat.message_created",
+        {"message_id": instance.id},
+        idempotency_key=f"chat.message_created:{instance.id}",
     )
+
+
+@receiver(
+    post_save,
+    sender=Notification,
+    dispatch_uid="notification_unread_counter_post_save",
+)
+def increment_unread_counter(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        # Counted on commit so a rolled back insert never inflates the badge
+        recipient_id = instance.recipient_id
+        transaction.on_commit(lambda: unread_counter.increment(recipient_id))
+
+
+@receiver(post_save, sender=NotificationType, dispatch_uid="notification_type_saved")
+@receiver(
+    post_delete, sender=NotificationType, dispatch_uid="notification_type_deleted"
+)
+def clear_notification_type_registry(sender, **kwargs):
+    # After commit, so no process reloads the old rows under the new version
+    transaction.on_commit(NotificationType.clear_registry)
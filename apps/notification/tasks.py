@@ -1,121 +1,113 @@
 from celery import shared_task
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 
 from apps.base import constants
-from apps.chat.connection_tracker import ChatConnectionTracker
-from apps.chat.models import Message
+from apps.chat.connection_tracker import chat_tracker
+from apps.chat.models import Conversation, Message
 from apps.notification.models import Notification, NotificationType
+from apps.notification.retention import (
+    archive_notifications,
+    purge_archived_notifications,
+)
 from apps.notification.services import get_notification_url
+from apps.notification.unread_counter import unread_counter
 from apps.notification.websocket_service import NotificationWebSocketService
+from apps.superadmin.models import Users
 
 
 @shared_task
 def create_chat_notification(message_id):
     """Create chat notification asynchronously to avoid WebSocket context issues."""
+    return len(create_chat_notifications([message_id]))
 
-    try:
-        message = Message.objects.get(id=message_id)
-    except Message.DoesNotExist:
-        return
 
-    try:
-        notification_type = NotificationType.objects.get(code=constants.CHAT_NOTIFY)
-    except NotificationType.DoesNotExist:
+def create_chat_notifications(message_ids):
+    """
+    Notify offline participants about a batch of new chat messages.
+
+    Presence for every (recipient, conversation) pair is resolved in one Redis
+    pipeline, notifications are bulk-created (skipping any that already exist
+    for the same message and recipient) and pushed in one pass after commit.
+    """
+    messages = list(
+        Message.objects.filter(id__in=message_ids)
+        .select_related("sender")
+        .order_by("id")
+    )
+    if not messages:
+        return []
+
+    notification_type = NotificationType.by_code(constants.CHAT_NOTIFY)
+    if notification_type is None:
         notification_type = NotificationType.objects.create(
             code=constants.CHAT_NOTIFY, name="Chat Notification"
         )
 
-    conversation = message.conversation
-    participants = conversation.participants.exclude(id=message.sender.id)
-    for participant in participants:
+    participants = {}
+    for conversation_id, user_id in Conversation.participants.through.objects.filter(
+        conversation_id__in={message.conversation_id for message in messages}
+    ).values_list("conversation_id", "users_id"):
+        participants.setdefault(conversation_id, []).append(user_id)
+
+    candidates = [
+        (message, user_id)
+        for message in messages
+        for user_id in participants.get(message.conversation_id, [])
+        if user_id != message.sender_id
+    ]
+    connected = chat_tracker.get_connected_pairs(
+        {(user_id, message.conversation_id) for message, user_id in candidates}
+    )
 
-        worker_tracker = ChatConnectionTracker()
+    content_type = ContentType.objects.get_for_model(Message)
+    existing = set(
+        Notification.all_objects.filter(
+            notification_type=notification_type,
+            content_type=content_type,
+            object_id__in=[message.id for message in messages],
+        ).values_list("recipient_id", "object_id")
+    )
+    recipients = Users.objects.only("id", "role").in_bulk(
+        {user_id for _, user_id in candidates}
+    )
 
-        if not worker_tracker.redis_client:
-            print(
-                f"❌ Redis unavailable - creating notification for user {participant.id}"
-            )
-            _create_notification_without_websocket(
-                recipient=participant,
-                actor=message.sender,
-                notification_type=notification_type,
-                title=f"New message from {message.sender.first_name} {message.sender.last_name}",
-                message=message.text[:100] if message.text else "Media message",
-                related_object=message,
-            )
+    notifications = []
+    for message, user_id in candidates:
+        if (user_id, message.conversation_id) in connected:
             continue
-
-        # Check if user is connected to this conversation
-        is_connected = worker_tracker.is_connected(participant.id, conversation.id)
-        print(
-            f"🔗 User {participant.email} connected to conversation {conversation.id}: {is_connected}"
-        )
-
-        # Debug: Show all user connections
-        user_connections = worker_tracker.get_user_connections(participant.id)
-        print(f"==>> user_connections: {user_connections}")
-
-        # Only create notification if user is NOT connected to this conversation
-        if not is_connected:
-            _create_notification_without_websocket(
-                recipient=participant,
+        if (user_id, message.id) in existing or user_id not in recipients:
+            continue
+        notifications.append(
+            Notification(
+                recipient=recipients[user_id],
                 actor=message.sender,
                 notification_type=notification_type,
                 title=f"New message from {message.sender.first_name} {message.sender.last_name}",
                 message=message.text[:100] if message.text else "Media message",
-                related_object=message,
+                url=get_notification_url(notification_type, recipients[user_id]),
+                content_type=content_type,
+                object_id=message.id,
             )
-        else:
-            print(f"⏭️ Skipping notification for connected user {participant.email}")
-
-    print(f"🏁 CHAT NOTIFICATION TASK COMPLETED for message_id: {message_id}")
-
-
-def _create_notification_without_websocket(
-    *, recipient, actor=None, notification_type, title, message="", related_object=None
-):
-    """Create notification without triggering WebSocket from async context."""
-
-    content_type = None
-    object_id = None
-
-    if related_object:
-        content_type = ContentType.objects.get_for_model(related_object.__class__)
-        object_id = related_object.id
-
-    # For chat-related objects, keep creation idempotent so duplicate task/signal
-    # execution does not fan out duplicate push notifications.
-    if content_type and object_id:
-        notification, created = Notification.objects.get_or_create(
-            recipient=recipient,
-            notification_type=notification_type,
-            content_type=content_type,
-            object_id=object_id,
-            defaults={
-                "actor": actor,
-                "title": title,
-                "message": message,
-                "url": get_notification_url(notification_type, recipient),
-            },
         )
-        if created:
-            send_notification_websocket.delay(notification.id)
-        return notification
-
-    notification = Notification.objects.create(
-        recipient=recipient,
-        actor=actor,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        url=get_notification_url(notification_type, recipient),
-        content_type=content_type,
-        object_id=object_id,
+
+    notifications = Notification.objects.bulk_create(notifications)
+    transaction.on_commit(lambda: _deliver_chat_notifications(notifications))
+    print(
+        f"🏁 CHAT NOTIFICATIONS: {len(notifications)} created for {len(messages)} messages"
     )
+    return notifications
 
-    # Send WebSocket notification in separate task to avoid async context issues
-    send_notification_websocket.delay(notification.id)
-    return notification
+
+def _deliver_chat_notifications(notifications):
+    # Runs after commit: an error here must not make the outbox retry (and
+    # duplicate) notifications that already exist
+    try:
+        for notification in notifications:
+            unread_counter.increment(notification.recipient_id)
+        NotificationWebSocketService.send_notifications(notifications)
+    except Exception as e:
+        print(f"Could not deliver chat notifications: {e}")
 
 
 @shared_task
@@ -126,3 +118,24 @@ def send_notification_websocket(notification_id):
         NotificationWebSocketService.send_notification(notification)
     except Notification.DoesNotExist:
         pass
+
+
+@shared_task
+def reconcile_unread_notification_counts():
+    """Rewrite every active user's unread counter from the database."""
+    user_ids = Users.objects.filter(is_active=True).values_list("id", flat=True)
+    reconciled = unread_counter.reconcile(user_ids)
+    print(f"Reconciled unread notification counters for {reconciled} users")
+    return reconciled
+
+
+@shared_task
+def archive_old_notifications():
+    """Archive old read notifications and purge expired archive rows."""
+    archived, dropped = archive_notifications()
+    purged = purge_archived_notifications()
+    print(
+        f"Notification retention: archived {archived}, dropped {dropped} deleted, "
+        f"purged {purged} archived"
+    )
+    return {"archived": archived, "dropped": dropped, "purged": purged}
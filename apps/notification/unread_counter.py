@@ -0,0 +1,78 @@
+"""
+Per-user unread notification counters kept in the shared Redis cache.
+
+Counters are seeded from the database on first read, then adjusted with
+atomic INCR/DECR as notifications are created, read and soft deleted, once
+the writing transaction commits. A missing key is never incremented
+blindly: the next read recounts from the database, so a counter only ever
+drifts through paths that bypass this module (bulk updates and deletes),
+which the periodic reconciliation task corrects.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from apps.notification.models import Notification
+
+
+class UnreadNotificationCounter:
+    """Atomic unread notification counts per recipient."""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or getattr(
+            settings, "NOTIFICATION_UNREAD_CACHE_SECONDS", 86400
+        )
+
+    @staticmethod
+    def _key(user_id):
+        return f"notification_unread:{user_id}"
+
+    def _count_from_db(self, user_id):
+        return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+    def get(self, user_id):
+        """Return the unread count, seeding the counter from the DB on a miss."""
+        count = cache.get(self._key(user_id))
+        if count is None:
+            count = self._count_from_db(user_id)
+            # add() so a concurrent increment that seeded first is not clobbered
+            if not cache.add(self._key(user_id), count, self.timeout):
+                count = cache.get(self._key(user_id), count)
+        return max(int(count), 0)
+
+    def increment(self, user_id, delta=1):
+        try:
+            cache.incr(self._key(user_id), delta)
+        except ValueError:
+            # Not seeded yet; the next get() counts the new row from the DB
+            pass
+
+    def decrement(self, user_id, delta=1):
+        try:
+            if cache.decr(self._key(user_id), delta) < 0:
+                cache.delete(self._key(user_id))
+        except ValueError:
+            pass
+
+    def reset(self, user_id):
+        cache.set(self._key(user_id), 0, self.timeout)
+
+    def reconcile(self, user_ids):
+        """Overwrite the counters of ``user_ids`` with fresh DB counts."""
+        user_ids = list(user_ids)
+        counts = dict(
+            Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+            .values_list("recipient_id")
+            .annotate(unread=Count("id"))
+            .order_by()
+        )
+        cache.set_many(
+            {self._key(user_id): counts.get(user_id, 0) for user_id in user_ids},
+            self.timeout,
+        )
+        return len(user_ids)
+
+
+# Global instance
+unread_counter = UnreadNotificationCounter()
@@ -9,11 +9,17 @@ from apps.base.permissions import IsAdmin, IsAuthenticated
 from apps.base.response import ApiResponse
 from apps.base.viewset import BaseViewSet
 from apps.notification.custom_filters import NotificationFilter, NotificationTypeFilter
-from apps.notification.models import Notification, NotificationType
+from apps.notification.models import (
+    ArchivedNotification,
+    Notification,
+    NotificationType,
+)
 from apps.notification.serializers import (
+    ArchivedNotificationSerializer,
     NotificationSerializer,
     NotificationTypeSerializer,
 )
+from apps.notification.unread_counter import unread_counter
 from apps.notification.websocket_service import NotificationWebSocketService
 from apps.superadmin.models import UserDeviceToken
 
@@ -62,18 +68,38 @@ class NotificationViewSet(BaseViewSet):
             "actor__department", "actor__position", "notification_type", "content_type"
         )
 
+    @action(detail=False, methods=["get"])
+    def archived(self, request):
+        """Older read notifications, served from the archive table."""
+        queryset = ArchivedNotification.objects.filter(recipient=request.user)
+        page = self.paginate_queryset(queryset)
+        serializer = ArchivedNotificationSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+    def details(self, request, pk=None):
+        """Individual alerts folded into a digest notification."""
+        notification = (
+            Notification.objects.filter(id=pk, recipient=request.user)
+            .only("id", "details")
+            .first()
+        )
+        if not notification:
+            return ApiResponse.error({"error": "Notification not found"}, status=404)
+        return ApiResponse.success({"details": notification.details or []})
+
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
-        count = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).count()
-        return ApiResponse.success({"unread_count": count})
+        return ApiResponse.success(
+            {"unread_count": unread_counter.get(request.user.id)}
+        )
 
     @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
     def mark_all_read(self, request):
         Notification.objects.filter(recipient=request.user, is_read=False).update(
             is_read=True
         )
+        unread_counter.reset(request.user.id)
         NotificationWebSocketService.send_bulk_update(request.user.id, "all_read")
         return ApiResponse.success({"message": "Mark all notification as read."})
 
@@ -82,16 +108,16 @@ class MarkAsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        updated = (
-            Notification.objects.filter(id=pk, recipient=request.user)
-            .select_related("recipient")
-            .update(is_read=True)
-        )
-
-        if updated:
+        notifications = Notification.objects.filter(id=pk, recipient=request.user)
+        # Only the request that actually flips is_read moves the counter
+        if notifications.filter(is_read=False).update(is_read=True):
+            unread_counter.decrement(request.user.id)
             NotificationWebSocketService.send_count_update(request.user.id)
             return ApiResponse.success({"message": "Notification read"})
 
+        if notifications.exists():
+            return ApiResponse.success({"message": "Notification read"})
+
         return ApiResponse.error({"error": "Notification not found"}, status=404)
 
 
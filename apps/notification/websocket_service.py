@@ -3,8 +3,8 @@ import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
-from apps.notification.models import Notification
 from apps.notification.serializers import NotificationSerializer
+from apps.notification.unread_counter import unread_counter
 from apps.superadmin.models import UserDeviceToken
 
 logger = logging.getLogger(__name__)
@@ -43,9 +43,7 @@ class NotificationWebSocketService:
                 "payload": {
                     "type": "new_notification",
                     "notification": serializer.data,
-                    "unread_count": Notification.objects.filter(
-                        recipient=notification.recipient, is_read=False
-                    ).count(),
+                    "unread_count": unread_counter.get(notification.recipient_id),
                 },
             }
 
@@ -92,6 +90,66 @@ class NotificationWebSocketService:
 
             traceback.print_exc()
 
+    @staticmethod
+    def send_notifications(notifications):
+        """Push a batch of new notifications: one token query, one FCM batch."""
+        if not notifications:
+            return
+
+        channel_layer = NotificationWebSocketService._get_safe_channel_layer()
+        recipient_ids = {notification.recipient_id for notification in notifications}
+        tokens = {}
+        for user_id, token in (
+            UserDeviceToken.objects.filter(user_id__in=recipient_ids, is_active=True)
+            .exclude(fcm_token__isnull=True)
+            .exclude(fcm_token__exact="")
+            .values_list("user_id", "fcm_token")
+            .distinct()
+        ):
+            tokens.setdefault(user_id, []).append(token)
+
+        fcm_messages = []
+        for notification in notifications:
+            if channel_layer:
+                try:
+                    async_to_sync(channel_layer.group_send)(
+                        f"notifications_{notification.recipient_id}",
+                        {
+                            "type": "notification_message",
+                            "payload": {
+                                "type": "new_notification",
+                                "notification": NotificationSerializer(
+                                    notification
+                                ).data,
+                                "unread_count": unread_counter.get(
+                                    notification.recipient_id
+                                ),
+                            },
+                        },
+                    )
+                except Exception as e:
+                    print(f"Error sending notification via WebSocket: {e}")
+
+            if tokens.get(notification.recipient_id):
+                from firebase_admin import messaging
+
+                fcm_messages.extend(
+                    messaging.Message(
+                        token=token,
+                        data={
+                            "title": notification.title or "",
+                            "body": notification.message or "",
+                            "url": notification.url or "/",
+                        },
+                    )
+                    for token in tokens[notification.recipient_id]
+                )
+
+        if fcm_messages:
+            from apps.base.firebase import send_fcm_notifications
+
+            send_fcm_notifications(fcm_messages)
+
     @staticmethod
     def send_read_update(user_id, notification_id):
         """Send notification read update via WebSocket"""
@@ -107,9 +165,7 @@ class NotificationWebSocketService:
                     "payload": {
                         "type": "notification_read",
                         "notification_id": notification_id,
-                        "unread_count": Notification.objects.filter(
-                            recipient_id=user_id, is_read=False
-                        ).count(),
+                        "unread_count": unread_counter.get(user_id),
                     },
                 },
             )
@@ -125,9 +181,7 @@ class NotificationWebSocketService:
 
         try:
             if unread_count is None:
-                unread_count = Notification.objects.filter(
-                    recipient_id=user_id, is_read=False
-                ).count()
+                unread_count = unread_counter.get(user_id)
 
             async_to_sync(channel_layer.group_send)(
                 f"notifications_{user_id}",
@@ -156,9 +210,7 @@ class NotificationWebSocketService:
                     "type": "notification_message",
                     "payload": {
                         "type": update_type,
-                        "unread_count": Notification.objects.filter(
-                            recipient_id=user_id, is_read=False
-                        ).count(),
+                        "unread_count": unread_counter.get(user_id),
                     },
                 },
             )
@@ -66,14 +66,16 @@ class Command(BaseCommand):
             {"code": "leave_apply", "name": "Leave Apply"},
             {"code": "leave_approved", "name": "Leave Approved"},
             {"code": "leave_rejected", "name": "Leave Rejected"},
-            {"code": "late_coming", "name": "Late Coming"},
+            {"code": "late_coming", "name": "Late Coming", "digest": True},
+            {"code": "daily_report", "name": "Daily Report", "digest": True},
             {"code": "payslip_generated", "name": "Payslip Generated"},
         ]
 
         for item in notifications:
-            obj, created = NotificationType.objects.get_or_create(
+            # Digest types are batched per recipient, as in notification 0011
+            obj, created = NotificationType.objects.update_or_create(
                 code=item["code"],
-                defaults={"name": item["name"]},
+                defaults={"name": item["name"], "digest": item.get("digest", False)},
             )
             if created:
                 self.stdout.write(
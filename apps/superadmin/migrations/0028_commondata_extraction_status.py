@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("superadmin", "0027_alter_users_encryption_enabled"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commondata",
+            name="handbook_extraction_progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="commondata",
+            name="handbook_extraction_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="commondata",
+            name="policy_extraction_progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="commondata",
+            name="policy_extraction_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=20,
+            ),
+        ),
+    ]
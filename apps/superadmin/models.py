@@ -21,6 +21,14 @@ from apps.base.validators import BaseValidator
 class CommonData(BaseModel):
     """Company configuration and leave policy settings."""
 
+    EXTRACTION_STATUS = (
+        ("none", "None"),
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+
     name = models.CharField(max_length=255, null=True, blank=True)
     company_link = models.CharField(max_length=255, null=True, blank=True)
     company_logo = models.ImageField(upload_to="company_logo", null=True, blank=True)
@@ -32,11 +40,19 @@ class CommonData(BaseModel):
     policy_content = models.TextField(null=True, blank=True)
     policy_content_html = models.TextField(null=True, blank=True)
     policy_last_updated = models.DateTimeField(auto_now=True)
+    policy_extraction_status = models.CharField(
+        max_length=20, choices=EXTRACTION_STATUS, default="none"
+    )
+    policy_extraction_progress = models.PositiveSmallIntegerField(default=0)  # %
 
     handbook_file = models.FileField(null=True, blank=True, upload_to="handbook_file")
     handbook_content = models.TextField(null=True, blank=True)
     handbook_content_html = models.TextField(null=True, blank=True)
     handbook_last_updated = models.DateTimeField(auto_now=True)
+    handbook_extraction_status = models.CharField(
+        max_length=20, choices=EXTRACTION_STATUS, default="none"
+    )
+    handbook_extraction_progress = models.PositiveSmallIntegerField(default=0)  # %
 
     def __str__(self):
         return self.name
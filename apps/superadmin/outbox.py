@@ -0,0 +1,57 @@
+"""
+Outbox events for outgoing email.
+
+Views publish ``email.send`` instead of calling ``send_email_task`` inline,
+so mail only goes out for committed data and a repeated request with the
+same idempotency key sends nothing twice. The handler only queues the task;
+SMTP runs, and is retried, in the Celery worker.
+"""
+
+from apps.base.outbox import outbox_handler, publish
+from apps.superadmin.tasks import send_email_task
+
+
+def enqueue_email(
+    *,
+    subject,
+    to_email,
+    text_body,
+    html_body=None,
+    from_email=None,
+    idempotency_key=None,
+):
+    """Queue a plain (attachment-free) email for delivery after commit."""
+    publish(
+        "email.send",
+        {
+            "subject": subject,
+            "to_email": to_email,
+            "text_body": text_body,
+            "html_body": html_body,
+            "from_email": from_email,
+        },
+        idempotency_key=idempotency_key,
+    )
+
+
+@outbox_handler(
+    "email.send", required=("subject", "to_email", "text_body"), atomic=False
+)
+def send_emails(payloads):
+    # Failures are reported per email so a retry never re-queues the others
+    failures = {}
+    for index, payload in enumerate(payloads):
+        try:
+            send_email_task.delay(
+                subject=payload["subject"],
+                to_email=payload["to_email"],
+                text_body=payload["text_body"],
+                pdf_bytes=None,
+                filename=None,
+                html_body=payload.get("html_body"),
+                from_email=payload.get("from_email"),
+            )
+        except Exception as e:
+            print(f"Could not queue email to {payload['to_email']}: {e}")
+            failures[index] = e
+    return failures
@@ -1,8 +1,9 @@
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from apps.base import constants
+from apps.chat.middleware import invalidate_ws_user
 from apps.notification.models import NotificationType
 from apps.notification.services import create_notification
 from apps.superadmin.models import Announcement, DailyReport, Leave, Users
@@ -33,11 +34,18 @@ def assign_employee_id(sender, instance, **kwargs):
         instance.employee_id = f"{str(next_seq).zfill(3)}"
 
 
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+def invalidate_ws_user_cache(sender, instance, **kwargs):
+    """Stop serving cached WebSocket identities once a user changes or is deactivated."""
+    invalidate_ws_user(instance.id)
+
+
 @receiver(post_save, sender=Announcement)
 def notify_on_announcement(sender, instance, created, **kwargs):
     if not created:
         return
-    notification_type = NotificationType.objects.get(code=constants.ANNOUNCEMENT_NOTIFY)
+    notification_type = NotificationType.by_code(constants.ANNOUNCEMENT_NOTIFY)
     employees = Users.objects.filter(is_active=True)
     for employee in employees:
         create_notification(
@@ -53,7 +61,7 @@ def notify_on_announcement(sender, instance, created, **kwargs):
 def notify_on_announcement_update(sender, instance, created, **kwargs):
     if created or instance.is_deleted:
         return
-    notification_type = NotificationType.objects.get(code=constants.ANNOUNCEMENT_NOTIFY)
+    notification_type = NotificationType.by_code(constants.ANNOUNCEMENT_NOTIFY)
     employees = Users.objects.filter(is_active=True)
     for employee in employees:
         create_notification(
@@ -69,7 +77,7 @@ def notify_on_announcement_update(sender, instance, created, **kwargs):
 def notify_on_leave_apply(sender, instance, created, **kwargs):
     admins = Users.objects.filter(role="admin", is_active=True)
     if created:
-        notification_type = NotificationType.objects.get(code=constants.LEAVE_APPLY)
+        notification_type = NotificationType.by_code(constants.LEAVE_APPLY)
         create_notification(
             recipient=instance.employee,
             notification_type=notification_type,
@@ -95,7 +103,7 @@ def notify_on_leave_apply(sender, instance, created, **kwargs):
 @receiver(post_save, sender=DailyReport)
 def notify_on_daily_report(sender, instance, created, **kwargs):
     if created:
-        notification_type = NotificationType.objects.get(code=constants.DAILY_REPORT)
+        notification_type = NotificationType.by_code(constants.DAILY_REPORT)
         create_notification(
             recipient=instance.employee,
             notification_type=notification_type,
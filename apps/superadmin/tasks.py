@@ -1,16 +1,25 @@
 """
-Celery tasks for asynchronous email operations.
+Celery tasks for asynchronous email operations and document extraction.
 
 Handles background email sending with support for HTML content,
-PDF attachments, and customizable email parameters for the HRMS system.
+PDF attachments, and customizable email parameters for the HRMS system,
+and text extraction of uploaded handbook and policy files.
 """
 
+from smtplib import SMTPException
+
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 
+from apps.superadmin.models import CommonData
+from apps.superadmin.utils import extract_file_data
 
-@shared_task
+# Delivery errors worth retrying: SMTP refusals and dropped connections
+EMAIL_RETRY_ERRORS = (SMTPException, OSError)
+
+
+@shared_task(autoretry_for=EMAIL_RETRY_ERRORS, retry_backoff=True, max_retries=5)
 def send_email_task(
     subject, to_email, text_body, pdf_bytes, filename, html_body=None, from_email=None
 ):
@@ -46,3 +55,54 @@ def send_email_task(
         mail.attach_alternative(html_body, "text/html")
 
     mail.send()
+
+
+@shared_task
+def extract_common_data_file(common_data_id, field):
+    """Extract the text of an uploaded handbook or policy file.
+
+    Runs after the upload request has stored the file, so large documents
+    never hold a web worker. ``field`` is ``handbook_file`` or
+    ``policy_file``; the text is saved to the matching ``*_content`` field
+    and progress is reported in ``*_extraction_status``/``*_extraction_progress``.
+
+    Args:
+        common_data_id (int): CommonData primary key
+        field (str): Name of the file field to extract
+    """
+    prefix = field.replace("_file", "")
+    status_field = f"{prefix}_extraction_status"
+    progress_field = f"{prefix}_extraction_progress"
+    queryset = CommonData.objects.filter(id=common_data_id)
+
+    instance = queryset.first()
+    file = getattr(instance, field, None)
+    if not file:
+        queryset.update(**{status_field: "none", progress_field: 0})
+        return
+
+    queryset.update(**{status_field: "processing", progress_field: 0})
+
+    def on_progress(done, total):
+        # Kept below 100 until the text is saved
+        queryset.update(**{progress_field: min(done * 100 // max(total, 1), 99)})
+
+    try:
+        with file.open("rb") as handle:
+            content = extract_file_data(handle, on_progress)
+    except Exception as e:
+        print(f"Extraction of {field} failed: {e}")
+        queryset.update(**{status_field: "failed"})
+        return
+
+    setattr(instance, f"{prefix}_content", content)
+    setattr(instance, status_field, "completed")
+    setattr(instance, progress_field, 100)
+    instance.save(
+        update_fields=[
+            f"{prefix}_content",
+            f"{prefix}_last_updated",
+            status_field,
+            progress_field,
+        ]
+    )
@@ -1,8 +1,13 @@
 import calendar
 import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, timedelta
 
 import pdfplumber
+import pypdfium2 as pdfium
+from django.conf import settings
 from django.utils import timezone
 from docx import Document
 
@@ -11,7 +16,7 @@ from apps.base import constants
 from apps.employee.models import LeaveBalance
 from apps.employee.utils import weekdays_count
 from apps.notification.models import NotificationType
-from apps.notification.services import create_notification
+from apps.notification.outbox import enqueue_notification
 from apps.superadmin.models import Holiday, Users
 
 
@@ -98,41 +103,120 @@ def general_team_monthly_data():
 def notify_employee_leave_approved(employee, leave):
     if leave.status != constants.APPROVED:
         return
-    notification_type = NotificationType.objects.get(code=constants.LEAVE_APPLY)
-    create_notification(
+    notification_type = NotificationType.by_code(constants.LEAVE_APPLY)
+    enqueue_notification(
         recipient=employee,
         notification_type=notification_type,
         title="Leave Approved",
         message="Your leave has been approved.",
         related_object=leave,
+        idempotency_key=f"leave:{leave.id}:{leave.status}:{leave.approved_at}",
     )
 
 
 def notify_employee_leave_rejected(employee, leave):
     if leave.status != constants.REJECTED:
         return
-    notification_type = NotificationType.objects.get(code=constants.LEAVE_APPLY)
-    create_notification(
+    notification_type = NotificationType.by_code(constants.LEAVE_APPLY)
+    enqueue_notification(
         recipient=employee,
         notification_type=notification_type,
         title="Leave Rejected",
         message="Your leave has been rejected.",
         related_object=leave,
+        idempotency_key=f"leave:{leave.id}:{leave.status}:{leave.approved_at}",
     )
 
 
-def extract_pdf_content(file):
-    text_blocks = []
+def _pdf_page_count(path):
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
 
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                text_blocks.append(text)
+
+def _extract_pdf_pages(path, start, stop, engine):
+    """Text of pages ``start`` to ``stop - 1`` of the PDF at ``path``.
+
+    Runs in a page pool process. pdfplumber keeps the reading layout best;
+    pypdfium2 is many times faster and is also used when pdfplumber fails.
+    """
+    if engine == "pdfplumber":
+        try:
+            with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+                return [page.extract_text() or "" for page in pdf.pages]
+        except Exception as e:
+            print(f"pdfplumber failed on pages {start + 1}-{stop}: {e}")
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        texts = []
+        for index in range(start, stop):
+            text = pdf[index].get_textpage().get_text_range()
+            texts.append(text.replace("\r\n", "\n").strip())
+        return texts
+    finally:
+        pdf.close()
+
+
+def _extract_page_batches(path, batches, on_progress=None):
+    """Extract ``batches`` of (start, stop) pages, in parallel where possible."""
+    engine = settings.DOCUMENT_PDF_ENGINE
+    total = batches[-1][1] if batches else 0
+    results = [None] * len(batches)
+    workers = min(settings.DOCUMENT_EXTRACTION_WORKERS, len(batches))
+
+    if workers > 1:
+        try:
+            done = 0
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_extract_pdf_pages, path, start, stop, engine): index
+                    for index, (start, stop) in enumerate(batches)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    results[index] = future.result()
+                    done += batches[index][1] - batches[index][0]
+                    if on_progress:
+                        on_progress(done, total)
+            return results
+        except (AssertionError, BrokenProcessPool, OSError) as e:
+            # Daemonic Celery pool processes may not start children
+            print(f"Page pool unavailable, extracting sequentially: {e}")
+
+    done = 0
+    for index, (start, stop) in enumerate(batches):
+        results[index] = _extract_pdf_pages(path, start, stop, engine)
+        done += stop - start
+        if on_progress:
+            on_progress(done, total)
+    return results
+
+
+def extract_pdf_content(file, on_progress=None):
+    """Text of the first DOCUMENT_EXTRACTION_MAX_PAGES pages of a PDF.
+
+    Pages are extracted in batches of DOCUMENT_EXTRACTION_PAGES_PER_BATCH by
+    a pool of DOCUMENT_EXTRACTION_WORKERS processes; ``on_progress(done,
+    total)`` is called as batches finish.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as temp:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            temp.write(chunk)
+        temp.flush()
+
+        page_count = _pdf_page_count(temp.name)
+        pages = min(page_count, settings.DOCUMENT_EXTRACTION_MAX_PAGES)
+        if pages < page_count:
+            print(f"Extracting the first {pages} of {page_count} pages")
+        step = settings.DOCUMENT_EXTRACTION_PAGES_PER_BATCH
+        batches = [(start, min(start + step, pages)) for start in range(0, pages, step)]
+        results = _extract_page_batches(temp.name, batches, on_progress)
 
     print("done with extraction")
-    data = "\n\n".join(text_blocks)
-    return data
+    return "\n\n".join(text for batch in results for text in batch if text)
 
 
 def extract_docx_content(file):
@@ -147,7 +231,7 @@ def extract_text_content(file):
     return file.read().decode("utf-8")
 
 
-def extract_file_data(file):
+def extract_file_data(file, on_progress=None):
     file.seek(0)
     print(f"==>> handbook_file: {file}")
     file_type = file.name.split(".")[-1].lower()
@@ -159,7 +243,7 @@ def extract_file_data(file):
         return "Unsupported file format"
 
     if file_type == "pdf":
-        data = extract_pdf_content(file)
+        data = extract_pdf_content(file, on_progress)
         return data
     elif file_type == "docx":
         data = extract_docx_content(file)
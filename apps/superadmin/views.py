@@ -44,11 +44,11 @@ from apps.superadmin.custom_filters import (
     ProjectFilter,
     SuperAdminFilter,
 )
-from apps.superadmin.tasks import send_email_task
+from apps.superadmin.outbox import enqueue_email
+from apps.superadmin.tasks import extract_common_data_file, send_email_task
 from apps.superadmin.utils import (
     delete_old_file,
     determine_attendance_statuses,
-    extract_file_data,
     general_team_monthly_data,
     is_halfday_paid_leave,
     notify_employee_leave_approved,
@@ -334,13 +334,11 @@ class AdminRegister(BaseViewSet):
                     HR Team
                     {common_data.name}
                 """
-                send_email_task.delay(
+                enqueue_email(
                     subject=f"Welcome to {common_data.name}",
                     to_email=user.email,
                     text_body=text_body,
-                    html_body=None,
-                    pdf_bytes=None,
-                    filename=None,
+                    idempotency_key=f"welcome:{user.id}",
                 )
             except Exception as e:
                 print("Error here.........", e)
@@ -408,6 +406,23 @@ class UserViewSet(APIView):
 #   ================  COMMON_DATA CRUD API   ========
 
 
+def queue_file_extraction(instance, files):
+    """Queue text extraction of the handbook/policy files uploaded with a request."""
+    for field in ("policy_file", "handbook_file"):
+        if field not in files:
+            continue
+        status = {
+            field.replace("_file", "_extraction_status"): "pending",
+            field.replace("_file", "_extraction_progress"): 0,
+        }
+        models.CommonData.objects.filter(id=instance.id).update(**status)
+        for name, value in status.items():
+            setattr(instance, name, value)
+        transaction.on_commit(
+            lambda field=field: extract_common_data_file.delay(instance.id, field)
+        )
+
+
 class CommonDataViewSet(BaseViewSet):
     entity_name = "Common Data"
     permission_classes = [IsAdmin]
@@ -432,21 +447,12 @@ class CommonDataViewSet(BaseViewSet):
                 message="Common Data already exists. You can update it.", status=400
             )
         else:
-            policy_file = request.FILES.get("policy_file")
-            handbook_file = request.FILES.get("handbook_file")
-
-            policy_content = extract_file_data(policy_file) if policy_file else ""
-            print(f"==>> policy_content: {policy_content}")
-            handbook_content = extract_file_data(handbook_file) if handbook_file else ""
-            print(f"==>> handbook_content: {handbook_content}")
-
             serializer = self.serializer_class(data=request.data)
             serializer.is_valid(raise_exception=True)
 
-            instance = serializer.save(
-                policy_content=policy_content,
-                handbook_content=handbook_content,
-            )
+            instance = serializer.save(policy_content="", handbook_content="")
+            # Text is extracted in the background once the upload is stored
+            queue_file_extraction(instance, request.FILES)
             return ApiResponse.success(
                 message="Common Data created successfully",
                 data=self.serializer_class(instance).data,
@@ -470,13 +476,7 @@ class CommonDataViewSet(BaseViewSet):
             serializer = self.get_serializer(instance, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
-            if "policy_file" in request.FILES:
-                instance.policy_content = extract_file_data(instance.policy_file)
-
-            if "handbook_file" in request.FILES:
-                instance.handbook_content = extract_file_data(instance.handbook_file)
-
-            instance.save()
+            queue_file_extraction(instance, request.FILES)
             return ApiResponse.success(
                 message="Common Data updated successfully", data=serializer.data
             )
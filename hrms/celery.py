@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 from django.conf import settings
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hrms.settings")
@@ -15,6 +16,18 @@ app.autodiscover_tasks()
 app.conf.enable_utc = False
 app.conf.timezone = settings.TIME_ZONE  # "Asia/Kolkata"
 
+
+@worker_process_init.connect
+def warm_notification_type_registry(**kwargs):
+    """Load notification types once per worker process instead of per task."""
+    from apps.notification.models import NotificationType
+
+    try:
+        NotificationType.warm_registry()
+    except Exception as e:
+        print(f"Could not warm notification type registry: {e}")
+
+
 app.conf.beat_schedule = {
     "credit-leave-balances-yearly": {
         "task": "apps.employee.tasks.credit_new_year_employee_leaves",
@@ -56,4 +69,32 @@ app.conf.beat_schedule = {
         "task": "apps.employee.tasks.notify_employee_for_daily_report",
         "schedule": crontab(minute=0, hour=22),
     },
+    "purge_stale_chat_uploads": {
+        "task": "apps.chat.tasks.purge_stale_chat_uploads",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "reconcile_unread_notification_counts": {
+        "task": "apps.notification.tasks.reconcile_unread_notification_counts",
+        "schedule": crontab(minute="*/15"),
+    },
+    "drain_outbox_events": {
+        "task": "apps.base.tasks.drain_outbox_events",
+        "schedule": crontab(minute="*"),
+    },
+    "prune_outbox_events": {
+        "task": "apps.base.tasks.prune_outbox_events",
+        "schedule": crontab(minute=45, hour=3),
+    },
+    "archive_old_notifications": {
+        "task": "apps.notification.tasks.archive_old_notifications",
+        "schedule": crontab(minute=0, hour=3),
+    },
+    "refresh_ai_analytics_snapshots": {
+        "task": "apps.ai.tasks.refresh_ai_analytics_snapshots",
+        "schedule": crontab(minute=5, hour=0),
+    },
+    "train_ai_intent_model": {
+        "task": "apps.ai.tasks.train_ai_intent_model",
+        "schedule": crontab(minute=30, hour=2),
+    },
 }
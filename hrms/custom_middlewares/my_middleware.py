@@ -1,21 +1,36 @@
 import logging
 import time
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
 
 logger = logging.getLogger(__name__)
 
 
 class RequestTimingMiddleware:
+    # Supports both so async views are not forced into the sync thread
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         start_time = time.time()
-
         response = self.get_response(request)
+        return self.process_timing(request, response, start_time)
+
+    async def __acall__(self, request):
+        start_time = time.time()
+        response = await self.get_response(request)
+        return self.process_timing(request, response, start_time)
 
+    def process_timing(self, request, response, start_time):
         end_time = time.time()
         duration = (end_time - start_time) * 1000
 
@@ -27,11 +42,25 @@ class RequestTimingMiddleware:
 
 
 class BlockMobileMiddleware:
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.blocked_response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.blocked_response(request) or await self.get_response(request)
+
+    def blocked_response(self, request):
+        """403 response for mobile devices, None otherwise."""
         user_agent = request.META.get("HTTP_USER_AGENT", "").lower()
         sec_ch_ua_mobile = request.META.get("HTTP_SEC_CH_UA_MOBILE", "")
         sec_ch_ua_platform = request.META.get("HTTP_SEC_CH_UA_PLATFORM", "").lower()
@@ -77,5 +106,4 @@ class BlockMobileMiddleware:
                 },
                 status=403,
             )
-
-        return self.get_response(request)
+        return None
@@ -52,6 +52,7 @@ LOCAL_APPS = [
 ]
 
 DJANGO_APPS = [
+    "apps.base.apps.BaseConfig",
     "apps.superadmin.apps.SuperAdminConfig",
     "apps.chat.apps.ChatConfig",
     "apps.employee.apps.EmployeeConfig",
@@ -200,6 +201,18 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Chunked chat uploads: partial files live here until the session completes
+CHAT_UPLOAD_TEMP_DIR = os.environ.get(
+    "CHAT_UPLOAD_TEMP_DIR", os.path.join(BASE_DIR, "tmp", "chat_uploads")
+)
+CHAT_UPLOAD_MAX_SIZE = int(os.environ.get("CHAT_UPLOAD_MAX_SIZE", 100 * 1024 * 1024))
+CHAT_UPLOAD_CHUNK_SIZE = int(os.environ.get("CHAT_UPLOAD_CHUNK_SIZE", 1024 * 1024))
+CHAT_UPLOAD_SESSION_HOURS = int(os.environ.get("CHAT_UPLOAD_SESSION_HOURS", 24))
+# A chunk reservation left behind by a dropped connection frees up after this
+CHAT_UPLOAD_CHUNK_LEASE_SECONDS = int(
+    os.environ.get("CHAT_UPLOAD_CHUNK_LEASE_SECONDS", 120)
+)
+
 
 # For Bcrypt Password hashing
 PASSWORD_HASHERS = [
@@ -273,6 +286,18 @@ CELERY_ENABLE_UTC = False
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Handbook/policy file extraction (Celery): pages read from a PDF at most,
+# page pool processes, pages per pool batch, and the PDF text engine
+# ("pdfplumber" keeps layout best, "pypdfium2" is much faster)
+DOCUMENT_EXTRACTION_MAX_PAGES = int(os.getenv("DOCUMENT_EXTRACTION_MAX_PAGES", 500))
+DOCUMENT_EXTRACTION_WORKERS = int(
+    os.getenv("DOCUMENT_EXTRACTION_WORKERS", min(4, os.cpu_count() or 1))
+)
+DOCUMENT_EXTRACTION_PAGES_PER_BATCH = int(
+    os.getenv("DOCUMENT_EXTRACTION_PAGES_PER_BATCH", 25)
+)
+DOCUMENT_PDF_ENGINE = os.getenv("DOCUMENT_PDF_ENGINE", "pdfplumber")
+
 
 # Channels configuration
 CHANNEL_LAYERS = {
@@ -289,7 +314,24 @@ CHANNEL_LAYERS = {
     },
 }
 
-# Fallback to in-memory channel layer if Redis is not available
+# Typing indicators are batched per conversation within this window and
+# expire if the client stops refreshing them
+CHAT_TYPING_WINDOW_MS = int(os.environ.get("CHAT_TYPING_WINDOW_MS", 300))
+CHAT_TYPING_TTL_SECONDS = int(os.environ.get("CHAT_TYPING_TTL_SECONDS", 6))
+
+# Shared cache so short-lived lookups (e.g. WebSocket user identities) are
+# visible to every web and daphne process and can be invalidated centrally
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://{}:{}/1".format(
+            os.environ.get("REDIS_HOST", "127.0.0.1"),
+            int(os.environ.get("REDIS_PORT", 6379)),
+        ),
+    }
+}
+
+# Fallback to in-memory channel layer and cache if Redis is not available
 try:
     import redis
 
@@ -305,6 +347,57 @@ except (redis.ConnectionError, redis.TimeoutError, ImportError):
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         },
     }
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# WebSocket admission control (per daphne process): new sockets per second,
+# burst allowance, concurrent sockets per user, and the max jittered delay of
+# connect-time unread sync while a burst is in progress
+WS_ADMISSION_RATE = int(os.environ.get("WS_ADMISSION_RATE", 200))
+WS_ADMISSION_BURST = int(os.environ.get("WS_ADMISSION_BURST", 400))
+WS_MAX_CONNECTIONS_PER_USER = int(os.environ.get("WS_MAX_CONNECTIONS_PER_USER", 10))
+WS_DEFERRED_SYNC_MAX_MS = int(os.environ.get("WS_DEFERRED_SYNC_MAX_MS", 2000))
+
+# Seconds a resolved WebSocket user identity is reused across reconnects
+WS_USER_CACHE_SECONDS = int(os.environ.get("WS_USER_CACHE_SECONDS", 60))
+
+# Lifetime of the per-user unread notification counters; they are also
+# rewritten from the database by a periodic reconciliation task
+NOTIFICATION_UNREAD_CACHE_SECONDS = int(
+    os.environ.get("NOTIFICATION_UNREAD_CACHE_SECONDS", 86400)
+)
+
+# NotificationType.by_code() keeps a per-process registry that is reloaded
+# after this many seconds (and in every process as soon as a type is saved)
+NOTIFICATION_TYPE_REGISTRY_SECONDS = int(
+    os.environ.get("NOTIFICATION_TYPE_REGISTRY_SECONDS", 300)
+)
+
+# Transactional outbox: events are drained in batches shortly after the
+# producing transaction commits (plus a per-minute sweep), retried with
+# exponential backoff, and processed events are kept for idempotency checks
+OUTBOX_DRAIN_DELAY_SECONDS = int(os.environ.get("OUTBOX_DRAIN_DELAY_SECONDS", 1))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 200))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", 30))
+# Claimed events are hidden from other drains for this long while their
+# handlers run, and are re-offered after it if the worker dies
+OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", 300))
+OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", 7))
+
+# Read notifications older than NOTIFICATION_RETENTION_DAYS move to the
+# archive table in batches; archived rows are purged after
+# NOTIFICATION_ARCHIVE_RETENTION_DAYS
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 30))
+NOTIFICATION_ARCHIVE_RETENTION_DAYS = int(
+    os.environ.get("NOTIFICATION_ARCHIVE_RETENTION_DAYS", 365)
+)
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(
+    os.environ.get("NOTIFICATION_ARCHIVE_BATCH_SIZE", 1000)
+)
 
 # AWS S3 configuration
 
@@ -336,3 +429,59 @@ SESSION_COOKIE_SECURE = False
 AI_PROVIDER = os.getenv("AI_PROVIDER", "DUMMY")
 HF_API_KEY = os.getenv("HF_API_KEY")
 HF_MODEL = os.getenv("HF_MODEL")
+HF_API_URL = os.getenv(
+    "HF_API_URL", "https://router.huggingface.co/v1/chat/completions"
+)
+
+# Async LLM client: request timeout, pooled connections, concurrent upstream
+# requests per process, and retries (with exponential backoff from the base
+# delay) for connection errors, timeouts and 429/5xx answers
+AI_LLM_TIMEOUT_SECONDS = float(os.getenv("AI_LLM_TIMEOUT_SECONDS", 60))
+AI_LLM_MAX_CONNECTIONS = int(os.getenv("AI_LLM_MAX_CONNECTIONS", 20))
+AI_LLM_MAX_CONCURRENCY = int(os.getenv("AI_LLM_MAX_CONCURRENCY", 8))
+AI_LLM_MAX_RETRIES = int(os.getenv("AI_LLM_MAX_RETRIES", 2))
+AI_LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("AI_LLM_RETRY_BACKOFF_SECONDS", 0.5))
+# Local intent classifier: confidence needed to skip the LLM classifier, how
+# often workers reload the TF-IDF model trained from AIQueryLog, and how many
+# logged queries are needed before a model is trained at all
+AI_INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("AI_INTENT_CONFIDENCE_THRESHOLD", 0.6))
+AI_INTENT_MODEL_REFRESH_SECONDS = int(os.getenv("AI_INTENT_MODEL_REFRESH_SECONDS", 300))
+AI_INTENT_MODEL_MIN_SAMPLES = int(os.getenv("AI_INTENT_MODEL_MIN_SAMPLES", 50))
+# AI response cache: how long answers to repeated questions are kept, and the
+# character trigram similarity at which a reworded question (same words apart
+# from filler words) reuses an answer
+AI_RESPONSE_CACHE_SECONDS = int(os.getenv("AI_RESPONSE_CACHE_SECONDS", 3600))
+AI_RESPONSE_CACHE_SIMILARITY = float(os.getenv("AI_RESPONSE_CACHE_SIMILARITY", 0.6))
+# Handbook and policy retrieval: target characters per indexed section, how
+# many of the best matching sections are added to a prompt, and the BM25 score
+# a section needs to be added to questions not classified as handbook/general
+HANDBOOK_CHUNK_CHARS = int(os.getenv("HANDBOOK_CHUNK_CHARS", 800))
+HANDBOOK_TOP_K = int(os.getenv("HANDBOOK_TOP_K", 3))
+HANDBOOK_MIN_SCORE = float(os.getenv("HANDBOOK_MIN_SCORE", 4.0))
+# Replace locally derived conversation titles with LLM titles after answering
+AI_LLM_CONVERSATION_TITLES = (
+    os.getenv("AI_LLM_CONVERSATION_TITLES", "True").lower() == "true"
+)
+
+# AI prompt budget: total estimated tokens per LLM prompt, the number of recent
+# conversation messages kept verbatim (older ones are summarised), how many
+# messages and query logs are read per query, and the response token cap
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", 4000))
+AI_HISTORY_WINDOW = int(os.getenv("AI_HISTORY_WINDOW", 6))
+AI_HISTORY_MAX_MESSAGES = int(os.getenv("AI_HISTORY_MAX_MESSAGES", 40))
+AI_QUERY_LOG_WINDOW = int(os.getenv("AI_QUERY_LOG_WINDOW", 5))
+AI_MAX_RESPONSE_TOKENS = int(os.getenv("AI_MAX_RESPONSE_TOKENS", 300))
+
+# AI context builders: days of recent activity considered, the hard row cap per
+# list and the size of "top N" outlier lists passed to the assistant. A row is
+# roughly 50 tokens, so the row cap keeps a builder's lists near the 1500
+# token context budget instead of fetching rows that are cut from the prompt
+AI_CONTEXT_DAYS = int(os.getenv("AI_CONTEXT_DAYS", 30))
+AI_CONTEXT_MAX_ROWS = int(os.getenv("AI_CONTEXT_MAX_ROWS", 10))
+AI_CONTEXT_TOP_K = int(os.getenv("AI_CONTEXT_TOP_K", 5))
+
+# AI analytics snapshots: cache lifetime, number of leave/attendance/payroll
+# changes that trigger an early refresh, and how long daily rows are kept
+AI_ANALYTICS_CACHE_SECONDS = int(os.getenv("AI_ANALYTICS_CACHE_SECONDS", 86400))
+AI_ANALYTICS_REFRESH_THRESHOLD = int(os.getenv("AI_ANALYTICS_REFRESH_THRESHOLD", 25))
+AI_ANALYTICS_RETENTION_DAYS = int(os.getenv("AI_ANALYTICS_RETENTION_DAYS", 30))